@@ -0,0 +1,42 @@
+"""
+Micro benchmarks for SteamworksPy
+
+Each module is runnable on its own from the repository root, e.g. python -m benchmarks.codec. None of them needs a
+Steam client.
+"""
+import timeit
+
+
+def measure(function: object, repeat: int = 5) -> float:
+    """Time a zero argument callable
+
+    :param function: callable
+    :param repeat: int, number of timing runs, the fastest one is reported
+    :return: float, nanoseconds per call
+    """
+    return min(measure_runs(function, repeat))
+
+
+def measure_runs(function: object, repeat: int = 5) -> list:
+    """Time a zero argument callable, keeping every run to tell how noisy the measurement is
+
+    :param function: callable
+    :param repeat: int, number of timing runs
+    :return: list of float, nanoseconds per call of each run
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return [seconds / number * 1e9 for seconds in timer.repeat(repeat, number)]
+
+
+def print_table(headers: list, rows: list) -> None:
+    """Print rows as a left aligned plain text table
+
+    :param headers: list of str
+    :param rows: list of tuples
+    :return: None
+    """
+    rows = [[f'{value:.1f}' if isinstance(value, float) else str(value) for value in row] for row in rows]
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    for row in [headers] + rows:
+        print('  '.join(str(cell).ljust(width) for cell, width in zip(row, widths)).rstrip())
@@ -0,0 +1,160 @@
+"""
+Memory allocated by the polling Workshop getters, per call
+
+GetItemInstallInfo, GetItemDownloadInfo and GetItemUpdateProgress are called against the offline stub backend the
+way a mod manager polls them, next to the implementation they replaced: fresh out-parameter objects on every call
+and a dict as result. Measured with tracemalloc for every variant:
+
+- peak bytes: the most memory a single call holds at once, out-parameters and result included
+- retained bytes and blocks: what one result keeps alive while the caller holds on to it
+
+The time per call is measured separately, without tracing.
+
+    python -m benchmarks.allocations
+    python -m benchmarks.allocations --json results.json
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from ctypes import c_uint32, c_uint64, create_string_buffer, pointer
+
+from benchmarks import measure, print_table
+from steamworks import STEAMWORKS
+from steamworks.enums import EItemState, EItemUpdateStatus
+from steamworks.stub import StubItem, StubSteamworks
+
+ITEM = 1000001
+CALLS = 10000
+
+
+def legacy_install_info(steam: STEAMWORKS, published_file_id: int, max_path_length: int = 1024) -> dict:
+    punSizeOnDisk = pointer(c_uint64(0))
+    punTimeStamp = pointer(c_uint32(0))
+    pchFolder = create_string_buffer(max_path_length)
+    if not steam.Workshop_GetItemInstallInfo(published_file_id, punSizeOnDisk, pchFolder, max_path_length,
+                                             punTimeStamp):
+        return {}
+
+    # The pointer itself was returned as disk_size; its value is taken here to compare like with like
+    return {'disk_size': punSizeOnDisk.contents.value, 'folder': pchFolder.value.decode(),
+            'timestamp': punTimeStamp.contents.value}
+
+
+def legacy_download_info(steam: STEAMWORKS, published_file_id: int) -> dict:
+    punBytesDownloaded = pointer(c_uint64(0))
+    punBytesTotal = pointer(c_uint64(0))
+    if not steam.Workshop_GetItemDownloadInfo(published_file_id, punBytesDownloaded, punBytesTotal):
+        return {}
+
+    downloaded = punBytesDownloaded.contents.value
+    total = punBytesTotal.contents.value
+    return {'downloaded': downloaded, 'total': total, 'progress': 0.0 if total <= 0 else downloaded / total}
+
+
+def legacy_update_progress(steam: STEAMWORKS, update_handle: int) -> dict:
+    punBytesProcessed = c_uint64()
+    punBytesTotal = c_uint64()
+    update_status = steam.Workshop_GetItemUpdateProgress(update_handle, pointer(punBytesProcessed),
+                                                         pointer(punBytesTotal))
+    return {'status': EItemUpdateStatus(update_status), 'processed': punBytesProcessed.value,
+            'total': punBytesTotal.value, 'progress': punBytesProcessed.value / (punBytesTotal.value or 1)}
+
+
+def cases() -> list:
+    """(getter, variant, zero argument callable) pairs, the dict baseline first"""
+    stub = StubSteamworks()
+    steam = STEAMWORKS(backend=stub, prebind=True)
+    stub.items[ITEM] = StubItem(EItemState.SUBSCRIBED | EItemState.INSTALLED, 4096, '/workshop/content/1000001',
+                                1700000000, 2048, 4096)
+    workshop = steam.Workshop
+    update = stub.Workshop_StartItemUpdate(steam.app_id, ITEM)
+    return [
+        ('GetItemInstallInfo', 'dict, new buffers', lambda: legacy_install_info(steam, ITEM)),
+        ('GetItemInstallInfo', 'record, reused buffers', lambda: workshop.GetItemInstallInfo(ITEM)),
+        ('GetItemDownloadInfo', 'dict, new buffers', lambda: legacy_download_info(steam, ITEM)),
+        ('GetItemDownloadInfo', 'record, reused buffers', lambda: workshop.GetItemDownloadInfo(ITEM)),
+        ('GetItemUpdateProgress', 'dict, new buffers', lambda: legacy_update_progress(steam, update)),
+        ('GetItemUpdateProgress', 'record, reused buffers', lambda: workshop.GetItemUpdateProgress(update)),
+    ]
+
+
+def allocations(function: object, calls: int = CALLS) -> dict:
+    """Trace the memory a callable allocates
+
+    :param function: callable
+    :param calls: int, number of calls to average over
+    :return: dict with peak_bytes per call and retained_bytes and retained_blocks per result
+    """
+    results = [None] * calls
+    function()
+    tracemalloc.start()
+    try:
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        tracemalloc.reset_peak()
+        started, _ = tracemalloc.get_traced_memory()
+        for _ in range(calls):
+            function()
+
+        _, peak = tracemalloc.get_traced_memory()
+
+        before = tracemalloc.take_snapshot().filter_traces(ignore)
+        for index in range(calls):
+            results[index] = function()
+
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+    finally:
+        tracemalloc.stop()
+
+    difference = after.compare_to(before, 'filename')
+    return {
+        'peak_bytes': peak - started,
+        'retained_bytes': sum(stat.size_diff for stat in difference) / calls,
+        'retained_blocks': sum(stat.count_diff for stat in difference) / calls,
+    }
+
+
+def run(repeat: int) -> dict:
+    results = []
+    for getter, variant, function in cases():
+        result = {'getter': getter, 'variant': variant, 'ns_per_call': measure(function, repeat)}
+        result.update(allocations(function))
+        results.append(result)
+
+    return {
+        'suite': 'allocations',
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--json', metavar='PATH', help="write machine readable results, '-' for stdout")
+    parser.add_argument('--repeat', type=int, default=3, help='timing runs per measurement, the fastest counts')
+    args = parser.parse_args(argv)
+
+    report = run(args.repeat)
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return 0
+
+    print_table(['getter', 'variant', 'peak bytes', 'retained bytes', 'retained blocks', 'ns/call'],
+                [(result['getter'], result['variant'], result['peak_bytes'], result['retained_bytes'],
+                  result['retained_blocks'], result['ns_per_call']) for result in report['results']])
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+Compare steamworks.p2p.codec against JSON and pickle for typical game state messages
+
+    python -m benchmarks.codec
+"""
+import json
+import pickle
+
+from benchmarks import measure, print_table
+from steamworks.p2p.codec import P2PMessageRegistry
+
+registry = P2PMessageRegistry()
+PlayerState = registry.define('PlayerState', [
+    ('entity', 'I'), ('tick', 'I'),
+    ('x', 'f'), ('y', 'f'), ('z', 'f'),
+    ('yaw', 'f'), ('pitch', 'f'),
+    ('health', 'H'), ('flags', 'B'),
+])
+Input = registry.define('Input', [('tick', 'I'), ('buttons', 'H'), ('move_x', 'b'), ('move_y', 'b')])
+Chat = registry.define('Chat', [('sender', 'Q'), ('text', '64s')])
+
+MESSAGES = (
+    (PlayerState, (42, 1000, 12.5, -3.25, 100.0, 1.57, -0.2, 87, 3)),
+    (Input, (1000, 0b1011, 127, -128)),
+    (Chat, (76561197960265729, b'gg wp')),
+)
+
+
+def main():
+    rows = []
+    for codec, values in MESSAGES:
+        as_dict = dict(zip(codec.fields, values))
+        if codec is Chat:
+            # JSON can not carry bytes
+            as_dict['text'] = values[-1].decode()
+
+        encoded = registry.encode(codec, *values).tobytes()
+        json_encoded = json.dumps(as_dict).encode()
+        pickle_encoded = pickle.dumps(as_dict, pickle.HIGHEST_PROTOCOL)
+
+        rows.append((codec.name, 'codec', len(encoded),
+                     measure(lambda: registry.encode(codec, *values)),
+                     measure(lambda: registry.decode(encoded))))
+        rows.append((codec.name, 'json', len(json_encoded),
+                     measure(lambda: json.dumps(as_dict).encode()),
+                     measure(lambda: json.loads(json_encoded))))
+        rows.append((codec.name, 'pickle', len(pickle_encoded),
+                     measure(lambda: pickle.dumps(as_dict, pickle.HIGHEST_PROTOCOL)),
+                     measure(lambda: pickle.loads(pickle_encoded))))
+
+    batch = [MESSAGES[0]] * 64
+    bundle = registry.encode_many(batch).tobytes()
+    rows.append(('64 x PlayerState', 'codec', len(bundle),
+                 measure(lambda: registry.encode_many(batch)),
+                 measure(lambda: list(registry.decode_all(bundle)))))
+
+    print_table(['message', 'format', 'bytes', 'encode ns', 'decode ns'], rows)
+
+
+if __name__ == '__main__':
+    main()
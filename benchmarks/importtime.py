@@ -0,0 +1,58 @@
+"""
+Measure the import cost of the steamworks package against a budget
+
+Every module is imported in a fresh interpreter with -X importtime, the cumulative time of its top level import is
+taken from the best of several runs. Exits with status 1 if any module exceeds its budget, so it can gate CI.
+
+    python -m benchmarks.importtime
+"""
+import os
+import subprocess
+import sys
+
+from benchmarks import print_table
+
+# Cumulative microseconds; generous enough for a loaded CI machine, tight enough to catch an eager import of ctypes,
+# asyncio or the interface modules creeping back in
+BUDGETS_US = {
+    'steamworks': 5000,
+    'steamworks.enums': 15000,
+    'steamworks.core': 60000,
+}
+
+RUNS = 5
+
+
+def import_time(module: str) -> int:
+    """Cumulative import time of a module in a fresh interpreter
+
+    :param module: str
+    :return: int, microseconds
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=root,
+                            capture_output=True, text=True, check=True).stderr
+    for line in output.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1])
+
+    raise RuntimeError(f'{module} missing from the -X importtime output')
+
+
+def main() -> int:
+    rows = []
+    failed = False
+    for module, budget in BUDGETS_US.items():
+        cumulative = min(import_time(module) for _ in range(RUNS))
+        within = cumulative <= budget
+        failed |= not within
+        rows.append((module, cumulative, budget, 'ok' if within else 'OVER BUDGET'))
+
+    print_table(['module', 'cumulative us', 'budget us', ''], rows)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,332 @@
+"""
+Per call overhead of the interface layer, measured against the offline stub backend
+
+Every case calls one interface method the way application code does and, separately, the native symbol it ends up
+in with prepared arguments. The native symbols are the stub implementations behind C function pointers built from
+the argtypes and restype of the method map, so arguments and results are converted by ctypes exactly as for a call
+into the library; the stub column times the same implementation called directly, and the marshalling column is the
+difference. That difference also contains the callback side of the function pointer, which a real library does not
+have, so it is an upper bound. Functions returning a structure by value can not be called back and keep calling the
+stub directly; the native column of their rows is marked.
+
+The difference between interface and native call is the cost of the Python wrapper, which is split further by timing
+the str.encode, enum construction and ctypes object handling the wrapper performs on its own; whatever remains is
+spent in Python frames, attribute lookups and building the result. Differences are reported as measured: a negative
+value, or one smaller than the noise column (the spread between the fastest and slowest timing run of the interface
+and the native call), is within measurement noise.
+
+Callback cases time one event from the stub raising it to a subscribed no-op handler, once through the CFUNCTYPE
+trampoline and once through the event queue.
+
+    python -m benchmarks.marshalling
+    python -m benchmarks.marshalling --json results.json
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from ctypes import CFUNCTYPE, Structure, addressof, byref, c_bool, c_char_p, c_int, c_uint32, c_uint64, c_void_p, \
+    cast, create_string_buffer, pointer
+
+from benchmarks import measure, measure_runs, print_table
+from steamworks import STEAMWORKS
+from steamworks.enums import EItemState, EItemUpdateStatus, SteamEventType
+from steamworks.methods import STEAMWORKS_METHODS, InputAnalogActionData_t
+from steamworks.p2p.loopback import LoopbackNetwork
+from steamworks.structs import ItemInstalled_t, P2PSessionState_t
+from steamworks.stub import StubItem, StubSteamworks
+
+ITEM = 1000001
+CONTROLLER = 7
+ACTION = 3
+BATCH = 64
+
+# Work the wrappers do besides calling the native symbol, grouped by what the request wants to tell apart
+COMPONENTS = {
+    'encode': {
+        'str.encode': lambda: 'PlayerName'.encode(),
+        'str.encode ascii': lambda: 'Move'.encode('ascii'),
+        'bytes.decode': lambda: b'/workshop/content/1000001'.decode(),
+    },
+    'enum': {
+        'EItemState(int)': lambda: EItemState(5),
+        'EItemUpdateStatus(int)': lambda: EItemUpdateStatus(5),
+    },
+    'ctypes': {
+        'create_string_buffer(1024)': lambda: create_string_buffer(1024),
+        'P2PSessionState_t()': lambda: P2PSessionState_t(),
+    },
+}
+
+
+# Python types in the method map are applied by ctypes to a C int result
+_RESULT_TYPES = {bool: c_bool, int: c_int}
+# Conversions ctypes applies to arguments of functions without argtypes
+_DEFAULT_ARGTYPES = {bytes: c_char_p, int: c_int}
+
+
+def _is_pointer(ctype: type) -> bool:
+    return ctype in (c_char_p, c_void_p) or hasattr(ctype, 'contents')
+
+
+def _callback_argument(ctype: type) -> object:
+    """Turn a pointer that arrived in the callback as an address back into what the stub implementations accept"""
+    if ctype is c_char_p:
+        return c_char_p
+
+    if hasattr(ctype, 'contents'):
+        return lambda address: cast(address, ctype) if address else None
+
+    return None
+
+
+def marshalled(name: str, implementation: object, args: tuple) -> object:
+    """C function pointer calling a stub implementation, so a call is converted by ctypes like a native one
+
+    :param name: str, STEAMWORKS_METHODS name, for argtypes and restype
+    :param implementation: callable
+    :param args: tuple of the benchmarked arguments, to derive argtypes for methods declaring none
+    :return: ctypes function, or None when the restype is a structure a callback can not return
+    """
+    attributes = STEAMWORKS_METHODS[name]
+    restype = _RESULT_TYPES.get(attributes.get('restype', c_int), attributes.get('restype', c_int))
+    if isinstance(restype, type) and issubclass(restype, Structure):
+        return None
+
+    argtypes = attributes.get('argtypes')
+    if argtypes is None:
+        argtypes = [_DEFAULT_ARGTYPES[type(argument)] for argument in args]
+
+    # Pointers reach the callback as plain addresses; results are handed back the same way and kept alive until the
+    # next call
+    converters = [_callback_argument(argtype) for argtype in argtypes]
+    returns_pointer = restype is not None and _is_pointer(restype)
+    keepalive = [None]
+
+    def callback(*arguments):
+        result = implementation(*(argument if convert is None else convert(argument)
+                                  for convert, argument in zip(converters, arguments)))
+        if not returns_pointer or result is None:
+            return result
+
+        if isinstance(result, bytes):
+            result = create_string_buffer(result)
+
+        keepalive[0] = result
+        return addressof(result)
+
+    thunk = CFUNCTYPE(c_void_p if returns_pointer else restype,
+                      *(c_void_p if _is_pointer(argtype) else argtype for argtype in argtypes))(callback)
+    # The cast result keeps the thunk alive
+    return cast(thunk, CFUNCTYPE(restype, *argtypes))
+
+
+def create_steam() -> tuple:
+    # Unreliable packets are all dropped, so the send benchmark runs the whole path without piling them up
+    stub = StubSteamworks(network=LoopbackNetwork(loss=1.0))
+    steam = STEAMWORKS(backend=stub, prebind=True)
+    stub.items[ITEM] = StubItem(EItemState.SUBSCRIBED | EItemState.INSTALLED, 4096, '/workshop/content/1000001',
+                                1700000000, 2048, 4096)
+    stub.controllers = [CONTROLLER]
+    stub.analog_actions[(CONTROLLER, ACTION)] = InputAnalogActionData_t(0, 0.25, -1.0, True)
+    stub.friends[76561197960265729] = 'Friend'
+    stub.stats['NumWins'] = 12
+    peer = stub.network.add_peer()
+    stub.peer.AcceptP2PSessionWithUser(peer.steam_id)
+    return steam, stub, peer.steam_id
+
+
+def cases(steam: STEAMWORKS, stub: StubSteamworks, peer: int) -> list:
+    """(label, kind, interface call, native symbol, native arguments, components) per benchmarked method"""
+    workshop = steam.Workshop
+    update = stub.Workshop_StartItemUpdate(steam.app_id, ITEM)
+    payload = b'x' * 64
+    session = P2PSessionState_t()
+    # Out-parameters for the native calls are prepared once, as the Workshop getters keep theirs per interface
+    disk_size, folder, timestamp = pointer(c_uint64()), create_string_buffer(1024), pointer(c_uint32())
+    downloaded, total = pointer(c_uint64()), pointer(c_uint64())
+    ticket = create_string_buffer(1024)
+    return [
+        ('Apps.IsSubscribed', 'bool getter',
+         steam.Apps.IsSubscribed, 'IsSubscribed', (), ()),
+        ('Screenshots.IsScreenshotsHooked', 'bool getter',
+         steam.Screenshots.IsScreenshotsHooked, 'IsScreenshotsHooked', (), ()),
+        ('Utils.IsOverlayEnabled', 'bool getter',
+         steam.Utils.IsOverlayEnabled, 'IsOverlayEnabled', (), ()),
+        ('Users.GetSteamID', 'int getter',
+         steam.Users.GetSteamID, 'GetSteamID', (), ()),
+        ('Music.MusicGetVolume', 'float getter',
+         steam.Music.MusicGetVolume, 'MusicGetVolume', (), ()),
+        ('Apps.GetCurrentGameLanguage', 'c_char_p return',
+         steam.Apps.GetCurrentGameLanguage, 'GetCurrentGameLanguage', (), ()),
+        ('Friends.GetPlayerName', 'c_char_p return',
+         steam.Friends.GetPlayerName, 'GetPersonaName', (), ()),
+        ('Friends.GetFriendPersonaName', 'c_char_p return',
+         lambda: steam.Friends.GetFriendPersonaName(76561197960265729),
+         'GetFriendPersonaName', (76561197960265729,), ()),
+        ('UserStats.GetStatInt', 'string argument',
+         lambda: steam.UserStats.GetStatInt(b'NumWins'), 'GetStatInt', (b'NumWins',), ()),
+        ('Input.GetActionSetHandle', 'string argument',
+         lambda: steam.Input.GetActionSetHandle('Move'), 'GetActionSetHandle', (b'Move',), ('str.encode ascii',)),
+        ('Input.GetAnalogActionData', 'struct by value',
+         lambda: steam.Input.GetAnalogActionData(CONTROLLER, ACTION),
+         'GetAnalogActionData', (CONTROLLER, ACTION), ()),
+        ('Input.GetConnectedControllers', 'pointer return',
+         steam.Input.GetConnectedControllers, 'GetConnectedControllers', (), ()),
+        ('Workshop.GetItemState', 'enum return',
+         lambda: workshop.GetItemState(ITEM), 'Workshop_GetItemState', (ITEM,), ('EItemState(int)',)),
+        ('Workshop.GetItemInstallInfo', 'out parameters',
+         lambda: workshop.GetItemInstallInfo(ITEM),
+         'Workshop_GetItemInstallInfo', (ITEM, disk_size, folder, 1024, timestamp), ('bytes.decode',)),
+        ('Workshop.GetItemDownloadInfo', 'out parameters',
+         lambda: workshop.GetItemDownloadInfo(ITEM), 'Workshop_GetItemDownloadInfo', (ITEM, downloaded, total), ()),
+        ('Workshop.GetItemUpdateProgress', 'out parameters',
+         lambda: workshop.GetItemUpdateProgress(update),
+         'Workshop_GetItemUpdateProgress', (update, downloaded, total), ('EItemUpdateStatus(int)',)),
+        ('Users.GetAuthSessionTicket', 'out parameters',
+         steam.Users.GetAuthSessionTicket, 'GetAuthSessionTicket', (ticket,), ('create_string_buffer(1024)',)),
+        ('P2PNetworking.GetP2PSessionState', 'out parameters',
+         lambda: steam.P2PNetworking.GetP2PSessionState(peer),
+         'GetP2PSessionState', (peer, byref(session)), ('P2PSessionState_t()',)),
+        ('Matchmaking.GetNumLobbyMembers', 'int getter',
+         steam.Matchmaking.GetNumLobbyMembers, 'GetNumLobbyMembers', (0,), ()),
+        ('P2PNetworking.SendP2PPacket', 'buffer argument',
+         lambda: steam.P2PNetworking.SendP2PPacket(peer, payload, 64, 0, 0),
+         'SendP2PPacket', (peer, payload, 64, 0, 0), ()),
+    ]
+
+
+def callback_cases(steam: STEAMWORKS, stub: StubSteamworks) -> list:
+    """(label, callable, events per call, ctypes conversion callable) for both ways a callback reaches Python"""
+    event = ItemInstalled_t(steam.app_id, ITEM)
+    steam.bus.subscribe(SteamEventType.ITEM_INSTALLED, lambda installed: None)
+    emit = stub._emit
+    item_installed = SteamEventType.ITEM_INSTALLED
+
+    def trampoline():
+        emit(item_installed, event, 0)
+
+    queue_steam, queue_stub, _ = create_steam()
+    queue_steam.bus.subscribe(SteamEventType.ITEM_INSTALLED, lambda installed: None)
+    queue_steam.enable_event_queue(capacity=BATCH)
+    queue_emit = queue_stub._emit
+    dispatch = queue_steam.events.dispatch
+
+    def queued():
+        for _ in range(BATCH):
+            queue_emit(item_installed, event, 0)
+
+        dispatch()
+
+    record = memoryview(bytearray(64))
+    convert = CFUNCTYPE(None, ItemInstalled_t)(lambda installed: None)
+    return [
+        ('callback, CFUNCTYPE trampoline', trampoline, 1, lambda: convert(event)),
+        ('callback, event queue', queued, BATCH, lambda: ItemInstalled_t.from_buffer_copy(record)),
+    ]
+
+
+def run(repeat: int) -> dict:
+    steam, stub, peer = create_steam()
+    component_ns = {}
+    for category, components in COMPONENTS.items():
+        for name, function in components.items():
+            component_ns[name] = (category, measure(function, repeat))
+
+    frame_baseline = measure(_Wrapper(stub).IsSubscribed, repeat) - measure(stub.IsSubscribed, repeat)
+    results = []
+    for label, kind, interface_call, name, args, components in cases(steam, stub, peer):
+        implementation = getattr(stub, name).implementation
+        native = marshalled(name, implementation, args)
+        if native is not None:
+            # The interface methods look their native symbol up on steam on every call
+            setattr(steam, name, native)
+        else:
+            native = implementation
+
+        total_runs = measure_runs(lambda: interface_call(), repeat)
+        native_runs = measure_runs(lambda: native(*args), repeat)
+        total, native_ns = min(total_runs), min(native_runs)
+        stub_ns = measure(lambda: implementation(*args), repeat)
+        split = {category: 0.0 for category in COMPONENTS}
+        for component in components:
+            category, ns = component_ns[component]
+            split[category] += ns
+
+        wrapper = total - native_ns
+        split['frames'] = wrapper - sum(split.values())
+        is_marshalled = native is not implementation
+        results.append({'case': label, 'kind': kind, 'ns_per_call': total, 'native_ns': native_ns,
+                        'native_marshalled': is_marshalled, 'stub_ns': stub_ns,
+                        'marshalling_ns': native_ns - stub_ns if is_marshalled else None, 'wrapper_ns': wrapper,
+                        'breakdown_ns': split,
+                        'noise_ns': max(total_runs) - total + max(native_runs) - native_ns})
+
+    for label, function, events, conversion in callback_cases(steam, stub):
+        results.append({'case': label, 'kind': 'callback dispatch', 'ns_per_call': measure(function, repeat) / events,
+                        'native_ns': None, 'native_marshalled': None, 'stub_ns': None, 'marshalling_ns': None,
+                        'wrapper_ns': None, 'breakdown_ns': {'ctypes': measure(conversion, repeat)},
+                        'noise_ns': None})
+
+    return {
+        'suite': 'marshalling',
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'frame_baseline_ns': frame_baseline,
+        'components_ns': {name: ns for name, (_, ns) in component_ns.items()},
+        'results': results,
+    }
+
+
+class _Wrapper(object):
+    """Interface method shape without any work besides forwarding, to price one extra Python frame"""
+
+    def __init__(self, steam: object):
+        self.steam = steam
+
+    def IsSubscribed(self) -> bool:
+        return self.steam.IsSubscribed()
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--json', metavar='PATH', help="write machine readable results, '-' for stdout")
+    parser.add_argument('--repeat', type=int, default=3, help='timing runs per measurement, the fastest counts')
+    args = parser.parse_args(argv)
+
+    report = run(args.repeat)
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return 0
+
+    rows = []
+    for result in report['results']:
+        split = result['breakdown_ns']
+        native = result['native_ns']
+        if native is not None and not result['native_marshalled']:
+            native = f'{native:.1f} (stub)'
+
+        rows.append((result['case'], result['kind'], result['ns_per_call'], native if native is not None else '',
+                     *(value if value is not None else '' for value in (result['marshalling_ns'],
+                                                                         result['wrapper_ns'])),
+                     *(split.get(column, '') for column in ('frames', 'encode', 'enum', 'ctypes')),
+                     result['noise_ns'] if result['noise_ns'] is not None else ''))
+
+    print_table(['case', 'kind', 'ns/call', 'native ns', 'marshalling ns', 'wrapper ns', 'frames ns', 'encode ns',
+                 'enum ns', 'ctypes ns', 'noise ns'], rows)
+    print(f"\none extra Python frame: {report['frame_baseline_ns']:.1f} ns")
+    print('negative differences, or ones below the noise column, are within measurement noise')
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
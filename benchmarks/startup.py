@@ -0,0 +1,94 @@
+"""
+Measure STEAMWORKS startup cost with eager and lazy symbol binding and interface construction
+
+A counting stand-in replaces the native library, so the numbers cover the Python side of startup plus the number of
+native calls (IPC round trips to the Steam client once the real library is loaded) made before the first user call.
+Resolving a symbol in a real CDLL costs a few microseconds more per function than the stand-in; with the real library
+STEAMWORKS.startup_report() gives the actual numbers, including the time spent loading it.
+
+    python -m benchmarks.startup
+"""
+import time
+
+from benchmarks import print_table
+from steamworks import STEAMWORKS
+from steamworks.events import SteamEventBus
+from steamworks.interfaces import LazyInterface
+
+# A headless server touching a few interfaces
+USED_INTERFACES = ('Workshop', 'UserStats', 'P2PNetworking')
+
+
+class CountingSymbol(object):
+    """Native function stand-in counting its calls; accepts restype / argtypes like a ctypes function"""
+
+    def __init__(self, library: object, name: str):
+        self.library = library
+        self.name = name
+
+    def __call__(self, *args):
+        self.library.calls.append(self.name)
+        return 0
+
+
+class CountingLibrary(object):
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name: str) -> CountingSymbol:
+        symbol = CountingSymbol(self, name)
+        setattr(self, name, symbol)
+        return symbol
+
+
+def start(prebind: object, interfaces: tuple) -> tuple:
+    """Bind the API and build the given interfaces the way STEAMWORKS does once the library is loaded
+
+    :param prebind: STEAMWORKS prebind argument
+    :param interfaces: tuple of interface attribute names
+    :return: tuple (STEAMWORKS.startup_report(), interface seconds, native calls)
+    """
+    library = CountingLibrary()
+    steam = STEAMWORKS.__new__(STEAMWORKS)
+    steam._supported_platforms = []
+    steam._prebind = prebind
+    steam._timings = {'load_library': 0.0, 'prebind': 0.0, 'prebound': 0, 'lazy_bind': 0.0, 'lazy_bound': 0}
+    steam.app_id = 0
+    steam.bus = SteamEventBus(steam)
+    steam.events = None
+    steam._pump = None
+    steam._call_results = None
+    steam._cdll = library
+    steam._loaded = True
+
+    steam._load_steamworks_api()
+    started = time.perf_counter()
+    for name in interfaces:
+        getattr(steam, name)
+
+    return steam.startup_report(), time.perf_counter() - started, len(library.calls)
+
+
+def best_of(prebind: object, interfaces: tuple, repeat: int = 20) -> tuple:
+    runs = [start(prebind, interfaces) for _ in range(repeat)]
+    report = min((run[0] for run in runs), key=lambda report: report['prebind'])
+    return report, min(run[1] for run in runs), runs[0][2]
+
+
+def main():
+    every_interface = tuple(name for name, value in vars(STEAMWORKS).items() if isinstance(value, LazyInterface))
+    rows = []
+    for label, prebind, interfaces in (
+            ('eager binding, all interfaces (2.0.0)', True, every_interface),
+            (f'hot set, {len(USED_INTERFACES)} interfaces used', None, USED_INTERFACES),
+            ('hot set, nothing used', None, ())):
+        report, build, calls = best_of(prebind, interfaces)
+        rows.append((label, report['prebound'], report['prebind'] * 1e6, report['lazy_bound'],
+                     report['lazy_bind'] * 1e6, build * 1e6, calls))
+
+    print_table(['startup', 'prebound', 'prebind us', 'lazy bound', 'lazy bind us', 'interfaces us',
+                 'native calls'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""
+Example echo server serving many P2P sessions from one asyncio event loop.
+"""
+
+import asyncio
+import os
+import sys
+
+if sys.version_info >= (3, 8):
+    os.add_dll_directory(os.getcwd())  # Required since Python 3.8
+
+from steamworks import STEAMWORKS  # Import main STEAMWORKS class
+from steamworks.p2p.aio import open_p2p_endpoint
+
+
+async def echo(session):
+    while True:
+        message = await session.recv()
+        print(f"Received {len(message)} bytes from user: {session.peer}")
+        await session.send(message)  # Waits while the transport applies backpressure
+
+
+async def main():
+    steamworks = STEAMWORKS()
+    steamworks.initialize()
+
+    # The endpoint runs Steam callbacks and drains channel 0 every 1/60th second on the event loop
+    endpoint = await open_p2p_endpoint(steamworks, channel=0, interval=1 / 60)
+    while True:
+        session = await endpoint.accept()
+        asyncio.create_task(echo(session))
+
+
+asyncio.run(main())
@@ -44,6 +44,12 @@ if steamworks.P2PNetworking.ReadP2PPacket(buffer, buffer_size, byref(msg_size),
 else:
     print("No P2P packet received")
 
+# Drain every pending packet on channel 0 with a single native call. The records and the memoryview are reused by
+# the next call, so copy out anything you want to keep.
+count, records, arena = steamworks.P2PNetworking.ReadP2PPackets(channel=0, max_packets=64)
+for record in records[:count]:
+    print("Batched packet from user:", record.steamIDRemote, bytes(arena[record.offset:record.offset + record.size]))
+
 # Close the P2P session with the remote user
 if steamworks.P2PNetworking.CloseP2PSessionWithUser(remote_steam_id):
     print("P2P session closed successfully with user:", remote_steam_id)
@@ -22,6 +22,12 @@
 
 #include <iostream>
 #include <string>
+#include <cstring>
+#include <atomic>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <vector>
 
 //-----------------------------------------------
 // Definitions
@@ -96,6 +102,190 @@ typedef void(*RemoteStorageUnsubscribeFileResultCallback_t)(SubscriptionResult);
 typedef void(*LeaderboardFindResultCallback_t)(LeaderboardFindResult_t);
 typedef void(*MicroTxnAuthorizationResponseCallback_t)(MicroTxnAuthorizationResponse_t);
 
+//-----------------------------------------------
+// Event Queue
+//-----------------------------------------------
+// While enabled for an event type, callback handlers append a tagged copy of the callback struct to this ring buffer
+// instead of calling into Python. Python drains all pending records with one Events_Drain call after RunCallbacks.
+#define SW_EVENT_PAYLOAD_SIZE 64
+// Largest capacity Events_Enable accepts, matches EVENT_QUEUE_MAX_CAPACITY in steamworks/events.py
+#define SW_EVENT_QUEUE_MAX_CAPACITY (1u << 20)
+
+enum SWEventType {
+    SW_EVENT_ITEM_CREATED = 1,
+    SW_EVENT_ITEM_UPDATED = 2,
+    SW_EVENT_ITEM_INSTALLED = 3,
+    SW_EVENT_ITEM_SUBSCRIBED = 4,
+    SW_EVENT_ITEM_UNSUBSCRIBED = 5,
+    SW_EVENT_LEADERBOARD_FOUND = 6,
+    SW_EVENT_MICROTXN_AUTHORIZATION = 7,
+    SW_EVENT_LOBBY_CREATED = 8,
+    SW_EVENT_LOBBY_ENTER = 9,
+    SW_EVENT_LOBBY_JOIN_REQUESTED = 10,
+    SW_EVENT_P2P_SESSION_REQUEST = 11,
+    SW_EVENT_P2P_SESSION_CONNECT_FAIL = 12
+};
+
+struct SWEventRecord {
+    std::uint32_t type;
+    std::uint32_t size;
+    // SteamAPICall_t the record answers, 0 for broadcast callbacks
+    std::uint64_t call;
+    std::uint8_t data[SW_EVENT_PAYLOAD_SIZE];
+};
+
+class EventQueue {
+public:
+    // Capacity is rounded up to a power of two; enabling again discards pending records.
+    bool Enable(uint32 capacity, uint32 typeMask) {
+        if (capacity == 0 || capacity > SW_EVENT_QUEUE_MAX_CAPACITY) {
+            return false;
+        }
+        uint32 size = 1;
+        while (size < capacity) {
+            size <<= 1;
+        }
+        std::lock_guard<std::mutex> lock(_mutex);
+        _records.assign(size, SWEventRecord());
+        _head = 0;
+        _count = 0;
+        _typeMask = typeMask;
+        return true;
+    }
+
+    void Disable() {
+        std::lock_guard<std::mutex> lock(_mutex);
+        _typeMask = 0;
+        _records.clear();
+        _head = 0;
+        _count = 0;
+    }
+
+    // Returns false if the event type is not queued, so the caller falls back to the Python callback.
+    template <typename T>
+    bool Push(uint32 type, const T &payload, SteamAPICall_t call = k_uAPICallInvalid) {
+        static_assert(sizeof(T) <= SW_EVENT_PAYLOAD_SIZE, "event payload does not fit into SWEventRecord");
+        if (!(_typeMask & (1u << type))) {
+            return false;
+        }
+        std::lock_guard<std::mutex> lock(_mutex);
+        if (_records.empty()) {
+            return false;
+        }
+        if (_count == _records.size()) {
+            _dropped++;
+            return true;
+        }
+        SWEventRecord &record = _records[(_head + _count) & (_records.size() - 1)];
+        record.type = type;
+        record.size = sizeof(T);
+        record.call = call;
+        memcpy(record.data, &payload, sizeof(T));
+        _count++;
+        return true;
+    }
+
+    // Copy up to maxRecords pending records, oldest first, into one contiguous array.
+    uint32 Drain(SWEventRecord *pRecords, uint32 maxRecords) {
+        std::lock_guard<std::mutex> lock(_mutex);
+        uint32 count = _count < maxRecords ? _count : maxRecords;
+        uint32 capacity = (uint32)_records.size();
+        uint32 first = capacity - _head < count ? capacity - _head : count;
+        if (count > 0) {
+            memcpy(pRecords, &_records[_head], first * sizeof(SWEventRecord));
+            memcpy(pRecords + first, &_records[0], (count - first) * sizeof(SWEventRecord));
+            _head = (_head + count) & (capacity - 1);
+            _count -= count;
+        }
+        return count;
+    }
+
+    uint32 Pending() {
+        std::lock_guard<std::mutex> lock(_mutex);
+        return _count;
+    }
+
+    uint64 Dropped() {
+        std::lock_guard<std::mutex> lock(_mutex);
+        return _dropped;
+    }
+
+private:
+    std::mutex _mutex;
+    std::vector<SWEventRecord> _records;
+    uint32 _head = 0;
+    uint32 _count = 0;
+    uint64 _dropped = 0;
+    std::atomic<uint32> _typeMask{0};
+};
+
+static EventQueue eventQueue;
+
+//-----------------------------------------------
+// Pending Calls
+//-----------------------------------------------
+// One CCallResult per outstanding SteamAPICall_t, so concurrent requests of the same kind no longer overwrite each
+// other. The handler receives the call handle along with the result. An entry is released on the next completion
+// instead of inside its own handler, as Steam still holds the CCallResult while the handler runs.
+template <class Owner, class Result>
+class PendingCalls {
+public:
+    typedef void (Owner::*Handler)(Result *, bool, SteamAPICall_t);
+
+    PendingCalls(Owner *owner, Handler handler) : _owner(owner), _handler(handler) {}
+
+    SteamAPICall_t Track(SteamAPICall_t call) {
+        if (call == k_uAPICallInvalid) {
+            return call;
+        }
+        Entry *entry = new Entry(this, call);
+        {
+            std::lock_guard<std::mutex> lock(_mutex);
+            _calls[call] = std::unique_ptr<Entry>(entry);
+        }
+        // Registered only once the entry is in _calls, so a result completing on the callback pump thread right away
+        // always finds it. Not under _mutex, as Complete waits for it while Steam holds its own callback lock.
+        entry->result.Set(call, entry, &Entry::OnResult);
+        return call;
+    }
+
+    uint32 Active() {
+        std::lock_guard<std::mutex> lock(_mutex);
+        return (uint32)_calls.size();
+    }
+
+private:
+    struct Entry {
+        PendingCalls *pending;
+        SteamAPICall_t call;
+        CCallResult<Entry, Result> result;
+
+        Entry(PendingCalls *pending, SteamAPICall_t call) : pending(pending), call(call) {}
+
+        void OnResult(Result *pResult, bool bIOFailure) {
+            pending->Complete(this, pResult, bIOFailure);
+        }
+    };
+
+    void Complete(Entry *entry, Result *pResult, bool bIOFailure) {
+        (_owner->*_handler)(pResult, bIOFailure, entry->call);
+        std::lock_guard<std::mutex> lock(_mutex);
+        // The previously completed entry has returned from its handler by now
+        _finished.reset();
+        auto it = _calls.find(entry->call);
+        if (it != _calls.end()) {
+            _finished = std::move(it->second);
+            _calls.erase(it);
+        }
+    }
+
+    Owner *_owner;
+    Handler _handler;
+    std::mutex _mutex;
+    std::map<SteamAPICall_t, std::unique_ptr<Entry>> _calls;
+    std::unique_ptr<Entry> _finished;
+};
+
 //-----------------------------------------------
 // Workshop Class
 //-----------------------------------------------
@@ -107,14 +297,19 @@ public:
     RemoteStorageSubscribeFileResultCallback_t _pyItemSubscribedCallback;
     RemoteStorageUnsubscribeFileResultCallback_t _pyItemUnsubscribedCallback;
 
-    CCallResult <Workshop, CreateItemResult_t> _itemCreatedCallback;
-    CCallResult <Workshop, SubmitItemUpdateResult_t> _itemUpdatedCallback;
-    CCallResult <Workshop, RemoteStorageSubscribePublishedFileResult_t> _itemSubscribedCallback;
-    CCallResult <Workshop, RemoteStorageUnsubscribePublishedFileResult_t> _itemUnsubscribedCallback;
+    PendingCalls <Workshop, CreateItemResult_t> _itemCreatedCalls;
+    PendingCalls <Workshop, SubmitItemUpdateResult_t> _itemUpdatedCalls;
+    PendingCalls <Workshop, RemoteStorageSubscribePublishedFileResult_t> _itemSubscribedCalls;
+    PendingCalls <Workshop, RemoteStorageUnsubscribePublishedFileResult_t> _itemUnsubscribedCalls;
 
     CCallback <Workshop, ItemInstalled_t> _itemInstalledCallback;
 
-    Workshop() : _itemInstalledCallback(this, &Workshop::OnItemInstalled) {}
+    Workshop() :
+        _itemCreatedCalls(this, &Workshop::OnWorkshopItemCreated),
+        _itemUpdatedCalls(this, &Workshop::OnItemUpdateSubmitted),
+        _itemSubscribedCalls(this, &Workshop::OnItemSubscribed),
+        _itemUnsubscribedCalls(this, &Workshop::OnItemUnsubscribed),
+        _itemInstalledCallback(this, &Workshop::OnItemInstalled) {}
 
     void SetItemCreatedCallback(CreateItemResultCallback_t callback) {
         _pyItemCreatedCallback = callback;
@@ -140,56 +335,52 @@ public:
         _pyItemUnsubscribedCallback = callback;
     }
 
-    void CreateItem(AppId_t consumerAppId, EWorkshopFileType fileType) {
+    SteamAPICall_t CreateItem(AppId_t consumerAppId, EWorkshopFileType fileType) {
         //TODO: Check if fileType is a valid value?
-        SteamAPICall_t createItemCall = SteamUGC()->CreateItem(consumerAppId, fileType);
-        _itemCreatedCallback.Set(createItemCall, this, &Workshop::OnWorkshopItemCreated);
+        return _itemCreatedCalls.Track(SteamUGC()->CreateItem(consumerAppId, fileType));
     }
 
-    void SubmitItemUpdate(UGCUpdateHandle_t updateHandle, const char *pChangeNote) {
-        SteamAPICall_t submitItemUpdateCall = SteamUGC()->SubmitItemUpdate(updateHandle, pChangeNote);
-        _itemUpdatedCallback.Set(submitItemUpdateCall, this, &Workshop::OnItemUpdateSubmitted);
+    SteamAPICall_t SubmitItemUpdate(UGCUpdateHandle_t updateHandle, const char *pChangeNote) {
+        return _itemUpdatedCalls.Track(SteamUGC()->SubmitItemUpdate(updateHandle, pChangeNote));
     }
 
-    void SubscribeItem(PublishedFileId_t publishedFileID) {
-        SteamAPICall_t subscribeItemCall = SteamUGC()->SubscribeItem(publishedFileID);
-        _itemSubscribedCallback.Set(subscribeItemCall, this, &Workshop::OnItemSubscribed);
+    SteamAPICall_t SubscribeItem(PublishedFileId_t publishedFileID) {
+        return _itemSubscribedCalls.Track(SteamUGC()->SubscribeItem(publishedFileID));
     }
 
-    void UnsubscribeItem(PublishedFileId_t publishedFileID) {
-        SteamAPICall_t unsubscribeItemCall = SteamUGC()->UnsubscribeItem(publishedFileID);
-        _itemUnsubscribedCallback.Set(unsubscribeItemCall, this, &Workshop::OnItemUnsubscribed);
+    SteamAPICall_t UnsubscribeItem(PublishedFileId_t publishedFileID) {
+        return _itemUnsubscribedCalls.Track(SteamUGC()->UnsubscribeItem(publishedFileID));
     }
 
 private:
-    void OnWorkshopItemCreated(CreateItemResult_t *createItemResult, bool bIOFailure) {
-        if (_pyItemCreatedCallback != nullptr) {
+    void OnWorkshopItemCreated(CreateItemResult_t *createItemResult, bool bIOFailure, SteamAPICall_t call) {
+        if (!eventQueue.Push(SW_EVENT_ITEM_CREATED, *createItemResult, call) && _pyItemCreatedCallback != nullptr) {
             _pyItemCreatedCallback(*createItemResult);
         }
     }
 
-    void OnItemUpdateSubmitted(SubmitItemUpdateResult_t *submitItemUpdateResult, bool bIOFailure) {
-        if (_pyItemUpdatedCallback != nullptr) {
+    void OnItemUpdateSubmitted(SubmitItemUpdateResult_t *submitItemUpdateResult, bool bIOFailure, SteamAPICall_t call) {
+        if (!eventQueue.Push(SW_EVENT_ITEM_UPDATED, *submitItemUpdateResult, call) && _pyItemUpdatedCallback != nullptr) {
             _pyItemUpdatedCallback(*submitItemUpdateResult);
         }
     }
 
     void OnItemInstalled(ItemInstalled_t *itemInstalledResult) {
-        if (_pyItemInstalledCallback != nullptr) {
+        if (!eventQueue.Push(SW_EVENT_ITEM_INSTALLED, *itemInstalledResult) && _pyItemInstalledCallback != nullptr) {
             _pyItemInstalledCallback(*itemInstalledResult);
         }
     }
 
-    void OnItemSubscribed(RemoteStorageSubscribePublishedFileResult_t *itemSubscribedResult, bool bIOFailure) {
-        if (_pyItemSubscribedCallback != nullptr) {
-            SubscriptionResult result{itemSubscribedResult->m_eResult, itemSubscribedResult->m_nPublishedFileId};
+    void OnItemSubscribed(RemoteStorageSubscribePublishedFileResult_t *itemSubscribedResult, bool bIOFailure, SteamAPICall_t call) {
+        SubscriptionResult result{itemSubscribedResult->m_eResult, itemSubscribedResult->m_nPublishedFileId};
+        if (!eventQueue.Push(SW_EVENT_ITEM_SUBSCRIBED, result, call) && _pyItemSubscribedCallback != nullptr) {
             _pyItemSubscribedCallback(result);
         }
     }
 
-    void OnItemUnsubscribed(RemoteStorageUnsubscribePublishedFileResult_t *itemUnsubscribedResult, bool bIOFailure) {
-        if (_pyItemUnsubscribedCallback != nullptr) {
-            SubscriptionResult result{itemUnsubscribedResult->m_eResult, itemUnsubscribedResult->m_nPublishedFileId};
+    void OnItemUnsubscribed(RemoteStorageUnsubscribePublishedFileResult_t *itemUnsubscribedResult, bool bIOFailure, SteamAPICall_t call) {
+        SubscriptionResult result{itemUnsubscribedResult->m_eResult, itemUnsubscribedResult->m_nPublishedFileId};
+        if (!eventQueue.Push(SW_EVENT_ITEM_UNSUBSCRIBED, result, call) && _pyItemUnsubscribedCallback != nullptr) {
             _pyItemUnsubscribedCallback(result);
         }
     }
@@ -204,20 +395,21 @@ class Leaderboard {
 public:
     LeaderboardFindResultCallback_t _pyLeaderboardFindResultCallback;
 
-    CCallResult <Leaderboard, LeaderboardFindResult_t> _leaderboardFindResultCallback;
+    PendingCalls <Leaderboard, LeaderboardFindResult_t> _leaderboardFindResultCalls;
+
+    Leaderboard() : _leaderboardFindResultCalls(this, &Leaderboard::OnLeaderboardFindResult) {}
 
     void SetLeaderboardFindResultCallback(LeaderboardFindResultCallback_t callback) {
         _pyLeaderboardFindResultCallback = callback;
     }
 
-    void FindLeaderboard(const char *pchLeaderboardName) {
-        SteamAPICall_t leaderboardFindResultCall = SteamUserStats()->FindLeaderboard(pchLeaderboardName);
-        _leaderboardFindResultCallback.Set(leaderboardFindResultCall, this, &Leaderboard::OnLeaderboardFindResult);
+    SteamAPICall_t FindLeaderboard(const char *pchLeaderboardName) {
+        return _leaderboardFindResultCalls.Track(SteamUserStats()->FindLeaderboard(pchLeaderboardName));
     }
 
 private:
-    void OnLeaderboardFindResult(LeaderboardFindResult_t *leaderboardFindResult, bool bIOFailure) {
-        if (_pyLeaderboardFindResultCallback != nullptr) {
+    void OnLeaderboardFindResult(LeaderboardFindResult_t *leaderboardFindResult, bool bIOFailure, SteamAPICall_t call) {
+        if (!eventQueue.Push(SW_EVENT_LEADERBOARD_FOUND, *leaderboardFindResult, call) && _pyLeaderboardFindResultCallback != nullptr) {
             _pyLeaderboardFindResultCallback(*leaderboardFindResult);
         }
     }
@@ -242,7 +434,7 @@ public:
 
 private:
     void OnAuthorizationResponse(MicroTxnAuthorizationResponse_t *authorizationResponse) {
-        if (_pyMicroTxnAuthorizationResponseCallback != nullptr) {
+        if (!eventQueue.Push(SW_EVENT_MICROTXN_AUTHORIZATION, *authorizationResponse) && _pyMicroTxnAuthorizationResponseCallback != nullptr) {
             _pyMicroTxnAuthorizationResponseCallback(*authorizationResponse);
         }
     }
@@ -312,6 +504,30 @@ SW_PY void RunCallbacks() {
     SteamAPI_RunCallbacks();
 }
 
+// Queue callbacks of the event types in typeMask (bit n for SWEventType n) instead of calling into Python.
+SW_PY bool Events_Enable(uint32 capacity, uint32 typeMask) {
+    return eventQueue.Enable(capacity, typeMask);
+}
+
+// Stop queueing callbacks and discard pending records.
+SW_PY void Events_Disable() {
+    eventQueue.Disable();
+}
+
+// Copy up to maxRecords queued events into pRecords, oldest first. Returns the number of records written.
+SW_PY uint32 Events_Drain(SWEventRecord *pRecords, uint32 maxRecords) {
+    return eventQueue.Drain(pRecords, maxRecords);
+}
+
+SW_PY uint32 Events_Pending() {
+    return eventQueue.Pending();
+}
+
+// Number of events discarded because the queue was full.
+SW_PY uint64 Events_Dropped() {
+    return eventQueue.Dropped();
+}
+
 // Shuts down the Steamworks API, releases pointers and frees memory.
 SW_PY void SteamShutdown() {
     SteamAPI_Shutdown();
@@ -805,11 +1021,12 @@ public:
     GameLobbyJoinRequestedCallback_t _pyGameLobbyJoinRequestedCallback = nullptr;
 
     // Steam API Callbacks and CallResults
-    CCallResult<Lobby, LobbyCreated_t> _lobbyCreatedCallback;
+    PendingCalls<Lobby, LobbyCreated_t> _lobbyCreatedCalls;
     CCallback<Lobby, LobbyEnter_t> _lobbyEnterCallback;          // Use CCallback (no result)
     CCallback<Lobby, GameLobbyJoinRequested_t> _gameLobbyJoinRequestedCallback;
 
     Lobby() :
+        _lobbyCreatedCalls(this, &Lobby::OnLobbyCreated),
         _lobbyEnterCallback(this, &Lobby::OnLobbyEnter),
         _gameLobbyJoinRequestedCallback(this, &Lobby::OnGameLobbyJoinRequested)
     {}
@@ -820,9 +1037,9 @@ public:
     void SetGameLobbyJoinRequestedCallback(GameLobbyJoinRequestedCallback_t callback) { _pyGameLobbyJoinRequestedCallback = callback; }
 
 
-    void CreateLobby(int lobbyType, int cMaxMembers) {
+    SteamAPICall_t CreateLobby(int lobbyType, int cMaxMembers) {
     if (SteamMatchmaking() == NULL) {
-        return;
+        return k_uAPICallInvalid;
     }
     ELobbyType eLobbyType;
     // Convert the lobby type back over
@@ -835,16 +1052,16 @@ public:
     } else {
         eLobbyType = k_ELobbyTypeInvisible;
     }
-     SteamAPICall_t createLobbyCall = SteamMatchmaking()->CreateLobby(eLobbyType, cMaxMembers);
-     _lobbyCreatedCallback.Set(createLobbyCall, this, &Lobby::OnLobbyCreated);
+     return _lobbyCreatedCalls.Track(SteamMatchmaking()->CreateLobby(eLobbyType, cMaxMembers));
     }
 
-    void JoinLobby(uint64_t steamIDLobby) {
+    // LobbyEnter_t is also broadcast to _lobbyEnterCallback, so the call is not tracked to avoid delivering it twice
+    SteamAPICall_t JoinLobby(uint64_t steamIDLobby) {
         if (SteamMatchmaking() == NULL) {
-            return;
+            return k_uAPICallInvalid;
         }
         CSteamID lobbyID(steamIDLobby);
-        SteamMatchmaking()->JoinLobby(lobbyID); // Corrected JoinLobby - removed .Set for CCallback
+        return SteamMatchmaking()->JoinLobby(lobbyID); // Corrected JoinLobby - removed .Set for CCallback
     }
 
     void LeaveLobby(uint64_t steamIDLobby) {
@@ -877,27 +1094,27 @@ public:
     }
 private:
     // Callback Handlers
-    void OnLobbyCreated(LobbyCreated_t *pLobbyCreated, bool bIOFailure) {
-        if (_pyLobbyCreatedCallback) _pyLobbyCreatedCallback(*pLobbyCreated);
+    void OnLobbyCreated(LobbyCreated_t *pLobbyCreated, bool bIOFailure, SteamAPICall_t call) {
+        if (!eventQueue.Push(SW_EVENT_LOBBY_CREATED, *pLobbyCreated, call) && _pyLobbyCreatedCallback) _pyLobbyCreatedCallback(*pLobbyCreated);
     }
 
     void OnLobbyEnter(LobbyEnter_t *pLobbyEnter) {
-        if (_pyLobbyEnterCallback) _pyLobbyEnterCallback(*pLobbyEnter);
+        if (!eventQueue.Push(SW_EVENT_LOBBY_ENTER, *pLobbyEnter) && _pyLobbyEnterCallback) _pyLobbyEnterCallback(*pLobbyEnter);
     }
 
     void OnGameLobbyJoinRequested(GameLobbyJoinRequested_t *pCallback) {
-        if (_pyGameLobbyJoinRequestedCallback) _pyGameLobbyJoinRequestedCallback(*pCallback);
+        if (!eventQueue.Push(SW_EVENT_LOBBY_JOIN_REQUESTED, *pCallback) && _pyGameLobbyJoinRequestedCallback) _pyGameLobbyJoinRequestedCallback(*pCallback);
     }
 };
 
 static Lobby lobby; // Global instance
 
-SW_PY void CreateLobby(int lobbyType, int cMaxMembers) {
-    lobby.CreateLobby(lobbyType, cMaxMembers);
+SW_PY SteamAPICall_t CreateLobby(int lobbyType, int cMaxMembers) {
+    return lobby.CreateLobby(lobbyType, cMaxMembers);
 }
 
-SW_PY void JoinLobby(uint64_t steamIDLobby) {
-    lobby.JoinLobby(steamIDLobby);
+SW_PY SteamAPICall_t JoinLobby(uint64_t steamIDLobby) {
+    return lobby.JoinLobby(steamIDLobby);
 }
 
 SW_PY void LeaveLobby(uint64_t steamIDLobby) {
@@ -1376,11 +1593,11 @@ SW_PY void Workshop_SetItemCreatedCallback(CreateItemResultCallback_t callback)
     workshop.SetItemCreatedCallback(callback);
 }
 
-SW_PY void Workshop_CreateItem(AppId_t consumerAppId, EWorkshopFileType fileType) {
+SW_PY SteamAPICall_t Workshop_CreateItem(AppId_t consumerAppId, EWorkshopFileType fileType) {
     if (SteamUGC() == NULL) {
-        return;
+        return k_uAPICallInvalid;
     }
-    workshop.CreateItem(consumerAppId, fileType);
+    return workshop.CreateItem(consumerAppId, fileType);
 }
 
 SW_PY UGCUpdateHandle_t Workshop_StartItemUpdate(AppId_t consumerAppId, PublishedFileId_t publishedFileId){
@@ -1462,25 +1679,25 @@ SW_PY void Workshop_SetItemUpdatedCallback(SubmitItemUpdateResultCallback_t call
     workshop.SetItemUpdatedCallback(callback);
 }
 
-SW_PY void Workshop_SubmitItemUpdate(UGCUpdateHandle_t updateHandle, const char *pChangeNote){
+SW_PY SteamAPICall_t Workshop_SubmitItemUpdate(UGCUpdateHandle_t updateHandle, const char *pChangeNote){
     if(SteamUGC() == NULL){
-        return;
+        return k_uAPICallInvalid;
     }
-    workshop.SubmitItemUpdate(updateHandle, pChangeNote);
+    return workshop.SubmitItemUpdate(updateHandle, pChangeNote);
 }
 
-SW_PY void Workshop_SubscribeItem(PublishedFileId_t publishedFileID){
+SW_PY SteamAPICall_t Workshop_SubscribeItem(PublishedFileId_t publishedFileID){
     if(SteamUGC() == NULL){
-        return;
+        return k_uAPICallInvalid;
     }
-    workshop.SubscribeItem(publishedFileID);
+    return workshop.SubscribeItem(publishedFileID);
 }
 
-SW_PY void Workshop_UnsubscribeItem(PublishedFileId_t publishedFileID){
+SW_PY SteamAPICall_t Workshop_UnsubscribeItem(PublishedFileId_t publishedFileID){
     if(SteamUGC() == NULL){
-        return;
+        return k_uAPICallInvalid;
     }
-    workshop.UnsubscribeItem(publishedFileID);
+    return workshop.UnsubscribeItem(publishedFileID);
 }
 
 SW_PY EItemUpdateStatus Workshop_GetItemUpdateProgress(UGCUpdateHandle_t handle, uint64 *punBytesProcessed, uint64 * punBytesTotal){
@@ -1567,11 +1784,11 @@ SW_PY void Leaderboard_SetFindLeaderboardResultCallback(LeaderboardFindResultCal
     leaderboard.SetLeaderboardFindResultCallback(callback);
 }
 
-SW_PY void Leaderboard_FindLeaderboard(const char *pchLeaderboardName) {
+SW_PY SteamAPICall_t Leaderboard_FindLeaderboard(const char *pchLeaderboardName) {
     if (SteamUserStats() == NULL) {
-        return;
+        return k_uAPICallInvalid;
     }
-    leaderboard.FindLeaderboard(pchLeaderboardName);
+    return leaderboard.FindLeaderboard(pchLeaderboardName);
 }
 
 //-----------------------------------------------
@@ -1584,10 +1801,96 @@ SW_PY void MicroTxn_SetAuthorizationResponseCallback(MicroTxnAuthorizationRespon
     microtxn.SetAuthorizationResponseCallback(callback);
 }
 
+//-----------------------------------------------
+// Pending call results
+//-----------------------------------------------
+// Number of call results still waiting for Steam, so a callback pump can run faster while requests are in flight.
+SW_PY uint32 PendingCallResults() {
+    return workshop._itemCreatedCalls.Active()
+        + workshop._itemUpdatedCalls.Active()
+        + workshop._itemSubscribedCalls.Active()
+        + workshop._itemUnsubscribedCalls.Active()
+        + leaderboard._leaderboardFindResultCalls.Active()
+        + lobby._lobbyCreatedCalls.Active();
+}
+
 /////////////////////////////////////////////////
 ///// P2P NETWORKING ////////////////////////////
 /////////////////////////////////////////////////
 //
+// Plain copies of the Steam callback structs, CSteamID is flattened to uint64 for Python
+struct P2PSessionRequest {
+    std::uint64_t steamIDRemote;
+};
+
+struct P2PSessionConnectFail {
+    std::uint64_t steamIDRemote;
+    std::uint8_t eP2PSessionError;
+};
+
+typedef void(*P2PSessionRequestCallback_t)(P2PSessionRequest);
+typedef void(*P2PSessionConnectFailCallback_t)(P2PSessionConnectFail);
+
+class P2PNetworking {
+public:
+    P2PSessionRequestCallback_t _pySessionRequestCallback = nullptr;
+    P2PSessionConnectFailCallback_t _pySessionConnectFailCallback = nullptr;
+
+    CCallback <P2PNetworking, P2PSessionRequest_t> _sessionRequestCallback;
+    CCallback <P2PNetworking, P2PSessionConnectFail_t> _sessionConnectFailCallback;
+
+    P2PNetworking() :
+        _sessionRequestCallback(this, &P2PNetworking::OnSessionRequest),
+        _sessionConnectFailCallback(this, &P2PNetworking::OnSessionConnectFail)
+    {}
+
+    void SetSessionRequestCallback(P2PSessionRequestCallback_t callback) { _pySessionRequestCallback = callback; }
+    void SetSessionConnectFailCallback(P2PSessionConnectFailCallback_t callback) { _pySessionConnectFailCallback = callback; }
+
+private:
+    void OnSessionRequest(P2PSessionRequest_t *pCallback) {
+        P2PSessionRequest result{pCallback->m_steamIDRemote.ConvertToUint64()};
+        if (!eventQueue.Push(SW_EVENT_P2P_SESSION_REQUEST, result) && _pySessionRequestCallback != nullptr) {
+            _pySessionRequestCallback(result);
+        }
+    }
+
+    void OnSessionConnectFail(P2PSessionConnectFail_t *pCallback) {
+        P2PSessionConnectFail result{pCallback->m_steamIDRemote.ConvertToUint64(), pCallback->m_eP2PSessionError};
+        if (!eventQueue.Push(SW_EVENT_P2P_SESSION_CONNECT_FAIL, result) && _pySessionConnectFailCallback != nullptr) {
+            _pySessionConnectFailCallback(result);
+        }
+    }
+};
+
+static P2PNetworking p2pNetworking;
+
+SW_PY void P2P_SetSessionRequestCallback(P2PSessionRequestCallback_t callback) {
+    p2pNetworking.SetSessionRequestCallback(callback);
+}
+
+SW_PY void P2P_SetSessionConnectFailCallback(P2PSessionConnectFailCallback_t callback) {
+    p2pNetworking.SetSessionConnectFailCallback(callback);
+}
+
+// Accept an incoming session request; only needed in response to a session request callback.
+SW_PY bool AcceptP2PSessionWithUser(uint64_t steamIDRemote) {
+    if (SteamNetworking() == NULL) {
+        return false;
+    }
+    CSteamID remoteID(steamIDRemote);
+    return SteamNetworking()->AcceptP2PSessionWithUser(remoteID);
+}
+
+// Fill in the state of the session with a user; returns false if there is no session.
+SW_PY bool GetP2PSessionState(uint64_t steamIDRemote, P2PSessionState_t *pConnectionState) {
+    if (SteamNetworking() == NULL) {
+        return false;
+    }
+    CSteamID remoteID(steamIDRemote);
+    return SteamNetworking()->GetP2PSessionState(remoteID, pConnectionState);
+}
+
 // Create a P2P session with a specified user.
 SW_PY bool CreateP2PSessionWithUser(uint64_t steamIDRemote) {
     if (SteamNetworking() == NULL) {
@@ -1615,6 +1918,34 @@ SW_PY bool SendP2PPacket(uint64_t steamIDRemote, const void *pubData, uint32 cub
     return SteamNetworking()->SendP2PPacket(remoteID, pubData, cubData, EP2PSend(eP2PSendType), eP2PChannel);
 }
 
+// Descriptor of one packet sent by SendP2PPackets; pubData points straight into the caller's buffer.
+struct P2PSendItem {
+    std::uint64_t steamIDRemote;
+    const void *pubData;
+    std::uint32_t cubData;
+    std::int32_t eP2PSendType;
+    std::int32_t eP2PChannel;
+};
+
+// Send a batch of P2P packets with a single call.
+// Bit i of pResultBits ((itemCount + 7) / 8 bytes) is set when item i was accepted. Returns the number of sent items.
+SW_PY uint32 SendP2PPackets(const P2PSendItem *pItems, uint32 itemCount, uint8 *pResultBits) {
+    memset(pResultBits, 0, (itemCount + 7) / 8);
+    if (SteamNetworking() == NULL) {
+        return 0;
+    }
+    uint32 sent = 0;
+    for (uint32 i = 0; i < itemCount; i++) {
+        const P2PSendItem &item = pItems[i];
+        CSteamID remoteID(item.steamIDRemote);
+        if (SteamNetworking()->SendP2PPacket(remoteID, item.pubData, item.cubData, EP2PSend(item.eP2PSendType), item.eP2PChannel)) {
+            pResultBits[i >> 3] |= (uint8)(1 << (i & 7));
+            sent++;
+        }
+    }
+    return sent;
+}
+
 // Read a P2P packet from the incoming queue.
 SW_PY bool ReadP2PPacket(void *pubDest, uint32 cubDest, uint32 *pcubMsgSize, uint64_t *psteamIDRemote, uint8 eP2PChannel) {
     if (SteamNetworking() == NULL) {
@@ -1626,6 +1957,43 @@ SW_PY bool ReadP2PPacket(void *pubDest, uint32 cubDest, uint32 *pcubMsgSize, uin
     return result;
 }
 
+// Record describing one packet drained by ReadP2PPackets; offset is relative to the start of the arena.
+struct P2PPacketRecord {
+    std::uint64_t steamIDRemote;
+    std::uint32_t offset;
+    std::uint32_t size;
+};
+
+// Drain up to maxPackets pending packets of a channel into a single arena.
+// Returns the number of records written. If the next pending packet does not fit into the remaining arena space its
+// size is stored in pcubNextMsgSize and it is left in the queue, so the caller can grow the arena and call again.
+SW_PY uint32 ReadP2PPackets(void *pubArena, uint32 cubArena, P2PPacketRecord *pRecords, uint32 maxPackets, uint32 *pcubNextMsgSize, uint8 eP2PChannel) {
+    *pcubNextMsgSize = 0;
+    if (SteamNetworking() == NULL) {
+        return 0;
+    }
+    uint32 count = 0;
+    uint32 offset = 0;
+    uint32 msgSize = 0;
+    while (count < maxPackets && SteamNetworking()->IsP2PPacketAvailable(&msgSize, eP2PChannel)) {
+        if (msgSize > cubArena - offset) {
+            *pcubNextMsgSize = msgSize;
+            break;
+        }
+        CSteamID remoteID;
+        uint32 readSize = 0;
+        if (!SteamNetworking()->ReadP2PPacket((uint8 *)pubArena + offset, cubArena - offset, &readSize, &remoteID, eP2PChannel)) {
+            break;
+        }
+        pRecords[count].steamIDRemote = remoteID.ConvertToUint64();
+        pRecords[count].offset = offset;
+        pRecords[count].size = readSize;
+        offset += readSize;
+        count++;
+    }
+    return count;
+}
+
 SW_PY uint64_t Convert32BitTo64BitSteamID(uint32_t accountID) {
     // Construct a SteamID for an individual user.
     CSteamID steamID(accountID, k_EUniversePublic, k_EAccountTypeIndividual);
@@ -0,0 +1,549 @@
+"""
+Sharing one Steam API session between processes
+
+The Steam API belongs to the process that initialized it: one SteamInit, one RunCallbacks loop. SteamBroker runs in
+that process, owns its STEAMWORKS and serves interface calls from SteamBrokerClient proxies in other processes, e.g.
+the workers of a multiprocessing pool, over a multiprocessing.connection channel (a Unix socket, or a named pipe on
+Windows). Every connection has to authenticate with the broker authkey, by default the multiprocessing authkey that
+processes started through multiprocessing inherit:
+
+    broker = SteamBroker(steam, address='/tmp/steam.sock')
+    broker.start()
+
+    # in a worker
+    client = SteamBrokerClient('/tmp/steam.sock')
+    client.Workshop.GetItemState(item_id)
+
+Proxy calls block until the broker answers. submit() sends a call without waiting and returns a future, so a worker
+can keep many requests in flight, and calls submitted inside client.batch() leave as one message. The broker runs
+everything that arrived since its last iteration, runs Steam callbacks at callback_interval and answers each client
+with one message per iteration. *Async methods resolve their client future once the Steam call result arrives.
+
+Callbacks reach workers through client.bus, which has the SteamEventBus interface. The first subscription to an event
+type asks the broker to forward it; field and predicate filters are applied in the worker, and client.run_callbacks()
+dispatches the received events on the calling thread. Set*Callback methods can not be called through a proxy, since
+handlers can not cross the process boundary.
+
+Arguments, results and exceptions travel pickled, so only share the authkey with processes you trust.
+"""
+import pickle
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from ctypes import Array, _Pointer, _SimpleCData
+from itertools import count
+from multiprocessing import AuthenticationError, current_process
+from multiprocessing.connection import Client, Listener, wait
+
+from steamworks.enums import SteamEventType
+from steamworks.events import EVENT_STRUCTS, SteamEventBus
+from steamworks.exceptions import GenericSteamException, SteamBrokerException
+from steamworks.interfaces import LazyInterface
+
+
+def _portable(value: object) -> object:
+    """Convert results that do not pickle, ctypes arrays, pointers and memoryviews, into lists, values and bytes"""
+    if isinstance(value, Array):
+        return [_portable(element) for element in value]
+
+    if isinstance(value, _Pointer):
+        return _portable(value.contents) if value else None
+
+    if isinstance(value, _SimpleCData):
+        return value.value
+
+    if isinstance(value, memoryview):
+        return value.tobytes()
+
+    if isinstance(value, (tuple, list)):
+        return type(value)(_portable(element) for element in value)
+
+    if isinstance(value, dict):
+        return {key: _portable(element) for key, element in value.items()}
+
+    return value
+
+
+def _portable_error(error: Exception) -> Exception:
+    try:
+        pickle.dumps(error)
+    except Exception:
+        return GenericSteamException(f'{type(error).__name__}: {error}')
+
+    return error
+
+
+def _require_authkey(authkey: bytes) -> bytes:
+    # Listener and Client skip authentication entirely without a key, so None must not reach them
+    if authkey is None:
+        authkey = current_process().authkey
+
+    if not authkey:
+        raise AttributeError('The broker channel needs a non empty authkey')
+
+    return bytes(authkey)
+
+
+def _dumps(messages: list) -> bytes:
+    return pickle.dumps(messages, pickle.HIGHEST_PROTOCOL)
+
+
+def _picklable(message: tuple) -> tuple:
+    """Replace a result that still does not pickle with an error the client can receive"""
+    try:
+        pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+    except Exception as error:
+        return 'result', message[1], False, GenericSteamException(f'The result could not be sent: {error}')
+
+    return message
+
+
+class _ClientState(object):
+    __slots__ = ('outbox', 'event_types')
+
+    def __init__(self):
+        self.outbox = []
+        self.event_types = set()
+
+
+class SteamBroker(object):
+    """Serves the interfaces of one STEAMWORKS instance to SteamBrokerClient proxies in other processes"""
+
+    def __init__(self, steam: object, address: object = None, authkey: bytes = None,
+                 callback_interval: float = 1 / 60, clock: object = time.monotonic):
+        """
+        :param steam: STEAMWORKS, initialized; only the broker thread may use it once the broker runs
+        :param address: str or tuple, Unix socket path, named pipe or (host, port); None picks a free Unix socket
+        :param authkey: bytes, key clients have to present; None uses multiprocessing.current_process().authkey,
+                        which processes started through multiprocessing inherit. An empty key is refused
+        :param callback_interval: float, seconds between two run_callbacks() calls
+        :param clock: callable returning the current time in seconds
+        """
+        if callback_interval <= 0:
+            raise AttributeError('Callback interval must be positive')
+
+        self.steam = steam
+        self.callback_interval = callback_interval
+        self.clock = clock
+        self.requests = 0
+        self.error = None
+
+        owner = type(steam)
+        self._interfaces = frozenset(name for name in dir(owner)
+                                     if isinstance(getattr(owner, name, None), LazyInterface))
+        self._authkey = _require_authkey(authkey)
+        self._listener = Listener(address, authkey=self._authkey)
+        self.address = self._listener.address
+
+        self._clients = {}
+        self._accepted = deque()
+        # (connection, request id, future) of *Async calls whose Steam call result arrived
+        self._completed = deque()
+        self._forwarded = {}
+        self._stopping = threading.Event()
+        self._thread = None
+        self._acceptor = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def clients(self) -> int:
+        return len(self._clients)
+
+    def start(self) -> None:
+        """Serve on a background thread, which then owns the STEAMWORKS instance
+
+        :return: None
+        """
+        if self.running:
+            return
+
+        self._thread = threading.Thread(target=self.serve_forever, name='steamworks-broker', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None) -> bool:
+        """Stop serving, close every client connection and the listener
+
+        :param timeout: float, seconds to wait for the broker thread, None to wait as long as it takes
+        :return: bool, True once the broker thread has exited
+        """
+        self._stopping.set()
+        thread = self._thread
+        if thread is None or thread is threading.current_thread():
+            return True
+
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def serve_forever(self) -> None:
+        """Serve clients on the calling thread until stop() is called
+
+        :return: None
+        """
+        self._stopping.clear()
+        self._acceptor = threading.Thread(target=self._accept, name='steamworks-broker-accept', daemon=True)
+        self._acceptor.start()
+        deadline = self.clock()
+        try:
+            while not self._stopping.is_set():
+                while self._accepted:
+                    self._clients[self._accepted.popleft()] = _ClientState()
+
+                timeout = max(deadline - self.clock(), 0.0)
+                if self._clients:
+                    for connection in wait(list(self._clients), timeout):
+                        self._receive(connection)
+                else:
+                    self._stopping.wait(timeout)
+
+                now = self.clock()
+                if now >= deadline:
+                    self.steam.run_callbacks()
+                    deadline = max(deadline + self.callback_interval, now)
+
+                while self._completed:
+                    connection, request_id, future = self._completed.popleft()
+                    state = self._clients.get(connection)
+                    if state is not None:
+                        state.outbox.append(self._answer(request_id, future))
+
+                self._flush()
+        except Exception as error:
+            self.error = error
+            raise
+        finally:
+            self._wake_acceptor()
+            self._listener.close()
+            for connection in list(self._clients):
+                self._drop(connection)
+
+            while self._accepted:
+                self._accepted.popleft().close()
+
+    def _accept(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                connection = self._listener.accept()
+            except (AuthenticationError, EOFError):
+                continue
+            except OSError:
+                # The listener was closed by stop()
+                return
+
+            self._accepted.append(connection)
+
+    def _wake_acceptor(self) -> None:
+        # Closing the listener does not interrupt an accept() blocked on another thread, one last connection does
+        try:
+            Client(self.address, authkey=self._authkey).close()
+        except (AuthenticationError, EOFError, OSError):
+            pass
+
+        self._acceptor.join()
+
+    def _receive(self, connection: object) -> None:
+        state = self._clients[connection]
+        try:
+            while connection.poll():
+                message = connection.recv()
+                if message[0] == 'call':
+                    for request in message[1]:
+                        answer = self._call(connection, *request)
+                        if answer is not None:
+                            state.outbox.append(answer)
+
+                elif message[0] == 'subscribe':
+                    event_type = SteamEventType(message[1])
+                    state.event_types.add(event_type)
+                    self._forward(event_type)
+        except (EOFError, OSError):
+            self._drop(connection)
+
+    def _call(self, connection: object, request_id: int, interface: str, method: str, args: tuple,
+              kwargs: dict) -> tuple:
+        self.requests += 1
+        try:
+            if interface not in self._interfaces:
+                raise AttributeError(f'STEAMWORKS has no interface {interface!r}')
+
+            if method.startswith('_') or (method.startswith('Set') and method.endswith('Callback')):
+                raise AttributeError(f'{interface}.{method} can not be called through the broker, subscribe to '
+                                     f'events with SteamBrokerClient.bus instead')
+
+            result = getattr(getattr(self.steam, interface), method)(*args, **kwargs)
+        except Exception as error:
+            return 'result', request_id, False, _portable_error(error)
+
+        if isinstance(result, Future):
+            result.add_done_callback(lambda future: self._completed.append((connection, request_id, future)))
+            return None
+
+        return 'result', request_id, True, _portable(result)
+
+    def _answer(self, request_id: int, future: Future) -> tuple:
+        if future.cancelled():
+            return 'result', request_id, False, SteamBrokerException('The call was cancelled by the broker')
+
+        error = future.exception()
+        if error is not None:
+            return 'result', request_id, False, _portable_error(error)
+
+        return 'result', request_id, True, _portable(future.result())
+
+    def _forward(self, event_type: SteamEventType) -> None:
+        if event_type in self._forwarded:
+            return
+
+        def forward(event):
+            message = ('event', event_type.value, bytes(event))
+            for state in self._clients.values():
+                if event_type in state.event_types:
+                    state.outbox.append(message)
+
+        self._forwarded[event_type] = self.steam.bus.subscribe(event_type, forward)
+
+    def _flush(self) -> None:
+        for connection, state in list(self._clients.items()):
+            if not state.outbox:
+                continue
+
+            outbox, state.outbox = state.outbox, []
+            try:
+                payload = _dumps(outbox)
+            except Exception:
+                payload = _dumps([_picklable(message) for message in outbox])
+
+            try:
+                connection.send_bytes(payload)
+            except (EOFError, OSError):
+                self._drop(connection)
+
+    def _drop(self, connection: object) -> None:
+        self._clients.pop(connection, None)
+        connection.close()
+
+
+class _BrokerEventBus(SteamEventBus):
+    """SteamEventBus of a client, registering event types with the broker instead of the native library"""
+
+    def _register(self, event_type: SteamEventType, struct_type: type) -> None:
+        if event_type in self._trampolines:
+            return
+
+        self._trampolines[event_type] = struct_type
+        self.steam._send(('subscribe', event_type.value))
+
+
+class _InterfaceProxy(object):
+    """Stands in for a STEAMWORKS interface, every method call runs in the broker"""
+
+    def __init__(self, client: object, interface: str):
+        self._client = client
+        self._interface = interface
+
+    def __repr__(self) -> str:
+        return f'<{self._interface} proxy>'
+
+    def __getattr__(self, method: str) -> object:
+        if method.startswith('_'):
+            raise AttributeError(method)
+
+        def call(*args, **kwargs):
+            return self._client.call(self._interface, method, *args, **kwargs)
+
+        call.__name__ = method
+        setattr(self, method, call)
+        return call
+
+
+class SteamBrokerClient(object):
+    """Connection to a SteamBroker, with proxies standing in for the STEAMWORKS interfaces"""
+
+    # Seconds the reader thread waits for a message before checking whether close() was called
+    CLOSE_POLL_INTERVAL = 0.05
+
+    def __init__(self, address: object, authkey: bytes = None, timeout: float = None):
+        """
+        :param address: SteamBroker.address
+        :param authkey: bytes, the broker authkey; None uses multiprocessing.current_process().authkey
+        :param timeout: float, seconds proxy calls wait for their result, None to wait as long as it takes
+        """
+        self.address = address
+        self.timeout = timeout
+        self.bus = _BrokerEventBus(self)
+
+        self._connection = Client(address, authkey=_require_authkey(authkey))
+        self._lock = threading.Lock()
+        self._ids = count(1)
+        self._pending = {}
+        self._batch = None
+        self._events = queue.SimpleQueue()
+        self._closed = False
+        self._reader = threading.Thread(target=self._read, name='steamworks-broker-client', daemon=True)
+        self._reader.start()
+
+    def __enter__(self) -> object:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __getattr__(self, name: str) -> object:
+        # Interfaces are capitalized like the STEAMWORKS attributes, e.g. client.Workshop
+        if not name[:1].isupper():
+            raise AttributeError(name)
+
+        proxy = _InterfaceProxy(self, name)
+        setattr(self, name, proxy)
+        return proxy
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def submit(self, interface: str, method: str, *args, **kwargs) -> Future:
+        """Send an interface call to the broker without waiting for its result
+
+        :param interface: str, STEAMWORKS interface attribute, e.g. 'Workshop'
+        :param method: str, interface method, e.g. 'GetItemState'
+        :return: concurrent.futures.Future, resolved with the result or the exception the call raised
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise SteamBrokerException('The connection to the broker is closed')
+
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            request = (request_id, interface, method, args, kwargs)
+            if self._batch is not None:
+                self._batch.append(request)
+            else:
+                self._send_locked(('call', [request]))
+
+        return future
+
+    def call(self, interface: str, method: str, *args, **kwargs) -> object:
+        """Run an interface call in the broker and wait for its result
+
+        :param interface: str, STEAMWORKS interface attribute, e.g. 'Workshop'
+        :param method: str, interface method, e.g. 'GetItemState'
+        :return: the result of the call
+        """
+        future = self.submit(interface, method, *args, **kwargs)
+        # Waiting on a call still held back by batch() would never return
+        self.flush()
+        return future.result(self.timeout)
+
+    @contextmanager
+    def batch(self) -> object:
+        """Hold back calls submitted inside the block and send them as one message when it ends
+
+        :return: context manager
+        """
+        with self._lock:
+            outer = self._batch is not None
+            if not outer:
+                self._batch = []
+
+        try:
+            yield self
+        finally:
+            if not outer:
+                self.flush()
+                with self._lock:
+                    self._batch = None
+
+    def flush(self) -> None:
+        """Send the calls batch() has held back so far
+
+        :return: None
+        """
+        with self._lock:
+            if self._batch:
+                requests, self._batch = self._batch, []
+                self._send_locked(('call', requests))
+
+    def run_callbacks(self, timeout: float = None) -> int:
+        """Dispatch the events the broker forwarded on the bus, on the calling thread
+
+        :param timeout: float, seconds to wait for the first event, None to return right away if there is none
+        :return: int, number of events dispatched
+        """
+        try:
+            message = self._events.get(timeout is not None, timeout)
+        except queue.Empty:
+            return 0
+
+        dispatched = 0
+        while True:
+            event_type = SteamEventType(message[1])
+            self.bus.publish(event_type, EVENT_STRUCTS[event_type].from_buffer_copy(message[2]))
+            dispatched += 1
+            try:
+                message = self._events.get_nowait()
+            except queue.Empty:
+                return dispatched
+
+    def close(self) -> None:
+        """Close the connection; calls still waiting for a result fail with SteamBrokerException
+
+        :return: None
+        """
+        with self._lock:
+            self._closed = True
+
+        # The reader thread closes the connection, a blocking recv() would not notice it being closed under it
+        if self._reader is not threading.current_thread():
+            self._reader.join()
+
+    def _send(self, message: tuple) -> None:
+        with self._lock:
+            self._send_locked(message)
+
+    def _send_locked(self, message: tuple) -> None:
+        if self._closed:
+            raise SteamBrokerException('The connection to the broker is closed')
+
+        try:
+            self._connection.send(message)
+        except (EOFError, OSError) as error:
+            raise SteamBrokerException(f'Lost the connection to the broker: {error}') from error
+
+    def _read(self) -> None:
+        try:
+            while not self._closed:
+                if not self._connection.poll(self.CLOSE_POLL_INTERVAL):
+                    continue
+
+                for message in self._connection.recv():
+                    if message[0] != 'result':
+                        self._events.put(message)
+                        continue
+
+                    with self._lock:
+                        future = self._pending.pop(message[1], None)
+
+                    if future is None or future.done():
+                        continue
+
+                    if message[2]:
+                        future.set_result(message[3])
+                    else:
+                        future.set_exception(message[3])
+        except (EOFError, OSError):
+            pass
+        finally:
+            with self._lock:
+                self._closed = True
+                pending, self._pending = self._pending, {}
+                self._connection.close()
+
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(SteamBrokerException('Lost the connection to the broker'))
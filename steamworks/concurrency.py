@@ -0,0 +1,62 @@
+"""
+Thread-safe mode of STEAMWORKS
+
+STEAMWORKS(thread_safe=True) can be shared by any number of threads, e.g. to move Steam calls off a render thread:
+
+- Every interface is built as a subclass holding its own RLock for the duration of each public method call, and of
+  each private method listed in its _SYNCHRONIZED_METHODS, e.g. the instrumented P2P methods EnableStats() installs on
+  the instance. State an interface keeps in Python, like callback subscriptions, P2P stats or pending item updates, is
+  changed by one thread at a time, while calls into different interfaces still run in parallel.
+- Binding native functions, building interfaces and creating the call result tracker happen once, under the
+  STEAMWORKS lock.
+- Callbacks are confined to one thread. start_callback_pump() dispatches them on the pump thread, after which
+  run_callbacks() returns right away on any thread; without the pump the first thread calling run_callbacks() becomes
+  the callback thread and any other thread calling it gets a GenericSteamException.
+- State that callbacks change is published as an immutable snapshot replaced as a whole, e.g.
+  SteamMatchmaking.GetLobbySnapshot(), so readers never see it half updated and need no lock.
+
+initialize(), unload(), enable_event_queue() and starting or stopping the pump change the whole instance and are
+meant to be called by one thread, before or after the others use it.
+"""
+import threading
+from functools import wraps
+from types import FunctionType
+
+_synchronized = {}
+
+
+def _locked(method: object) -> object:
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return locked
+
+
+def synchronized(interface_class: type) -> type:
+    """Subclass of an interface class serializing its public methods with a lock per instance
+
+    Private methods are left alone unless the interface class names them in _SYNCHRONIZED_METHODS.
+
+    :param interface_class: type, e.g. SteamWorkshop
+    :return: type, created once per interface class
+    """
+    subclass = _synchronized.get(interface_class)
+    if subclass is not None:
+        return subclass
+
+    def __init__(self, steam):
+        # Before the interface __init__, which may already call public methods
+        self._lock = threading.RLock()
+        interface_class.__init__(self, steam)
+
+    namespace = {'__init__': __init__, '__doc__': interface_class.__doc__, '__module__': interface_class.__module__}
+    private = getattr(interface_class, '_SYNCHRONIZED_METHODS', ())
+    for base in reversed(interface_class.__mro__[:-1]):
+        for name, value in vars(base).items():
+            if (not name.startswith('_') or name in private) and isinstance(value, FunctionType):
+                namespace[name] = _locked(value)
+
+    subclass = _synchronized[interface_class] = type(interface_class.__name__, (interface_class,), namespace)
+    return subclass
@@ -0,0 +1,482 @@
+"""
+STEAMWORKS, the entry point binding the native SteamworksPy library
+"""
+import os
+import sys
+import threading
+import time
+from ctypes import CDLL, cdll
+
+from steamworks.enums import Arch, SteamEventType
+from steamworks.events import SteamEventBus, SteamEventQueue
+from steamworks.exceptions import GenericSteamException, MissingSteamworksLibraryException, SteamConnectionException, \
+    SteamNotLoadedException, SteamNotRunningException, UnsupportedPlatformException
+from steamworks.interfaces import LazyInterface
+from steamworks.methods import STEAMWORKS_HOT_METHODS, STEAMWORKS_METHODS
+from steamworks.util import get_arch
+
+
+class STEAMWORKS(object):
+    """
+        Primary STEAMWORKS class used for fundamental handling of the STEAMWORKS API
+    """
+    _arch = get_arch()
+    _native_supported_platforms = ['linux', 'linux2', 'darwin', 'win32']
+
+    # Imported and built on first access, so processes only pay for the interfaces (and their IPC calls) they use
+    Apps            = LazyInterface('steamworks.interfaces.apps', 'SteamApps')
+    Friends         = LazyInterface('steamworks.interfaces.friends', 'SteamFriends')
+    Matchmaking     = LazyInterface('steamworks.interfaces.matchmaking', 'SteamMatchmaking')
+    Music           = LazyInterface('steamworks.interfaces.music', 'SteamMusic')
+    Screenshots     = LazyInterface('steamworks.interfaces.screenshots', 'SteamScreenshots')
+    Users           = LazyInterface('steamworks.interfaces.users', 'SteamUsers')
+    UserStats       = LazyInterface('steamworks.interfaces.userstats', 'SteamUserStats')
+    Utils           = LazyInterface('steamworks.interfaces.utils', 'SteamUtils')
+    Workshop        = LazyInterface('steamworks.interfaces.workshop', 'SteamWorkshop')
+    MicroTxn        = LazyInterface('steamworks.interfaces.microtxn', 'SteamMicroTxn')
+    Input           = LazyInterface('steamworks.interfaces.input', 'SteamInput')
+    P2PNetworking   = LazyInterface('steamworks.interfaces.p2p_networking', 'SteamP2PNetworking')
+
+    def __init__(self, supported_platforms: list = [], prebind: object = None, backend: object = None,
+                 thread_safe: bool = False) -> None:
+        """
+        :param supported_platforms: list of sys.platform values to allow, all natively supported ones if empty
+        :param prebind: iterable of STEAMWORKS_METHODS names to bind while loading, True for all of them,
+                        None for STEAMWORKS_HOT_METHODS; every other function is bound on first use
+        :param backend: object providing the native symbols instead of the SteamworksPy library, e.g.
+                        steamworks.stub.StubSteamworks, or 'stub' for a default one
+        :param thread_safe: bool, make the instance safe to share between threads, see steamworks.concurrency
+        """
+        self._supported_platforms = supported_platforms
+        self._prebind   = prebind
+        self._backend   = backend
+        self._loaded 	= False
+        self._cdll 		= None
+        self._timings   = {'load_library': 0.0, 'prebind': 0.0, 'prebound': 0, 'lazy_bind': 0.0, 'lazy_bound': 0}
+
+        self.app_id 	= 0
+        self.bus        = SteamEventBus(self)
+        self.events     = None
+        self._pump      = None
+        self._call_results = None
+        self.profiler   = None
+        self.lock       = threading.RLock() if thread_safe else None
+        self._callback_thread = None
+
+        self._initialize()
+
+
+    def _initialize(self) -> bool:
+        """Initialize module by loading STEAMWORKS library
+
+        :return: bool
+        """
+        if self._backend is not None:
+            return self._initialize_backend()
+
+        platform = sys.platform
+        if self._supported_platforms and platform not in self._supported_platforms:
+            raise UnsupportedPlatformException(f'"{platform}" has been excluded')
+
+        if platform not in STEAMWORKS._native_supported_platforms:
+            raise UnsupportedPlatformException(f'"{platform}" is not being supported')
+
+        library_file_name = ''
+        if platform in ['linux', 'linux2']:
+            library_file_name = 'SteamworksPy.so'
+            if os.path.isfile(os.path.join(os.getcwd(), 'libsteam_api.so')):
+                cdll.LoadLibrary(os.path.join(os.getcwd(), 'libsteam_api.so')) #if i do this then linux works
+            elif os.path.isfile(os.path.join(os.path.dirname(__file__), 'libsteam_api.so')):
+                cdll.LoadLibrary(os.path.join(os.path.dirname(__file__), 'libsteam_api.so'))
+            else:
+                raise MissingSteamworksLibraryException(f'Missing library "libsteam_api.so"')
+
+        elif platform == 'darwin':
+            library_file_name = 'SteamworksPy.dylib'
+
+        elif platform == 'win32':
+            library_file_name = 'SteamworksPy.dll' if STEAMWORKS._arch == Arch.x86 else 'SteamworksPy64.dll'
+
+        else:
+            # This case is theoretically unreachable
+            raise UnsupportedPlatformException(f'"{platform}" is not being supported')
+
+        if os.path.isfile(os.path.join(os.getcwd(), library_file_name)):
+            library_path = os.path.join(os.getcwd(), library_file_name)
+        elif os.path.isfile(os.path.join(os.path.dirname(__file__), library_file_name)):
+            library_path = os.path.join(os.path.dirname(__file__), library_file_name)
+        else:
+            raise MissingSteamworksLibraryException(f'Missing library {library_file_name}')
+
+        app_id_file = os.path.join(os.getcwd(), 'steam_appid.txt')
+        if not os.path.isfile(app_id_file):
+            raise FileNotFoundError(f'steam_appid.txt missing from {os.getcwd()}')
+
+        with open(app_id_file, 'r') as f:
+            self.app_id	= int(f.read())
+
+        started = time.perf_counter()
+        self._cdll 		= CDLL(library_path) # Throw native exception in case of error
+        self._loaded 	= True
+        self._timings['load_library'] = time.perf_counter() - started
+
+        self._load_steamworks_api()
+        return self._loaded
+
+
+    def _initialize_backend(self) -> bool:
+        """Use a stand-in backend instead of loading the SteamworksPy library
+
+        :return: bool
+        """
+        backend = self._backend
+        if backend == 'stub':
+            from steamworks.stub import StubSteamworks
+            backend = self._backend = StubSteamworks()
+
+        self.app_id     = backend.app_id
+        self._cdll      = backend
+        self._loaded    = True
+        self._load_steamworks_api()
+        return self._loaded
+
+
+    def _load_steamworks_api(self) -> None:
+        """Bind the prebind set of methods from steamworks api; all others are bound by __getattr__ on first use
+
+        :return: None
+        """
+        if not self._loaded:
+            raise SteamNotLoadedException('STEAMWORKS not yet loaded')
+
+        prebind = self.__dict__.get('_prebind')
+        if prebind is True:
+            prebind = STEAMWORKS_METHODS
+        elif prebind is None:
+            prebind = STEAMWORKS_HOT_METHODS
+
+        started = time.perf_counter()
+        for method_name in prebind:
+            self._bind(method_name)
+
+        self._timings['prebind'] = time.perf_counter() - started
+        self._timings['prebound'] = len(prebind)
+        self._reload_steamworks_interfaces()
+
+
+    def _bind(self, method_name: str) -> object:
+        """Resolve a native function and assign its arg/res types based on method map
+
+        :param method_name: str
+        :return: ctypes function
+        """
+        attributes = STEAMWORKS_METHODS[method_name]
+        f = getattr(self._cdll, method_name)
+
+        if 'restype' in attributes:
+            f.restype = attributes['restype']
+
+        if 'argtypes' in attributes:
+            f.argtypes = attributes['argtypes']
+
+        profiler = self.__dict__.get('profiler')
+        if profiler is not None:
+            f = profiler.wrap(method_name, f)
+
+        setattr(self, method_name, f)
+        return f
+
+
+    def __getattr__(self, name: str) -> object:
+        # Only reached for attributes not found the regular way, i.e. native functions not bound yet
+        if name not in STEAMWORKS_METHODS or not self.__dict__.get('_loaded'):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        lock = self.__dict__.get('lock')
+        if lock is not None:
+            with lock:
+                # Another thread may have bound it while this one waited
+                f = self.__dict__.get(name)
+                return f if f is not None else self._lazy_bind(name)
+
+        return self._lazy_bind(name)
+
+
+    def _lazy_bind(self, name: str) -> object:
+        started = time.perf_counter()
+        f = self._bind(name)
+        self._timings['lazy_bind'] += time.perf_counter() - started
+        self._timings['lazy_bound'] += 1
+        return f
+
+
+    @property
+    def thread_safe(self) -> bool:
+        return self.lock is not None
+
+
+    def startup_report(self) -> dict:
+        """Time spent loading the library and binding native functions, in seconds
+
+        :return: dict with load_library, prebind and lazy_bind durations plus the prebound and lazy_bound counts
+        """
+        return dict(self._timings)
+
+
+    def enable_profiler(self, depth: int = 1) -> object:
+        """Time every native call from now on; see steamworks.profiler
+
+        Functions bound so far are wrapped right away, functions bound later on as they are bound.
+
+        :param depth: int, number of Python frames recorded as the caller stack of each native call
+        :return: NativeProfiler
+        """
+        if self.__dict__.get('profiler') is not None:
+            raise GenericSteamException('Profiler is already enabled')
+
+        from steamworks.profiler import NativeProfiler
+        profiler = self.profiler = NativeProfiler(depth)
+        for name in STEAMWORKS_METHODS:
+            f = self.__dict__.get(name)
+            if f is not None:
+                setattr(self, name, profiler.wrap(name, f))
+
+        return profiler
+
+
+    def disable_profiler(self) -> object:
+        """Put the plain native functions back; the profiler keeps what it recorded
+
+        :return: NativeProfiler or None if it was not enabled
+        """
+        profiler = self.__dict__.get('profiler')
+        if profiler is None:
+            return None
+
+        self.profiler = None
+        for name in STEAMWORKS_METHODS:
+            f = self.__dict__.get(name)
+            if getattr(f, 'profiler', None) is profiler:
+                setattr(self, name, f.__wrapped__)
+
+        return profiler
+
+
+    def _reload_steamworks_interfaces(self) -> None:
+        """Reload all interface classes; each one is rebuilt on its next access. Dropped interfaces are closed, so
+        they stop receiving events
+
+        :return: None
+        """
+        for name in self.interfaces():
+            close = getattr(self.__dict__.pop(name), 'close', None)
+            if close is not None:
+                close()
+
+
+    def interfaces(self) -> list:
+        """Names of the interfaces built so far
+
+        :return: list of str
+        """
+        return [name for name, value in vars(STEAMWORKS).items()
+                if isinstance(value, LazyInterface) and name in self.__dict__]
+
+
+    def initialize(self) -> bool:
+        """Initialize Steam API connection
+
+        :return: bool
+        """
+        if not self.loaded():
+            raise SteamNotLoadedException('STEAMWORKS not yet loaded')
+
+        if not self.IsSteamRunning():
+            raise SteamNotRunningException('Steam is not running')
+
+        # Boot up the Steam API
+        result = self.SteamInit()
+        if result == 2:
+            raise SteamNotRunningException('Steam is not running')
+
+        elif result == 3:
+            raise SteamConnectionException('Not logged on or connection to Steam client could not be established')
+
+        elif result != 0:
+            raise GenericSteamException('Failed to initialize STEAMWORKS API')
+
+        return True
+
+    def relaunch(self, app_id: int) -> bool:
+        """
+
+        :param app_id: int
+        :return: None
+        """
+        return self.RestartAppIfNecessary(app_id)
+
+    def unload(self) -> None:
+        """Shuts down the Steamworks API, releases pointers and frees memory.
+
+        :return: None
+        """
+        self.stop_callback_pump()
+        self.SteamShutdown()
+        self._loaded    = False
+        self._cdll      = None
+
+
+    def loaded(self) -> bool:
+        """Is library loaded and everything populated
+
+        :return: bool
+        """
+        return (self._loaded and self._cdll)
+
+
+    def run_callbacks(self) -> bool:
+        """Execute all callbacks
+
+        :return: bool
+        """
+        if not self.loaded():
+            raise SteamNotLoadedException('STEAMWORKS not yet loaded')
+
+        if self._pump is not None:
+            # The pump thread already ran RunCallbacks; only dispatch what it handed over, if it did not itself
+            self._pump.deliver()
+            return True
+
+        if self.lock is not None:
+            current = threading.current_thread()
+            with self.lock:
+                if self._callback_thread is None or not self._callback_thread.is_alive():
+                    self._callback_thread = current
+
+            if self._callback_thread is not current:
+                raise GenericSteamException(f'Callbacks run on {self._callback_thread.name} only, start the callback '
+                                            f'pump to run them independently of any caller')
+
+        self.RunCallbacks()
+        if self.events is not None:
+            self.events.dispatch()
+
+        return True
+
+    def start_callback_pump(self, hz: float = 60.0, adaptive: bool = True, busy_hz: float = 500.0,
+                            dispatch: bool = None) -> object:
+        """Run Steam callbacks on a background thread
+
+        Callbacks are still invoked on the thread calling run_callbacks (or run_forever), which only dispatches the
+        events the pump thread has collected since, unless the pump dispatches them itself. The event queue is enabled
+        for every event type if it is not already, as callbacks left out of it would run on the pump thread.
+
+        :param hz: float, pump frequency while idle
+        :param adaptive: bool, pump at busy_hz while call results are outstanding or events arrive
+        :param busy_hz: float
+        :param dispatch: bool, invoke callbacks on the pump thread; None to do so in thread-safe mode only
+        :return: CallbackPump
+        """
+        if not self.loaded():
+            raise SteamNotLoadedException('STEAMWORKS not yet loaded')
+
+        if self._pump is not None:
+            raise GenericSteamException('Callback pump is already running')
+
+        events = self.events
+        if events is None:
+            self.enable_event_queue()
+        elif set(events.event_types) != set(SteamEventType):
+            # Re-enabling discards what is queued, so deliver that first; handlers and listeners stay in place
+            events.dispatch()
+            events.event_types = tuple(SteamEventType)
+            if not events.enable():
+                raise GenericSteamException('Failed to enable the native event queue')
+
+        if dispatch is None:
+            dispatch = self.thread_safe
+
+        from steamworks.pump import CallbackPump
+        self._pump = CallbackPump(self, hz, adaptive, busy_hz, dispatch=dispatch)
+        self._pump.start()
+        return self._pump
+
+    def stop_callback_pump(self, timeout: float = None) -> bool:
+        """Stop the callback pump thread and dispatch the events it already collected
+
+        :param timeout: float, seconds to wait for the thread, None to wait as long as it takes
+        :return: bool, False if the thread did not exit in time
+        """
+        pump = self._pump
+        if pump is None:
+            return True
+
+        if not pump.stop(timeout):
+            return False
+
+        self._pump = None
+        pump.deliver()
+        return True
+
+    def enable_event_queue(self, capacity: int = 1024, event_types: list = None) -> SteamEventQueue:
+        """Queue callbacks natively and dispatch them in one batch after each run_callbacks
+
+        :param capacity: int, number of events the native queue holds between two run_callbacks calls
+        :param event_types: list of SteamEventType, defaults to all of them
+        :return: SteamEventQueue
+        """
+        events = SteamEventQueue(self, capacity, event_types)
+        if not events.enable():
+            raise GenericSteamException('Failed to enable the native event queue')
+
+        self.events = events
+        return events
+
+    def disable_event_queue(self) -> None:
+        """Deliver callbacks one by one from inside run_callbacks again
+
+        :return: None
+        """
+        if self._pump is not None:
+            raise GenericSteamException('Stop the callback pump before disabling the event queue')
+
+        if self._call_results is not None:
+            self._call_results.cancel_all()
+            self._call_results = None
+
+        if self.events is not None:
+            self.events.dispatch()
+            self.events.disable()
+            self.events = None
+
+    def call_results(self) -> object:
+        """Tracker resolving the futures returned by the *Async interface methods, created on first use
+
+        :return: SteamCallResults
+        """
+        if self._call_results is None:
+            # Deferred, as it pulls in asyncio
+            from steamworks.futures import SteamCallResults
+            if self.lock is None:
+                self._call_results = SteamCallResults(self)
+            else:
+                with self.lock:
+                    if self._call_results is None:
+                        self._call_results = SteamCallResults(self)
+
+        return self._call_results
+
+    def run_forever(self, base_interval: float = 1.0) -> None:
+        """Loop and call Steam.run_callbacks in specified interval
+
+        :param base_interval: float
+        :return: None
+        """
+        while True:
+            if self._pump is not None:
+                # Wakes up as soon as the pump thread hands over events
+                self._pump.deliver(timeout=base_interval)
+                continue
+
+            self.run_callbacks()
+            time.sleep(base_interval)
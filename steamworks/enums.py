@@ -210,6 +210,16 @@ class EP2PSend(Enum):
     k_EP2PSendReliableNoDelay = 3  # Reliable, but tries to send immediately.
 
 
+class EP2PSessionError(Enum):
+    """EP2PSessionError"""
+
+    k_EP2PSessionErrorNone = 0
+    k_EP2PSessionErrorNotRunningApp = 1  # Target is not running the same game
+    k_EP2PSessionErrorNoRightsToApp = 2  # Local user doesn't own the app that is running
+    k_EP2PSessionErrorDestinationNotLoggedIn = 3  # Target user isn't connected to Steam
+    k_EP2PSessionErrorTimeout = 4  # Target isn't responding, perhaps not calling AcceptP2PSessionWithUser()
+
+
 class ELobbyType(Enum):
     """ELobbyType"""
 
@@ -218,3 +228,20 @@ class ELobbyType(Enum):
     k_ELobbyTypePublic = 2  # Joinable by anyone, visible in lobby list
     k_ELobbyTypeInvisible = 3  # Not joinable, and not visible in lobby list, only invitees can join, preferred for matchmaking
     k_ELobbyTypeFriendsOfFriends = 4  # Joinable by friends of friends
+
+
+class SteamEventType(Enum):
+    """Tag of a record in the native event queue, matches SWEventType in SteamworksPy.cpp"""
+
+    ITEM_CREATED = 1
+    ITEM_UPDATED = 2
+    ITEM_INSTALLED = 3
+    ITEM_SUBSCRIBED = 4
+    ITEM_UNSUBSCRIBED = 5
+    LEADERBOARD_FOUND = 6
+    MICROTXN_AUTHORIZATION = 7
+    LOBBY_CREATED = 8
+    LOBBY_ENTER = 9
+    LOBBY_JOIN_REQUESTED = 10
+    P2P_SESSION_REQUEST = 11
+    P2P_SESSION_CONNECT_FAIL = 12
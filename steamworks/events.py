@@ -0,0 +1,342 @@
+"""
+Steam callback delivery: the event bus and the native event queue
+
+SteamEventBus fans every callback out to any number of subscribers. The first subscription to an event type installs
+one CFUNCTYPE trampoline through the native Set*Callback symbol; later subscribers share it. Subscriptions can filter
+on callback struct fields or a predicate, e.g. to only see LobbyEnter_t of one lobby. The interface Set*Callback
+methods are kept for compatibility and manage a single bus subscription each.
+
+Without the queue every callback calls from inside SteamAPI_RunCallbacks into its trampoline, which acquires the GIL
+and converts the struct once per event while Python runs reentrantly inside the Steam pump. Once enable() is called
+the native handlers append a tagged copy of each callback struct to a ring buffer instead, and dispatch() drains all
+pending records with a single native call after RunCallbacks has returned and publishes them on the bus.
+"""
+import struct
+import sys
+import threading
+import traceback
+from ctypes import CFUNCTYPE, sizeof
+
+from steamworks.enums import SteamEventType
+from steamworks.exceptions import SteamNotLoadedException
+from steamworks.structs import CreateItemResult_t, FindLeaderboardResult_t, GameLobbyJoinRequested_t, \
+    ItemInstalled_t, LobbyCreated_t, LobbyEnter_t, MicroTxnAuthorizationResponse_t, P2PSessionConnectFail_t, \
+    P2PSessionRequest_t, SteamEventRecord_t, SubmitItemUpdateResult_t, SubscriptionResult
+
+EVENT_STRUCTS = {
+    SteamEventType.ITEM_CREATED: CreateItemResult_t,
+    SteamEventType.ITEM_UPDATED: SubmitItemUpdateResult_t,
+    SteamEventType.ITEM_INSTALLED: ItemInstalled_t,
+    SteamEventType.ITEM_SUBSCRIBED: SubscriptionResult,
+    SteamEventType.ITEM_UNSUBSCRIBED: SubscriptionResult,
+    SteamEventType.LEADERBOARD_FOUND: FindLeaderboardResult_t,
+    SteamEventType.MICROTXN_AUTHORIZATION: MicroTxnAuthorizationResponse_t,
+    SteamEventType.LOBBY_CREATED: LobbyCreated_t,
+    SteamEventType.LOBBY_ENTER: LobbyEnter_t,
+    SteamEventType.LOBBY_JOIN_REQUESTED: GameLobbyJoinRequested_t,
+    SteamEventType.P2P_SESSION_REQUEST: P2PSessionRequest_t,
+    SteamEventType.P2P_SESSION_CONNECT_FAIL: P2PSessionConnectFail_t,
+}
+
+# Native symbol registering the Python callback of each event type
+NATIVE_CALLBACKS = {
+    SteamEventType.ITEM_CREATED: 'Workshop_SetItemCreatedCallback',
+    SteamEventType.ITEM_UPDATED: 'Workshop_SetItemUpdatedCallback',
+    SteamEventType.ITEM_INSTALLED: 'Workshop_SetItemInstalledCallback',
+    SteamEventType.ITEM_SUBSCRIBED: 'Workshop_SetItemSubscribedCallback',
+    SteamEventType.ITEM_UNSUBSCRIBED: 'Workshop_SetItemUnsubscribedCallback',
+    SteamEventType.LEADERBOARD_FOUND: 'Leaderboard_SetFindLeaderboardResultCallback',
+    SteamEventType.MICROTXN_AUTHORIZATION: 'MicroTxn_SetAuthorizationResponseCallback',
+    SteamEventType.LOBBY_CREATED: 'Lobby_SetLobbyCreatedCallback',
+    SteamEventType.LOBBY_ENTER: 'Lobby_SetLobbyEnterCallback',
+    SteamEventType.LOBBY_JOIN_REQUESTED: 'Lobby_SetGameLobbyJoinRequestedCallback',
+    SteamEventType.P2P_SESSION_REQUEST: 'P2P_SetSessionRequestCallback',
+    SteamEventType.P2P_SESSION_CONNECT_FAIL: 'P2P_SetSessionConnectFailCallback',
+}
+
+
+class SteamSubscription(object):
+    """Handle returned by SteamEventBus.subscribe()"""
+    __slots__ = ('bus', 'event_type', 'handler', 'predicate', 'fields')
+
+    def __init__(self, bus: object, event_type: SteamEventType, handler: object, predicate: object, fields: tuple):
+        self.bus = bus
+        self.event_type = event_type
+        self.handler = handler
+        self.predicate = predicate
+        self.fields = fields
+
+    def __repr__(self) -> str:
+        return f'<SteamSubscription {self.event_type.name} {self.handler!r}>'
+
+    def matches(self, event: object) -> bool:
+        for name, value in self.fields:
+            if getattr(event, name) != value:
+                return False
+
+        return self.predicate is None or bool(self.predicate(event))
+
+    def unsubscribe(self) -> None:
+        self.bus.unsubscribe(self)
+
+
+class SteamEventBus(object):
+    """Dispatches every Steam callback to all matching subscribers"""
+
+    def __init__(self, steam: object):
+        """
+        :param steam: STEAMWORKS or any object providing the native Set*Callback symbols
+        """
+        self.steam = steam
+        # event type -> tuple of subscriptions, replaced on change so dispatch can iterate without copying
+        self._subscriptions = {}
+        self._trampolines = {}
+        # Serializes subscription changes; publish() reads the tuples without it
+        self._lock = threading.Lock()
+
+    def subscribe(self, event_type: SteamEventType, handler: object, predicate: object = None,
+                  **fields) -> SteamSubscription:
+        """Call handler with the callback struct of every event of a type that passes the filters
+
+        :param event_type: SteamEventType
+        :param handler: callable receiving the callback struct
+        :param predicate: callable receiving the callback struct, the handler only runs if it returns True
+        :param fields: callback struct field values the event has to match, e.g. m_ulSteamIDLobby=lobby_id
+        :return: SteamSubscription
+        """
+        struct_type = EVENT_STRUCTS.get(event_type)
+        if struct_type is None:
+            raise AttributeError(f'{event_type} is not a Steam event type')
+
+        known = {name for name, _ in struct_type._fields_}
+        for name in fields:
+            if name not in known:
+                raise AttributeError(f'{struct_type.__name__} has no field {name!r}')
+
+        subscription = SteamSubscription(self, event_type, handler, predicate, tuple(fields.items()))
+        with self._lock:
+            self._register(event_type, struct_type)
+            self._subscriptions[event_type] = self._subscriptions.get(event_type, ()) + (subscription,)
+
+        return subscription
+
+    def unsubscribe(self, subscription: SteamSubscription) -> bool:
+        """Remove a subscription; the native registration stays in place for later subscribers
+
+        :param subscription: SteamSubscription
+        :return: bool, False if it was not subscribed
+        """
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.event_type, ())
+            if subscription not in subscriptions:
+                return False
+
+            self._subscriptions[subscription.event_type] = tuple(
+                other for other in subscriptions if other is not subscription)
+            return True
+
+    def replace(self, subscription: SteamSubscription, event_type: SteamEventType,
+                handler: object) -> SteamSubscription:
+        """Swap a subscription for a new one, as the interface Set*Callback methods do
+
+        :param subscription: SteamSubscription or None
+        :param event_type: SteamEventType
+        :param handler: callable
+        :return: SteamSubscription
+        """
+        if subscription is not None:
+            self.unsubscribe(subscription)
+
+        return self.subscribe(event_type, handler)
+
+    def subscribers(self, event_type: SteamEventType) -> tuple:
+        return self._subscriptions.get(event_type, ())
+
+    def publish(self, event_type: SteamEventType, event: object) -> int:
+        """Pass an event to every matching subscriber in subscription order
+
+        An exception raised by one handler is reported through on_error() and does not keep the others from running.
+
+        :param event_type: SteamEventType
+        :param event: callback struct
+        :return: int, number of handlers called
+        """
+        called = 0
+        for subscription in self._subscriptions.get(event_type, ()):
+            try:
+                if subscription.fields or subscription.predicate is not None:
+                    if not subscription.matches(event):
+                        continue
+
+                called += 1
+                subscription.handler(event)
+            except Exception as error:
+                self.on_error(subscription, event, error)
+
+        return called
+
+    def on_error(self, subscription: SteamSubscription, event: object, error: Exception) -> None:
+        """Report an exception raised by a subscriber; prints the traceback like ctypes does for callbacks
+
+        :param subscription: SteamSubscription
+        :param event: callback struct
+        :param error: Exception
+        :return: None
+        """
+        print(f'Exception in {subscription!r}:', file=sys.stderr)
+        traceback.print_exception(type(error), error, error.__traceback__)
+
+    def _register(self, event_type: SteamEventType, struct_type: type) -> None:
+        if event_type in self._trampolines:
+            return
+
+        def trampoline(event):
+            self.publish(event_type, event)
+
+        # Kept referenced for as long as the native side may call it
+        self._trampolines[event_type] = CFUNCTYPE(None, struct_type)(trampoline)
+        getattr(self.steam, NATIVE_CALLBACKS[event_type])(self._trampolines[event_type])
+
+
+# Largest capacity the native event queue accepts, in records; Events_Enable fails above it
+EVENT_QUEUE_MAX_CAPACITY = 1 << 20
+
+# type, size and call handle preceding the payload of every SteamEventRecord_t
+_RECORD_HEADER = struct.Struct('=IIQ')
+_RECORD_SIZE = sizeof(SteamEventRecord_t)
+
+
+class SteamEventQueue(object):
+    """Drains the native event queue in batches and dispatches the records to Python handlers"""
+
+    def __init__(self, steam: object, capacity: int = 1024, event_types: list = None, batch_size: int = 256):
+        """
+        :param steam: STEAMWORKS
+        :param capacity: int, number of records the native ring buffer holds, rounded up to a power of two, at most
+                         EVENT_QUEUE_MAX_CAPACITY
+        :param event_types: list of SteamEventType to queue, all of them by default
+        :param batch_size: int, maximum records copied per native drain call
+        """
+        self.steam = steam
+        if not self.steam.loaded():
+            raise SteamNotLoadedException('STEAMWORKS not yet loaded')
+
+        if not 0 < capacity <= EVENT_QUEUE_MAX_CAPACITY:
+            raise AttributeError(f'capacity must be between 1 and {EVENT_QUEUE_MAX_CAPACITY}')
+
+        self.capacity = capacity
+        self.event_types = tuple(event_types) if event_types is not None else tuple(SteamEventType)
+        self.handlers = {}
+        self.listeners = []
+        self.enabled = False
+
+        self._records = (SteamEventRecord_t * batch_size)()
+        self._view = memoryview(self._records).cast('B')
+        # Bound once, looked up for every record
+        self._structs = {event_type.value: (event_type, struct_type.from_buffer_copy)
+                         for event_type, struct_type in EVENT_STRUCTS.items()}
+
+    def enable(self) -> bool:
+        """Start queueing callbacks of the configured event types natively
+
+        :return: bool
+        """
+        mask = 0
+        for event_type in self.event_types:
+            mask |= 1 << event_type.value
+
+        self.enabled = bool(self.steam.Events_Enable(self.capacity, mask))
+        return self.enabled
+
+    def disable(self) -> None:
+        """Deliver callbacks through the CFUNCTYPE trampolines again; pending records are discarded
+
+        :return: None
+        """
+        self.steam.Events_Disable()
+        self.enabled = False
+
+    def set_handler(self, event_type: SteamEventType, callback: object) -> bool:
+        """Handle an event type in Python instead of publishing it on the event bus
+
+        :param event_type: SteamEventType
+        :param callback: callable receiving the callback struct
+        :return: bool
+        """
+        if event_type not in EVENT_STRUCTS:
+            raise AttributeError(f'{event_type} is not a queued event type')
+
+        self.handlers[event_type] = callback
+        return True
+
+    def remove_handler(self, event_type: SteamEventType) -> None:
+        self.handlers.pop(event_type, None)
+
+    def add_listener(self, listener: object) -> None:
+        """Observe every delivered batch, including empty ones, before the handlers run
+
+        :param listener: callable receiving the list of (SteamEventType, callback struct, call handle)
+        :return: None
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: object) -> None:
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def pending(self) -> int:
+        return self.steam.Events_Pending()
+
+    def dropped(self) -> int:
+        """Number of events discarded natively because the queue was full
+
+        :return: int
+        """
+        return self.steam.Events_Dropped()
+
+    def drain(self) -> list:
+        """Pop every pending event
+
+        :return: list of (SteamEventType, callback struct, SteamAPICall_t handle or 0 for broadcast callbacks)
+        """
+        events = []
+        view = self._view
+        batch_size = len(self._records)
+        while True:
+            count = self.steam.Events_Drain(self._records, batch_size)
+            offset = 0
+            for _ in range(count):
+                event_type, _, call = _RECORD_HEADER.unpack_from(view, offset)
+                event_type, from_buffer_copy = self._structs[event_type]
+                events.append((event_type, from_buffer_copy(view, offset + _RECORD_HEADER.size), call))
+                offset += _RECORD_SIZE
+
+            if count < batch_size:
+                return events
+
+    def dispatch(self) -> int:
+        """Drain pending events and pass each one to its handler
+
+        :return: int, number of events
+        """
+        return self.deliver(self.drain())
+
+    def deliver(self, events: list) -> int:
+        """Pass already drained events to their handlers
+
+        :param events: list of (SteamEventType, callback struct, call handle)
+        :return: int, number of events
+        """
+        for listener in self.listeners:
+            listener(events)
+
+        handlers = self.handlers
+        publish = self.steam.bus.publish
+        for event_type, event, _ in events:
+            handler = handlers.get(event_type)
+            if handler is not None:
+                handler(event)
+            else:
+                publish(event_type, event)
+
+        return len(events)
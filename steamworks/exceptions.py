@@ -37,4 +37,16 @@ class UnsupportedSteamStatValue(SteamException):
 
 
 class SetupRequired(SteamException):
-    pass
\ No newline at end of file
+    pass
+
+
+class P2PSendError(SteamException):
+    pass
+
+
+class CallResultTimeoutException(SteamException, TimeoutError):
+    pass
+
+
+class SteamBrokerException(SteamException):
+    pass
@@ -0,0 +1,314 @@
+"""
+Awaitable Steam call results
+
+SteamCallResults hands out one future per asynchronous Steam request and resolves it with the matching call result
+struct when the event queue delivers it. Futures created while an asyncio event loop is running on the calling thread
+are asyncio futures, all others are concurrent.futures.Future objects for synchronous code. Both support a timeout,
+after which they fail with CallResultTimeoutException, and cancellation, after which a late result is ignored.
+
+Requests that return a SteamAPICall_t handle are tracked by that handle with track(), so any number of them can be
+in flight at once. expect() covers callbacks without a handle: results carrying the id of the item or lobby they
+belong to (e.g. lobby enter) are matched by that id, all others of one type in the order they were expected.
+
+Call results are only delivered while callbacks run: call STEAMWORKS.run_callbacks regularly, start the callback pump
+thread, or let LoopCallbackPump run them on an asyncio event loop.
+"""
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import OrderedDict
+
+from steamworks.enums import SteamEventType
+from steamworks.exceptions import CallResultTimeoutException, GenericSteamException
+
+# Field identifying the request for expect(); results without an entry resolve in the order they were expected
+CALL_RESULT_KEYS = {
+    SteamEventType.ITEM_SUBSCRIBED: 'publishedFileId',
+    SteamEventType.ITEM_UNSUBSCRIBED: 'publishedFileId',
+    SteamEventType.LOBBY_ENTER: 'm_ulSteamIDLobby',
+}
+
+
+def _settle(future: object, loop: object, result: object = None, error: BaseException = None) -> None:
+    """Complete a future from any thread unless it is already done"""
+    def complete():
+        if future.done():
+            return
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    if loop is None:
+        try:
+            complete()
+        except concurrent.futures.InvalidStateError:
+            pass  # Cancelled concurrently
+
+        return
+
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+
+    if running is loop:
+        complete()
+    elif not loop.is_closed():
+        loop.call_soon_threadsafe(complete)
+
+
+class _PendingCall(object):
+    __slots__ = ('event_type', 'future', 'loop', 'key', 'call', 'deadline')
+
+    def __init__(self, event_type: SteamEventType, future: object, loop: object, key: object, call: int,
+                 deadline: float):
+        self.event_type = event_type
+        self.future = future
+        self.loop = loop
+        self.key = key
+        self.call = call
+        self.deadline = deadline
+
+
+class SteamCallResults(object):
+    """Matches call results delivered by the event queue to the futures waiting for them"""
+
+    def __init__(self, steam: object, clock: object = time.monotonic, unclaimed_limit: int = 256):
+        """
+        :param steam: STEAMWORKS, its event queue is enabled if it is not already
+        :param clock: callable returning the current time in seconds
+        :param unclaimed_limit: int, results with a call handle kept for a track() that has not been called yet
+        """
+        if steam.events is None:
+            steam.enable_event_queue()
+
+        self.steam = steam
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._calls = {}
+        self._unclaimed = OrderedDict()
+        self._unclaimed_limit = unclaimed_limit
+        self._deadlines = 0
+        steam.events.add_listener(self._on_events)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._calls) + sum(len(calls) for calls in self._pending.values())
+
+    def expect(self, event_type: SteamEventType, key: object = None, timeout: float = None,
+               loop: object = None) -> object:
+        """Create a future for the next result of a type without a call handle; call this before issuing the request
+
+        :param event_type: SteamEventType
+        :param key: value of the CALL_RESULT_KEYS field the result has to match, None to match in expected order
+        :param timeout: float, seconds until the future fails with CallResultTimeoutException, None for no timeout
+        :param loop: asyncio event loop, defaults to the loop running on the calling thread if there is one
+        :return: asyncio.Future or concurrent.futures.Future
+        """
+        future, loop = self._create_future(loop)
+        call = _PendingCall(event_type, future, loop, key, 0, self._deadline(timeout))
+        with self._lock:
+            self._pending.setdefault(event_type, []).append(call)
+            if call.deadline is not None:
+                self._deadlines += 1
+
+        future.add_done_callback(lambda _: self._discard(call))
+        return future
+
+    def track(self, event_type: SteamEventType, call: int, timeout: float = None, loop: object = None) -> object:
+        """Create a future for the result of an issued request; call this right after issuing it
+
+        :param event_type: SteamEventType
+        :param call: int, SteamAPICall_t handle returned by the request, 0 if it could not be issued
+        :param timeout: float, seconds until the future fails with CallResultTimeoutException, None for no timeout
+        :param loop: asyncio event loop, defaults to the loop running on the calling thread if there is one
+        :return: asyncio.Future or concurrent.futures.Future
+        """
+        future, loop = self._create_future(loop)
+        if not call:
+            _settle(future, loop, error=GenericSteamException(f'{event_type.name} request could not be issued'))
+            return future
+
+        pending = _PendingCall(event_type, future, loop, None, call, self._deadline(timeout))
+        with self._lock:
+            result = self._unclaimed.pop(call, None)
+            if result is None:
+                self._calls[call] = pending
+                if pending.deadline is not None:
+                    self._deadlines += 1
+
+        if result is not None:
+            # Delivered by another thread before track() was called
+            _settle(future, loop, result)
+        else:
+            future.add_done_callback(lambda _: self._discard(pending))
+
+        return future
+
+    def cancel_all(self) -> int:
+        """Cancel every pending future
+
+        :return: int, number of cancelled futures
+        """
+        with self._lock:
+            calls = [call for calls in self._pending.values() for call in calls]
+            calls.extend(self._calls.values())
+            self._pending.clear()
+            self._calls.clear()
+            self._unclaimed.clear()
+            self._deadlines = 0
+
+        for call in calls:
+            if call.loop is None:
+                call.future.cancel()
+            elif not call.loop.is_closed():
+                call.loop.call_soon_threadsafe(call.future.cancel)
+
+        return len(calls)
+
+    def expire(self, now: float = None) -> int:
+        """Fail every future whose timeout passed
+
+        :param now: float, defaults to clock()
+        :return: int, number of expired futures
+        """
+        if not self._deadlines:
+            return 0
+
+        if now is None:
+            now = self.clock()
+
+        expired = []
+        with self._lock:
+            for event_type, calls in list(self._pending.items()):
+                remaining = [call for call in calls if call.deadline is None or call.deadline > now]
+                if len(remaining) != len(calls):
+                    expired.extend(call for call in calls if call.deadline is not None and call.deadline <= now)
+                    self._pending[event_type] = remaining
+
+            for handle, call in list(self._calls.items()):
+                if call.deadline is not None and call.deadline <= now:
+                    expired.append(self._calls.pop(handle))
+
+            self._deadlines -= len(expired)
+
+        for call in expired:
+            _settle(call.future, call.loop, error=CallResultTimeoutException(
+                f'No {call.event_type.name} call result within the timeout'))
+
+        return len(expired)
+
+    def _create_future(self, loop: object) -> tuple:
+        if loop is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+
+        return (loop.create_future() if loop is not None else concurrent.futures.Future()), loop
+
+    def _deadline(self, timeout: float) -> float:
+        return self.clock() + timeout if timeout is not None else None
+
+    def _on_events(self, events: list) -> None:
+        for event_type, event, handle in events:
+            call = self._claim(event_type, event, handle)
+            if call is not None:
+                _settle(call.future, call.loop, event)
+
+        self.expire()
+
+    def _claim(self, event_type: SteamEventType, event: object, handle: int) -> _PendingCall:
+        with self._lock:
+            call = self._calls.pop(handle, None) if handle else None
+            if call is None:
+                call = self._claim_expected(event_type, event)
+
+            if call is None:
+                if handle:
+                    self._unclaimed[handle] = event
+                    if len(self._unclaimed) > self._unclaimed_limit:
+                        self._unclaimed.popitem(last=False)
+
+                return None
+
+            if call.deadline is not None:
+                self._deadlines -= 1
+
+            return call
+
+    def _claim_expected(self, event_type: SteamEventType, event: object) -> _PendingCall:
+        calls = self._pending.get(event_type)
+        if not calls:
+            return None
+
+        field = CALL_RESULT_KEYS.get(event_type)
+        key = getattr(event, field) if field is not None else None
+        for index, call in enumerate(calls):
+            if call.key is None or call.key == key:
+                del calls[index]
+                return call
+
+        return None
+
+    def _discard(self, call: _PendingCall) -> None:
+        with self._lock:
+            if call.call:
+                found = self._calls.get(call.call) is call
+                if found:
+                    del self._calls[call.call]
+            else:
+                calls = self._pending.get(call.event_type)
+                found = bool(calls) and call in calls
+                if found:
+                    calls.remove(call)
+
+            if found and call.deadline is not None:
+                self._deadlines -= 1
+
+
+class LoopCallbackPump(object):
+    """Runs STEAMWORKS.run_callbacks at a fixed rate on an asyncio event loop"""
+
+    def __init__(self, steam: object, loop: object = None, interval: float = 1 / 60):
+        """
+        :param steam: STEAMWORKS
+        :param loop: asyncio event loop, defaults to the running loop; required outside of a coroutine
+        :param interval: float, seconds between run_callbacks calls
+        """
+        if loop is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                raise AttributeError('Supply `loop` or create the pump from a coroutine running on it') from None
+
+        self.steam = steam
+        self.loop = loop
+        self.interval = interval
+        self._handle = None
+        self._deadline = None
+
+    @property
+    def running(self) -> bool:
+        return self._handle is not None
+
+    def start(self) -> None:
+        if self._handle is None:
+            self._deadline = self.loop.time()
+            self._handle = self.loop.call_soon(self._tick)
+
+    def stop(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _tick(self) -> None:
+        try:
+            self.steam.run_callbacks()
+        finally:
+            self._deadline = max(self._deadline + self.interval, self.loop.time())
+            self._handle = self.loop.call_at(self._deadline, self._tick)
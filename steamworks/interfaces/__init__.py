@@ -0,0 +1,55 @@
+from importlib import import_module
+
+
+class LazyInterface(object):
+    """STEAMWORKS class attribute that imports and builds its interface on first access
+
+    The interface is cached in the instance __dict__, which takes precedence over this non-data descriptor, so every
+    later access is a plain attribute lookup. Deleting the cached instance makes the next access build a new one. In
+    the thread-safe mode of STEAMWORKS the interface is built with a lock of its own, see steamworks.concurrency.
+    """
+
+    def __init__(self, module: str, interface: str):
+        """
+        :param module: str, module defining the interface, only imported on first access
+        :param interface: str, name of the interface class, called with the STEAMWORKS instance
+        """
+        self.module = module
+        self.interface = interface
+        self.name = None
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, steam: object, owner: type = None) -> object:
+        if steam is None:
+            return self
+
+        interface_class = getattr(import_module(self.module), self.interface)
+        lock = steam.__dict__.get('lock')
+        if lock is None:
+            interface = steam.__dict__[self.name] = interface_class(steam)
+            return interface
+
+        # Thread-safe mode: built once even if several threads get here, with a lock of its own
+        from steamworks.concurrency import synchronized
+        with lock:
+            interface = steam.__dict__.get(self.name)
+            if interface is None:
+                interface = steam.__dict__[self.name] = synchronized(interface_class)(steam)
+
+        return interface
+
+
+def close_subscriptions(interface: object, names: tuple) -> None:
+    """Unsubscribe the event bus subscriptions an interface keeps in the given attributes and clear them
+
+    :param interface: interface instance
+    :param names: tuple of str, attributes holding a SteamSubscription or None
+    :return: None
+    """
+    for name in names:
+        subscription = getattr(interface, name)
+        if subscription is not None:
+            subscription.unsubscribe()
+            setattr(interface, name, None)
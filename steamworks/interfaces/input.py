@@ -1,6 +1,4 @@
-from steamworks.enums 		import *
-from steamworks.structs 	import *
-from steamworks.exceptions 	import *
+from steamworks.exceptions import SteamNotLoadedException
 
 
 class SteamInput:
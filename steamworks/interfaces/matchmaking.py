@@ -1,42 +1,21 @@
-from ctypes import *
-from enum import Enum
-
-import steamworks.util as util
-from steamworks.enums import *
-from steamworks.structs import *
-from steamworks.exceptions import *
+from steamworks.enums import ELobbyType, EResult, SteamEventType
+from steamworks.exceptions import SteamNotLoadedException
+from steamworks.interfaces import close_subscriptions
 
 
 class SteamMatchmaking(object):
-    # Callback function types (Match SDK)
-    _LobbyCreated_t = CFUNCTYPE(None, LobbyCreated_t)
-    _LobbyEnter_t = CFUNCTYPE(None, LobbyEnter_t)
-    _GameLobbyJoinRequested_t = CFUNCTYPE(None, GameLobbyJoinRequested_t)
-
-    # Instance variables to store callback functions
+    # Event bus subscriptions managed by the Set*Callback methods
     _LobbyCreated = None
     _LobbyEnter = None
     _GameLobbyJoinRequested = None
 
     def _create_lobby_callback(self, result):
-        print("Lobby created callback")
         if result.m_eResult == EResult.OK.value:
-            self.current_lobby_id = result.m_ulSteamIDLobby
-            print("Lobby created: ", self.current_lobby_id)
-            self._refresh_lobby_members()
+            self._refresh_lobby_members(result.m_ulSteamIDLobby)
 
     def _lobby_enter_callback(self, result):
-        print("Lobby enter callback")
-        # print all attributes of result
-        if (False):
-            for attr in dir(result):
-                print("obj.%s = %r" % (attr, getattr(result, attr)))
-        print("Status", result.m_EChatRoomEnterResponse)
         if result.m_EChatRoomEnterResponse == 1:
-            self.current_lobby_id = result.m_ulSteamIDLobby
-            self._refresh_lobby_members()
-            print("Joined lobby: ", self.current_lobby_id)
-            print("Lobby members: ", self.lobby_members)
+            self._refresh_lobby_members(result.m_ulSteamIDLobby)
 
     def __init__(self, steam: object):
         self.steam = steam
@@ -44,36 +23,65 @@ class SteamMatchmaking(object):
             raise SteamNotLoadedException("STEAMWORKS not yet loaded")
 
         # --- State ---
-        self.current_lobby_id = 0
-        self.lobby_members = []  # List of member Steam IDs (uint64)
-        self.SetLobbyCreatedCallback(self._create_lobby_callback)
-        self.SetLobbyEnterCallback(self._lobby_enter_callback)
+        # (lobby id, member Steam IDs), replaced as a whole so readers on other threads never see it half updated
+        self._lobby = (0, ())
+        # Subscribed next to the Set*Callback slots, so user callbacks no longer replace the state tracking
+        self._LobbyCreatedTracking = self.steam.bus.subscribe(SteamEventType.LOBBY_CREATED,
+                                                              self._create_lobby_callback)
+        self._LobbyEnterTracking = self.steam.bus.subscribe(SteamEventType.LOBBY_ENTER, self._lobby_enter_callback)
+
+    def close(self) -> None:
+        """Unsubscribe this interface from the event bus; STEAMWORKS calls it when it drops the interface
+
+        :return: None
+        """
+        close_subscriptions(self, ('_LobbyCreatedTracking', '_LobbyEnterTracking', '_LobbyCreated', '_LobbyEnter',
+                                   '_GameLobbyJoinRequested'))
 
     def SetLobbyCreatedCallback(self, callback: object) -> bool:
-        self._LobbyCreated = SteamMatchmaking._LobbyCreated_t(callback)
-        self.steam.Lobby_SetLobbyCreatedCallback(self._LobbyCreated)
+        self._LobbyCreated = self.steam.bus.replace(self._LobbyCreated, SteamEventType.LOBBY_CREATED, callback)
         return True
 
     def SetLobbyEnterCallback(self, callback: object) -> bool:
-        self._LobbyEnter = SteamMatchmaking._LobbyEnter_t(callback)
-        self.steam.Lobby_SetLobbyEnterCallback(self._LobbyEnter)
+        self._LobbyEnter = self.steam.bus.replace(self._LobbyEnter, SteamEventType.LOBBY_ENTER, callback)
         return True
 
     def SetGameLobbyJoinRequestedCallback(self, callback: object) -> bool:
-        self._GameLobbyJoinRequested = self._GameLobbyJoinRequested_t(callback)
-        self.steam.Lobby_SetGameLobbyJoinRequestedCallback(self._GameLobbyJoinRequested)
+        self._GameLobbyJoinRequested = self.steam.bus.replace(
+            self._GameLobbyJoinRequested, SteamEventType.LOBBY_JOIN_REQUESTED, callback)
         return True
 
-    def CreateLobby(self, lobby_type: ELobbyType, max_members: int) -> None:
-        self.steam.CreateLobby(lobby_type.value, max_members)
+    def CreateLobby(self, lobby_type: ELobbyType, max_members: int) -> int:
+        return self.steam.CreateLobby(lobby_type.value, max_members)
+
+    def JoinLobby(self, steam_lobby_id: int) -> int:
+        return self.steam.JoinLobby(steam_lobby_id)
+
+    def CreateLobbyAsync(self, lobby_type: ELobbyType, max_members: int, timeout: float = None) -> object:
+        """Create a lobby and return a future for its LobbyCreated_t
+
+        :param lobby_type: ELobbyType
+        :param max_members: int
+        :param timeout: float, seconds until the future fails, None to wait forever
+        :return: asyncio.Future when called on a running event loop, concurrent.futures.Future otherwise
+        """
+        call = self.steam.CreateLobby(lobby_type.value, max_members)
+        return self.steam.call_results().track(SteamEventType.LOBBY_CREATED, call, timeout)
+
+    def JoinLobbyAsync(self, steam_lobby_id: int, timeout: float = None) -> object:
+        """Join a lobby and return a future for the LobbyEnter_t of that lobby
 
-    def JoinLobby(self, steam_lobby_id: int) -> None:
+        :param steam_lobby_id: int
+        :param timeout: float, seconds until the future fails, None to wait forever
+        :return: asyncio.Future when called on a running event loop, concurrent.futures.Future otherwise
+        """
+        future = self.steam.call_results().expect(SteamEventType.LOBBY_ENTER, steam_lobby_id, timeout)
         self.steam.JoinLobby(steam_lobby_id)
+        return future
 
     def LeaveLobby(self, steam_lobby_id: int) -> None:
         self.steam.LeaveLobby(steam_lobby_id)
-        self.current_lobby_id = 0  # Reset lobby ID
-        self.lobby_members = []  # Clear members
+        self._lobby = (0, ())
 
     def InviteUserToLobby(self, steam_lobby_id: int, steam_id_invitee: int) -> bool:
         return self.steam.InviteUserToLobby(steam_lobby_id, steam_id_invitee)
@@ -84,21 +92,39 @@ class SteamMatchmaking(object):
     def GetLobbyMemberByIndex(self, steam_lobby_id: int, member_index: int) -> int:
         return self.steam.GetLobbyMemberByIndex(steam_lobby_id, member_index)
 
-    def _refresh_lobby_members(self):
-        """Internal helper to update the lobby_members list."""
-        self.lobby_members = []  # Clear existing members
-        if self.current_lobby_id != 0:
-            num_members = self.GetNumLobbyMembers()
-            for i in range(num_members):
-                member_id = self.GetLobbyMemberByIndex(self.current_lobby_id, i)
-                self.lobby_members.append(member_id)
+    @property
+    def current_lobby_id(self) -> int:
+        return self._lobby[0]
+
+    @property
+    def lobby_members(self) -> tuple:
+        return self._lobby[1]
+
+    def _refresh_lobby_members(self, lobby_id: int = None):
+        """Internal helper to update the lobby members; calls the native functions directly, as it runs in callbacks"""
+        if lobby_id is None:
+            lobby_id = self.current_lobby_id
+
+        members = ()
+        if lobby_id != 0:
+            members = tuple(self.steam.GetLobbyMemberByIndex(lobby_id, index)
+                            for index in range(self.steam.GetNumLobbyMembers(lobby_id)))
+
+        self._lobby = (lobby_id, members)
+
+    def GetLobbyMembers(self) -> tuple:
+        """
+        Returns lobby members
+        :return: tuple of member Steam IDs, a snapshot that later lobby changes replace instead of modifying
+        """
+        return self._lobby[1]
 
-    def GetLobbyMembers(self) -> list:
+    def GetLobbySnapshot(self) -> tuple:
         """
-        Returns lobby members list
-        :return: list
+        Returns the current lobby together with its members, consistent with each other
+        :return: tuple of lobby id and tuple of member Steam IDs
         """
-        return self.lobby_members
+        return self._lobby
 
     def GetCurrentLobbyId(self) -> int:
-        return self.current_lobby_id
+        return self._lobby[0]
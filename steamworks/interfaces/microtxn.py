@@ -1,14 +1,10 @@
-from ctypes import *
-from enum import Enum
-
-import steamworks.util 		as util
-from steamworks.enums 		import *
-from steamworks.structs 	import *
-from steamworks.exceptions 	import *
+from steamworks.enums import SteamEventType
+from steamworks.exceptions import SteamNotLoadedException
+from steamworks.interfaces import close_subscriptions
 
 
 class SteamMicroTxn(object):
-    _MicroTxnAuthorizationResponse_t = CFUNCTYPE(None, MicroTxnAuthorizationResponse_t)
+    # Event bus subscription managed by SetAuthorizationResponseCallback
     _MicroTxnAuthorizationResponse = None
 
     def __init__(self, steam: object):
@@ -16,12 +12,19 @@ class SteamMicroTxn(object):
         if not self.steam.loaded():
             raise SteamNotLoadedException('STEAMWORKS not yet loaded')
 
+    def close(self) -> None:
+        """Unsubscribe this interface from the event bus; STEAMWORKS calls it when it drops the interface
+
+        :return: None
+        """
+        close_subscriptions(self, ('_MicroTxnAuthorizationResponse',))
+
     def SetAuthorizationResponseCallback(self, callback: object) -> bool:
         """Set callback for when Steam informs about the consent flow result
 
         :param callback: callable
         :return: bool
         """
-        self._MicroTxnAuthorizationResponse = SteamMicroTxn._MicroTxnAuthorizationResponse_t(callback)
-        self.steam.MicroTxn_SetAuthorizationResponseCallback(self._MicroTxnAuthorizationResponse)
+        self._MicroTxnAuthorizationResponse = self.steam.bus.replace(
+            self._MicroTxnAuthorizationResponse, SteamEventType.MICROTXN_AUTHORIZATION, callback)
         return True
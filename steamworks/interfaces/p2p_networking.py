@@ -1,20 +1,356 @@
+import time
+from ctypes import addressof, byref, c_char, c_char_p, c_uint8, c_uint32, c_void_p, cast, \
+    create_string_buffer, memmove, sizeof
+
+from steamworks.enums import SteamEventType
+from steamworks.structs import P2PPacketRecord_t, P2PSendItem_t, P2PSessionState_t
 from steamworks.exceptions import SteamNotLoadedException
+from steamworks.interfaces import close_subscriptions
+
+# Methods shadowed by their instrumented variants while stats are enabled
+_INSTRUMENTED_METHODS = ('SendP2PPacket', 'SendP2PPacketsBatch', 'ReadP2PPacket', 'ReadP2PPackets')
+
+
+def _buffer_address(data: object, keepalive: list) -> tuple:
+    """Resolve the address and size of a buffer-protocol object without copying its contents
+
+    Read-only buffers that are not plain bytes (e.g. a memoryview slice of bytes) cannot be pinned through ctypes and
+    are copied once. Every object that has to stay alive until the native call returns is appended to keepalive.
+
+    :param data: bytes, bytearray, memoryview or any other buffer-protocol object
+    :param keepalive: list
+    :return: tuple (address, size)
+    """
+    if isinstance(data, bytes):
+        pointer = c_char_p(data)
+        keepalive.append(pointer)
+        return cast(pointer, c_void_p).value or 0, len(data)
+
+    view = memoryview(data)
+    if not view.c_contiguous:
+        raise ValueError('P2P payloads must be C-contiguous buffers')
+
+    if view.readonly:
+        return _buffer_address(view.tobytes(), keepalive)
+
+    if view.nbytes == 0:
+        return 0, 0
+
+    array = (c_char * view.nbytes).from_buffer(view.cast('B'))
+    keepalive.append(array)
+    return addressof(array), view.nbytes
 
 
 class SteamP2PNetworking:
+    # Event bus subscriptions managed by the Set*Callback methods
+    _P2PSessionRequest = None
+    _P2PSessionConnectFail = None
+
+    # P2PStats while EnableStats is active
+    stats = None
+
+    # Called with the peer of every packet sent or read, see SetActivityCallback
+    _activity = None
+
+    # Installed on the instance by EnableStats, so thread-safe mode has to lock them like the methods they replace
+    _SYNCHRONIZED_METHODS = tuple(f'_{name}WithStats' for name in _INSTRUMENTED_METHODS)
+
+    # Minimum arena size for ReadP2PPackets; it also holds max_packets packets of P2P_PACKET_SIZE bytes and grows
+    # whenever a batch stops because the arena is full
+    P2P_ARENA_SIZE = 64 * 1024
+    # Largest unreliable packet
+    P2P_PACKET_SIZE = 1200
+
     def __init__(self, steam: object):
         self.steam = steam
         if not self.steam.loaded():
             raise SteamNotLoadedException('STEAMWORKS not yet loaded')
 
+        self._arena = None
+        self._arena_view = None
+        self._records = None
+        self._next_msg_size = c_uint32()
+        self._send_items = None
+        self._send_results = None
+
+    def close(self) -> None:
+        """Unsubscribe this interface from the event bus; STEAMWORKS calls it when it drops the interface
+
+        :return: None
+        """
+        close_subscriptions(self, ('_P2PSessionRequest', '_P2PSessionConnectFail'))
+
     def CreateP2PSessionWithUser(self, steam_id_remote: int) -> bool:
         return self.steam.CreateP2PSessionWithUser(steam_id_remote)
 
     def CloseP2PSessionWithUser(self, steam_id_remote: int) -> bool:
         return self.steam.CloseP2PSessionWithUser(steam_id_remote)
 
-    def SendP2PPacket(self, steam_id_remote: int, data: bytes, data_size: int, send_type: int, channel: int) -> bool:
-        return self.steam.SendP2PPacket(steam_id_remote, data, data_size, send_type, channel)
+    def AcceptP2PSessionWithUser(self, steam_id_remote: int) -> bool:
+        """Accept a session request, usually from within the session request callback
+
+        :param steam_id_remote: int
+        :return: bool
+        """
+        return self.steam.AcceptP2PSessionWithUser(steam_id_remote)
+
+    def GetP2PSessionState(self, steam_id_remote: int) -> P2PSessionState_t:
+        """Get connection state, relay usage and send queue size of the session with a user
+
+        :param steam_id_remote: int
+        :return: P2PSessionState_t or None if there is no session with that user
+        """
+        state = P2PSessionState_t()
+        if not self.steam.GetP2PSessionState(steam_id_remote, byref(state)):
+            return None
+
+        return state
+
+    def SetSessionRequestCallback(self, callback: object) -> bool:
+        """Set callback for when a user without an open session sends a packet; accept it with AcceptP2PSessionWithUser
+
+        :param callback: callable
+        :return: bool
+        """
+        self._P2PSessionRequest = self.steam.bus.replace(
+            self._P2PSessionRequest, SteamEventType.P2P_SESSION_REQUEST, callback)
+        return True
+
+    def SetSessionConnectFailCallback(self, callback: object) -> bool:
+        """Set callback for when a session could not be established or was lost
+
+        :param callback: callable
+        :return: bool
+        """
+        self._P2PSessionConnectFail = self.steam.bus.replace(
+            self._P2PSessionConnectFail, SteamEventType.P2P_SESSION_CONNECT_FAIL, callback)
+        return True
+
+    def SetActivityCallback(self, callback: object) -> bool:
+        """Set callback receiving the peer of every packet sent or read through this interface, which is how
+        P2PSessionManager keeps its sessions from being evicted as idle
+
+        :param callback: callable or None to remove it
+        :return: bool
+        """
+        self._activity = callback
+        return True
+
+    def SendP2PPacket(self, steam_id_remote: int, data: bytes, data_size: int, send_type: int, channel: int = 0) -> bool:
+        result = self.steam.SendP2PPacket(steam_id_remote, data, data_size, send_type, channel)
+        if result and self._activity is not None:
+            self._activity(steam_id_remote)
+
+        return result
+
+    def SendP2PPacketsBatch(self, items: list = None, payload: object = None, peers: list = None, send_type: int = 0,
+                            channel: int = 0) -> int:
+        """Send many P2P packets with a single native call without copying their payloads
+
+        Either pass items, a sequence of (steam_id_remote, buffer, send_type, channel) tuples, or one shared payload
+        plus the list of peers it should be sent to using send_type and channel.
+
+        :param items: list of (int, buffer-protocol object, int, int)
+        :param payload: buffer-protocol object
+        :param peers: list of int
+        :param send_type: int
+        :param channel: int
+        :return: int bitmap, bit i is set if item (or peer) i was accepted for sending
+        """
+        if items is None:
+            if payload is None or peers is None:
+                raise AttributeError('Supply either `items` or `payload` and `peers`')
+
+            items = [(peer, payload, send_type, channel) for peer in peers]
+
+        elif payload is not None or peers is not None:
+            raise AttributeError('`items` can not be combined with `payload` and `peers`')
+
+        count = len(items)
+        if count == 0:
+            return 0
+
+        if self._send_items is None or len(self._send_items) < count:
+            self._send_items = (P2PSendItem_t * count)()
+            self._send_results = (c_uint8 * ((count + 7) // 8))()
+
+        keepalive = []
+        buffers = {}
+        descriptors = self._send_items
+        for index, (steam_id_remote, data, item_send_type, item_channel) in enumerate(items):
+            descriptor = descriptors[index]
+            # Shared payloads are resolved (and, for read-only views, copied) only once
+            resolved = buffers.get(id(data))
+            if resolved is None:
+                resolved = buffers[id(data)] = _buffer_address(data, keepalive)
+
+            descriptor.steamIDRemote = steam_id_remote
+            descriptor.pubData, descriptor.cubData = resolved
+            descriptor.eP2PSendType = item_send_type
+            descriptor.eP2PChannel = item_channel
+
+        self.steam.SendP2PPackets(descriptors, count, self._send_results)
+        sent = int.from_bytes(bytes(self._send_results)[:(count + 7) // 8], 'little')
+        activity = self._activity
+        if activity is not None:
+            for index in range(count):
+                if sent >> index & 1:
+                    activity(descriptors[index].steamIDRemote)
+
+        return sent
+
+    def ReadP2PPacket(self, buffer: bytes, buffer_size: int, msg_size: int, sender_steam_id: int,
+                      channel: int = 0) -> bool:
+        result = self.steam.ReadP2PPacket(buffer, buffer_size, msg_size, sender_steam_id, channel)
+        if result and self._activity is not None:
+            # Out-params are usually passed with byref(), which keeps the ctypes object in _obj
+            self._activity(getattr(sender_steam_id, '_obj', sender_steam_id).value)
+
+        return result
+
+    def ReadP2PPackets(self, channel: int = 0, max_packets: int = 64) -> tuple:
+        """Drain up to max_packets pending packets of a channel with a single native call
+
+        Packets are read into one preallocated arena and their records into one preallocated record array, both reused
+        by every call, so nothing is allocated per packet. Records, the memoryview and any slice of it are only valid
+        until the next call; copy payloads that need to outlive the current tick.
+
+            count, records, arena = steamworks.P2PNetworking.ReadP2PPackets()
+            for index in range(count):
+                record = records[index]
+                handle(record.steamIDRemote, arena[record.offset:record.offset + record.size])
+
+        :param channel: int
+        :param max_packets: int
+        :return: tuple (number of packets read, P2PPacketRecord_t array whose first count records are valid,
+                 memoryview over the arena)
+        """
+        records = self._records
+        if records is None or len(records) < max_packets:
+            records = self._records = (P2PPacketRecord_t * max_packets)()
+
+        arena = self._arena
+        if arena is None or len(arena) < max_packets * self.P2P_PACKET_SIZE:
+            arena = self._grow_arena(max(self.P2P_ARENA_SIZE, max_packets * self.P2P_PACKET_SIZE), 0)
+
+        next_msg_size = self._next_msg_size
+        count = self.steam.ReadP2PPackets(arena, len(arena), records, max_packets, byref(next_msg_size), channel)
+        while count < max_packets and next_msg_size.value:
+            # The batch stopped because the arena is full: grow it, keep what was read and continue behind it
+            used = records[count - 1].offset + records[count - 1].size if count else 0
+            size = len(arena)
+            while size - used < next_msg_size.value:
+                size *= 2
+
+            arena = self._grow_arena(size, used)
+            read = self.steam.ReadP2PPackets(
+                (c_char * (size - used)).from_buffer(arena, used), size - used,
+                (P2PPacketRecord_t * (max_packets - count)).from_buffer(records, count * sizeof(P2PPacketRecord_t)),
+                max_packets - count, byref(next_msg_size), channel)
+
+            for index in range(count, count + read):
+                records[index].offset += used
+
+            count += read
+
+        activity = self._activity
+        if activity is not None:
+            for index in range(count):
+                activity(records[index].steamIDRemote)
+
+        return count, records, self._arena_view
+
+    def _grow_arena(self, size: int, used: int) -> object:
+        arena = create_string_buffer(size)
+        if used:
+            memmove(arena, self._arena, used)
+
+        self._arena = arena
+        self._arena_view = memoryview(arena)
+        return arena
+
+    def EnableStats(self, report_callback: object = None, report_interval: float = 1.0) -> object:
+        """Start collecting per peer and channel traffic statistics
+
+        The send and read methods are replaced by instrumented variants on this instance only; DisableStats removes
+        them again, so there is no overhead while stats are disabled.
+
+        :param report_callback: callable receiving a snapshot dict every report_interval seconds
+        :param report_interval: float
+        :return: P2PStats
+        """
+        from steamworks.p2p.stats import P2PStats
+
+        self.stats = P2PStats(report_callback, report_interval)
+        for name in _INSTRUMENTED_METHODS:
+            setattr(self, name, getattr(self, f'_{name}WithStats'))
+
+        return self.stats
+
+    def DisableStats(self) -> None:
+        """Stop collecting statistics and restore the uninstrumented methods
+
+        :return: None
+        """
+        for name in _INSTRUMENTED_METHODS:
+            self.__dict__.pop(name, None)
+
+        self.stats = None
+
+    def GetStatsSnapshot(self) -> dict:
+        """Get all collected statistics
+
+        :return: dict, empty while stats are disabled
+        """
+        if self.stats is None:
+            return {}
+
+        return self.stats.snapshot()
+
+    def _SendP2PPacketWithStats(self, steam_id_remote: int, data: bytes, data_size: int, send_type: int,
+                                channel: int = 0) -> bool:
+        result = SteamP2PNetworking.SendP2PPacket(self, steam_id_remote, data, data_size, send_type, channel)
+        stats = self.stats
+        stats.record_send(steam_id_remote, channel, data_size, result)
+        stats.maybe_report()
+        return result
+
+    def _SendP2PPacketsBatchWithStats(self, items: list = None, payload: object = None, peers: list = None,
+                                      send_type: int = 0, channel: int = 0) -> int:
+        sent = SteamP2PNetworking.SendP2PPacketsBatch(self, items, payload, peers, send_type, channel)
+        stats = self.stats
+        if items is None:
+            size = memoryview(payload).nbytes
+            for index, peer in enumerate(peers):
+                stats.record_send(peer, channel, size, sent >> index & 1)
+        else:
+            for index, (peer, data, _, item_channel) in enumerate(items):
+                stats.record_send(peer, item_channel, memoryview(data).nbytes, sent >> index & 1)
+
+        stats.maybe_report()
+        return sent
+
+    def _ReadP2PPacketWithStats(self, buffer: bytes, buffer_size: int, msg_size: int, sender_steam_id: int,
+                                channel: int = 0) -> bool:
+        start = time.perf_counter()
+        result = SteamP2PNetworking.ReadP2PPacket(self, buffer, buffer_size, msg_size, sender_steam_id, channel)
+        self.stats.record_read_duration(time.perf_counter() - start)
+        if result:
+            # Out-params are usually passed with byref(), which keeps the ctypes object in _obj
+            self.stats.record_receive(getattr(sender_steam_id, '_obj', sender_steam_id).value, channel,
+                                      getattr(msg_size, '_obj', msg_size).value)
+
+        self.stats.maybe_report()
+        return result
+
+    def _ReadP2PPacketsWithStats(self, channel: int = 0, max_packets: int = 64) -> tuple:
+        start = time.perf_counter()
+        count, records, arena = SteamP2PNetworking.ReadP2PPackets(self, channel, max_packets)
+        stats = self.stats
+        stats.record_read_duration(time.perf_counter() - start)
+        for index in range(count):
+            record = records[index]
+            stats.record_receive(record.steamIDRemote, channel, record.size)
 
-    def ReadP2PPacket(self, buffer: bytes, buffer_size: int, msg_size: int, sender_steam_id: int, channel: int) -> bool:
-        return self.steam.ReadP2PPacket(buffer, buffer_size, msg_size, sender_steam_id, channel)
+        stats.maybe_report()
+        return count, records, arena
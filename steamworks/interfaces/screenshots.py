@@ -1,10 +1,4 @@
-from ctypes import *
-from enum import Enum
-
-import steamworks.util 		as util
-from steamworks.enums 		import *
-from steamworks.structs 	import *
-from steamworks.exceptions 	import *
+from steamworks.exceptions import SteamNotLoadedException
 
 
 class SteamScreenshots(object):
@@ -1,10 +1,6 @@
-from ctypes import *
-from enum import Enum
+from ctypes import create_string_buffer
 
-import steamworks.util 		as util
-from steamworks.enums 		import *
-from steamworks.structs 	import *
-from steamworks.exceptions 	import *
+from steamworks.exceptions import SteamNotLoadedException
 
 
 class SteamUsers(object):
@@ -1,14 +1,10 @@
-from ctypes import *
-from enum import Enum
-
-import steamworks.util 		as util
-from steamworks.enums 		import *
-from steamworks.structs 	import *
-from steamworks.exceptions 	import *
+from steamworks.enums import SteamEventType
+from steamworks.exceptions import SteamNotLoadedException, UnsupportedSteamStatValue
+from steamworks.interfaces import close_subscriptions
 
 
 class SteamUserStats(object):
-    _LeaderboardFindResult_t = CFUNCTYPE(None, FindLeaderboardResult_t)
+    # Event bus subscription managed by SetFindLeaderboardResultCallback
     _LeaderboardFindResult = None
 
     def __init__(self, steam: object):
@@ -17,6 +13,14 @@ class SteamUserStats(object):
             raise SteamNotLoadedException('STEAMWORKS not yet loaded')
 
 
+    def close(self) -> None:
+        """Unsubscribe this interface from the event bus; STEAMWORKS calls it when it drops the interface
+
+        :return: None
+        """
+        close_subscriptions(self, ('_LeaderboardFindResult',))
+
+
     def GetAchievement(self, name: str) -> bool:
         """Return true/false if use has given achievement
 
@@ -137,8 +141,8 @@ class SteamUserStats(object):
         :param callback: callable
         :return: bool
         """
-        self._LeaderboardFindResult = self._LeaderboardFindResult_t(callback)
-        self.steam.Leaderboard_SetFindLeaderboardResultCallback(self._LeaderboardFindResult)
+        self._LeaderboardFindResult = self.steam.bus.replace(
+            self._LeaderboardFindResult, SteamEventType.LEADERBOARD_FOUND, callback)
         return True
 
 
@@ -157,5 +161,15 @@ class SteamUserStats(object):
         else:
             self.SetFindLeaderboardResultCallback(callback)
 
-        Steam.cdll.Leaderboard_FindLeaderboard(name.encode())
-        return True
\ No newline at end of file
+        self.steam.Leaderboard_FindLeaderboard(name.encode())
+        return True
+
+    def FindLeaderboardAsync(self, name: str, timeout: float = None) -> object:
+        """Find Leaderboard by name and return a future for its FindLeaderboardResult_t
+
+        :param name: str
+        :param timeout: float, seconds until the future fails, None to wait forever
+        :return: asyncio.Future when called on a running event loop, concurrent.futures.Future otherwise
+        """
+        call = self.steam.Leaderboard_FindLeaderboard(name.encode())
+        return self.steam.call_results().track(SteamEventType.LEADERBOARD_FOUND, call, timeout)
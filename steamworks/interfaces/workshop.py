@@ -1,19 +1,96 @@
-from ctypes import *
-from enum import Enum
+import threading
+from collections.abc import Mapping
+from ctypes import byref, c_char_p, c_uint32, c_uint64, create_string_buffer
 
-import steamworks.util 		as util
-from steamworks.enums 		import *
-from steamworks.structs 	import *
-from steamworks.exceptions 	import *
+from steamworks.enums import EItemState, EItemUpdateStatus, ERemoteStoragePublishedFileVisibility, EWorkshopFileType, \
+    SteamEventType
+from steamworks.exceptions import SetupRequired, SteamNotLoadedException
+from steamworks.interfaces import close_subscriptions
 
 
-class SteamWorkshop(object):
-    _CreateItemResult_t 		= CFUNCTYPE(None, CreateItemResult_t)
-    _SubmitItemUpdateResult_t 	= CFUNCTYPE(None, SubmitItemUpdateResult_t)
-    _ItemInstalled_t 			= CFUNCTYPE(None, ItemInstalled_t)
-    _RemoteStorageSubscribePublishedFileResult_t 	= CFUNCTYPE(None, SubscriptionResult)
-    _RemoteStorageUnsubscribePublishedFileResult_t 	= CFUNCTYPE(None, SubscriptionResult)
+class _WorkshopRecord(Mapping):
+    """Base of the result records; also a read-only Mapping of their fields, like the dicts the records replaced"""
+    __slots__ = ()
+    _keys = ()
+
+    def __getitem__(self, key: str) -> object:
+        if key not in self._keys:
+            raise KeyError(key)
+
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+    def _asdict(self) -> dict:
+        return {key: getattr(self, key) for key in self._keys}
+
+
+class ItemUpdateProgress(_WorkshopRecord):
+    """Result of SteamWorkshop.GetItemUpdateProgress"""
+    __slots__ = ('status', 'processed', 'total')
+    _keys = __slots__ + ('progress',)
+
+    def __init__(self, status: EItemUpdateStatus, processed: int, total: int):
+        self.status = status
+        self.processed = processed
+        self.total = total
+
+    @property
+    def progress(self) -> float:
+        return self.processed / (self.total or 1)
+
+
+class ItemInstallInfo(_WorkshopRecord):
+    """Result of SteamWorkshop.GetItemInstallInfo"""
+    __slots__ = ('disk_size', 'folder', 'timestamp')
+    _keys = __slots__
+
+    def __init__(self, disk_size: int, folder: str, timestamp: int):
+        self.disk_size = disk_size
+        self.folder = folder
+        self.timestamp = timestamp
+
 
+class ItemDownloadInfo(_WorkshopRecord):
+    """Result of SteamWorkshop.GetItemDownloadInfo"""
+    __slots__ = ('downloaded', 'total')
+    _keys = __slots__ + ('progress',)
+
+    def __init__(self, downloaded: int, total: int):
+        self.downloaded = downloaded
+        self.total = total
+
+    @property
+    def progress(self) -> float:
+        return 0.0 if self.total <= 0 else self.downloaded / self.total
+
+
+class _OutParameters(threading.local):
+    """Out-parameters of the polling getters, one set per thread
+
+    ctypes releases the GIL during the native call, so two threads sharing one set could read each other's results.
+    """
+
+    def __init__(self):
+        self.first = c_uint64()
+        self.second = c_uint64()
+        self.timestamp = c_uint32()
+        self.first_ref = byref(self.first)
+        self.second_ref = byref(self.second)
+        self.timestamp_ref = byref(self.timestamp)
+        self.folder = create_string_buffer(1024)
+
+
+class SteamWorkshop(object):
+    # Event bus subscriptions managed by the Set*Callback methods
     _CreateItemResult			= None
     _SubmitItemUpdateResult 	= None
     _ItemInstalled 				= None
@@ -26,17 +103,29 @@ class SteamWorkshop(object):
         if not self.steam.loaded():
             raise SteamNotLoadedException('STEAMWORKS not yet loaded')
 
+        # Reused by the polling getters below, which copy the values out before returning
+        self._out = _OutParameters()
+
         self.GetNumSubscribedItems() # This fixes #58
 
 
+    def close(self) -> None:
+        """Unsubscribe this interface from the event bus; STEAMWORKS calls it when it drops the interface
+
+        :return: None
+        """
+        close_subscriptions(self, ('_CreateItemResult', '_SubmitItemUpdateResult', '_ItemInstalled',
+                                   '_RemoteStorageSubscribePublishedFileResult',
+                                   '_RemoteStorageUnsubscribePublishedFileResult'))
+
+
     def SetItemCreatedCallback(self, callback: object) -> bool:
         """Set callback for item created
 
         :param callback: callable
         :return: bool
         """
-        self._CreateItemResult = SteamWorkshop._CreateItemResult_t(callback)
-        self.steam.Workshop_SetItemCreatedCallback(self._CreateItemResult)
+        self._CreateItemResult = self.steam.bus.replace(self._CreateItemResult, SteamEventType.ITEM_CREATED, callback)
         return True
 
 
@@ -46,8 +135,7 @@ class SteamWorkshop(object):
         :param callback: callable
         :return: bool
         """
-        self._SubmitItemUpdateResult = self._SubmitItemUpdateResult_t(callback)
-        self.steam.Workshop_SetItemUpdatedCallback(self._SubmitItemUpdateResult)
+        self._SubmitItemUpdateResult = self.steam.bus.replace(self._SubmitItemUpdateResult, SteamEventType.ITEM_UPDATED, callback)
         return True
 
 
@@ -57,8 +145,7 @@ class SteamWorkshop(object):
         :param callback: callable
         :return: bool
         """
-        self._ItemInstalled = self._ItemInstalled_t(callback)
-        self.steam.Workshop_SetItemInstalledCallback(self._ItemInstalled)
+        self._ItemInstalled = self.steam.bus.replace(self._ItemInstalled, SteamEventType.ITEM_INSTALLED, callback)
         return True
 
 
@@ -67,8 +154,9 @@ class SteamWorkshop(object):
 
         :return: None
         """
-        self._ItemInstalled = None
-        self.steam.Workshop_ClearItemInstalledCallback()
+        if self._ItemInstalled is not None:
+            self._ItemInstalled.unsubscribe()
+            self._ItemInstalled = None
 
 
     def SetItemSubscribedCallback(self, callback: object) -> bool:
@@ -77,8 +165,7 @@ class SteamWorkshop(object):
         :param callback: callable
         :return: bool
         """
-        self._RemoteStorageSubscribePublishedFileResult = self._RemoteStorageSubscribePublishedFileResult_t(callback)
-        self.steam.Workshop_SetItemSubscribedCallback(self._RemoteStorageSubscribePublishedFileResult)
+        self._RemoteStorageSubscribePublishedFileResult = self.steam.bus.replace(self._RemoteStorageSubscribePublishedFileResult, SteamEventType.ITEM_SUBSCRIBED, callback)
         return True
 
 
@@ -88,19 +175,18 @@ class SteamWorkshop(object):
         :param callback: callable
         :return: bool
         """
-        self._RemoteStorageUnsubscribePublishedFileResult = self._RemoteStorageUnsubscribePublishedFileResult_t(callback)
-        self.steam.Workshop_SetItemUnsubscribedCallback(self._RemoteStorageUnsubscribePublishedFileResult)
+        self._RemoteStorageUnsubscribePublishedFileResult = self.steam.bus.replace(self._RemoteStorageUnsubscribePublishedFileResult, SteamEventType.ITEM_UNSUBSCRIBED, callback)
         return True
 
 
-    def CreateItem(self, app_id: int, filetype: EWorkshopFileType, callback: object = None, override_callback: bool = False) -> None:
+    def CreateItem(self, app_id: int, filetype: EWorkshopFileType, callback: object = None, override_callback: bool = False) -> int:
         """Creates a new workshop item with no content attached yet
 
         :param app_id: int
         :param filetype: EWorkshopFileType
         :param callback: callable
         :param override_callback: bool
-        :return: None
+        :return: int, SteamAPICall_t handle of the request, 0 if it could not be issued
         """
         if override_callback:
             self.SetItemCreatedCallback(callback)
@@ -108,16 +194,16 @@ class SteamWorkshop(object):
         elif callback and not self._CreateItemResult:
             self.SetItemCreatedCallback(callback)
 
-        self.steam.Workshop_CreateItem(app_id, filetype.value)
+        return self.steam.Workshop_CreateItem(app_id, filetype.value)
 
 
-    def SubscribeItem(self, published_file_id: int, callback: object = None, override_callback: bool = False) -> None:
+    def SubscribeItem(self, published_file_id: int, callback: object = None, override_callback: bool = False) -> int:
         """ Subscribe to a UGC (Workshp) item
 
         :param published_file_id: int
         :param callback: callable
         :param override_callback: bool
-        :return:
+        :return: int, SteamAPICall_t handle of the request, 0 if it could not be issued
         """
         if override_callback:
             self.SetItemSubscribedCallback(callback)
@@ -128,16 +214,16 @@ class SteamWorkshop(object):
         if self._RemoteStorageSubscribePublishedFileResult is None:
             raise SetupRequired('Call `SetItemSubscribedCallback` first or supply a `callback`')
 
-        self.steam.Workshop_SubscribeItem(published_file_id)
+        return self.steam.Workshop_SubscribeItem(published_file_id)
 
 
-    def UnsubscribeItem(self, published_file_id: int, callback: object = None, override_callback: bool = False) -> None:
+    def UnsubscribeItem(self, published_file_id: int, callback: object = None, override_callback: bool = False) -> int:
         """ Unsubscribe to a UGC (Workshp) item
 
         :param published_file_id: int
         :param callback: callable
         :param override_callback: bool
-        :return:
+        :return: int, SteamAPICall_t handle of the request, 0 if it could not be issued
         """
         if override_callback:
             self.SetItemUnsubscribedCallback(callback)
@@ -148,7 +234,41 @@ class SteamWorkshop(object):
         if self._RemoteStorageUnsubscribePublishedFileResult is None:
             raise SetupRequired('Call `SetItemUnsubscribedCallback` first or supply a `callback`')
 
-        self.steam.Workshop_UnsubscribeItem(published_file_id)
+        return self.steam.Workshop_UnsubscribeItem(published_file_id)
+
+
+    def CreateItemAsync(self, app_id: int, filetype: EWorkshopFileType, timeout: float = None) -> object:
+        """Create a new workshop item and return a future for its CreateItemResult_t
+
+        :param app_id: int
+        :param filetype: EWorkshopFileType
+        :param timeout: float, seconds until the future fails, None to wait forever
+        :return: asyncio.Future when called on a running event loop, concurrent.futures.Future otherwise
+        """
+        call = self.steam.Workshop_CreateItem(app_id, filetype.value)
+        return self.steam.call_results().track(SteamEventType.ITEM_CREATED, call, timeout)
+
+
+    def SubscribeItemAsync(self, published_file_id: int, timeout: float = None) -> object:
+        """Subscribe to a UGC (Workshop) item and return a future for its SubscriptionResult
+
+        :param published_file_id: int
+        :param timeout: float, seconds until the future fails, None to wait forever
+        :return: asyncio.Future when called on a running event loop, concurrent.futures.Future otherwise
+        """
+        call = self.steam.Workshop_SubscribeItem(published_file_id)
+        return self.steam.call_results().track(SteamEventType.ITEM_SUBSCRIBED, call, timeout)
+
+
+    def UnsubscribeItemAsync(self, published_file_id: int, timeout: float = None) -> object:
+        """Unsubscribe from a UGC (Workshop) item and return a future for its SubscriptionResult
+
+        :param published_file_id: int
+        :param timeout: float, seconds until the future fails, None to wait forever
+        :return: asyncio.Future when called on a running event loop, concurrent.futures.Future otherwise
+        """
+        call = self.steam.Workshop_UnsubscribeItem(published_file_id)
+        return self.steam.call_results().track(SteamEventType.ITEM_UNSUBSCRIBED, call, timeout)
 
 
     def StartItemUpdate(self, app_id: int, published_file_id: int) -> int:
@@ -234,14 +354,14 @@ class SteamWorkshop(object):
 
 
     def SubmitItemUpdate(self, update_handle: int, change_note: str, callback: object = None, \
-                         override_callback: bool = False) -> None:
+                         override_callback: bool = False) -> int:
         """Submit the item update with the given handle to Steam
 
         :param update_handle: int
         :param change_note: str
         :param callback: callable
         :param override_callback: bool
-        :return: None
+        :return: int, SteamAPICall_t handle of the request, 0 if it could not be issued
         """
         if override_callback:
             self.SetItemUpdatedCallback(callback)
@@ -254,29 +374,30 @@ class SteamWorkshop(object):
         else:
             change_note = None
 
-        self.steam.Workshop_SubmitItemUpdate(update_handle, change_note)
+        return self.steam.Workshop_SubmitItemUpdate(update_handle, change_note)
 
 
-    def GetItemUpdateProgress(self, update_handle: int) -> dict:
-        """Get the progress of an item update request
+    def SubmitItemUpdateAsync(self, update_handle: int, change_note: str, timeout: float = None) -> object:
+        """Submit the item update with the given handle and return a future for its SubmitItemUpdateResult_t
 
         :param update_handle: int
-        :return: dict
+        :param change_note: str
+        :param timeout: float, seconds until the future fails, None to wait forever
+        :return: asyncio.Future when called on a running event loop, concurrent.futures.Future otherwise
         """
-        punBytesProcessed = c_uint64()
-        punBytesTotal = c_uint64()
+        call = self.steam.Workshop_SubmitItemUpdate(update_handle, change_note.encode() if change_note else None)
+        return self.steam.call_results().track(SteamEventType.ITEM_UPDATED, call, timeout)
 
-        update_status = self.steam.Workshop_GetItemUpdateProgress(
-            update_handle,
-            pointer(punBytesProcessed),
-            pointer(punBytesTotal))
 
-        return {
-            'status' : EItemUpdateStatus(update_status),
-            'processed' : punBytesProcessed.value,
-            'total' : punBytesTotal.value,
-            'progress' : ( punBytesProcessed.value / (punBytesTotal.value or 1) )
-        }
+    def GetItemUpdateProgress(self, update_handle: int) -> ItemUpdateProgress:
+        """Get the progress of an item update request
+
+        :param update_handle: int
+        :return: ItemUpdateProgress
+        """
+        out = self._out
+        update_status = self.steam.Workshop_GetItemUpdateProgress(update_handle, out.first_ref, out.second_ref)
+        return ItemUpdateProgress(EItemUpdateStatus(update_status), out.first.value, out.second.value)
 
 
     def GetNumSubscribedItems(self) -> int:
@@ -330,49 +451,37 @@ class SteamWorkshop(object):
         return EItemState(self.steam.Workshop_GetItemState(published_file_id))
 
 
-    def GetItemInstallInfo(self, published_file_id: int, max_path_length: int = 1024) -> dict:
+    def GetItemInstallInfo(self, published_file_id: int, max_path_length: int = 1024) -> ItemInstallInfo:
         """Get info about an installed item
 
         :param published_file_id: int
-        :param max_path_length: str
-        :return: dict
+        :param max_path_length: int
+        :return: ItemInstallInfo, or an empty dict if the item is not installed
         """
-        punSizeOnDisk = pointer(c_uint64(0))
-        punTimeStamp = pointer(c_uint32(0))
-        pchFolder = create_string_buffer(max_path_length)
+        out = self._out
+        folder = out.folder
+        if len(folder) < max_path_length:
+            folder = out.folder = create_string_buffer(max_path_length)
 
         is_installed = self.steam.Workshop_GetItemInstallInfo(
-            published_file_id, punSizeOnDisk, pchFolder, max_path_length, punTimeStamp)
+            published_file_id, out.first_ref, folder, max_path_length, out.timestamp_ref)
 
         if not is_installed:
             return {}
 
-        return {
-            'disk_size' : punSizeOnDisk,
-            'folder' : pchFolder.value.decode(),
-            'timestamp' : punTimeStamp.contents.value
-        }
+        return ItemInstallInfo(out.first.value, folder.value.decode(), out.timestamp.value)
 
 
-    def GetItemDownloadInfo(self, published_file_id: int) -> dict:
+    def GetItemDownloadInfo(self, published_file_id: int) -> ItemDownloadInfo:
         """Get download info for a subscribed item
 
         :param published_file_id: int
-        :return:
+        :return: ItemDownloadInfo, or an empty dict if no download info is available
         """
-        punBytesDownloaded = pointer(c_uint64(0))
-        punBytesTotal = pointer(c_uint64(0))
-
         # pBytesTotal will only be valid after the download has started.
-        available = self.steam.Workshop_GetItemDownloadInfo(published_file_id, punBytesDownloaded, punBytesTotal)
-        if available:
-            downloaded = punBytesDownloaded.contents.value
-            total = punBytesTotal.contents.value
-
-            return {
-                'downloaded' : downloaded,
-                'total' : total,
-                'progress' : 0.0 if total <= 0 else ( downloaded / total )
-            }
-
-        return {}
+        out = self._out
+        available = self.steam.Workshop_GetItemDownloadInfo(published_file_id, out.first_ref, out.second_ref)
+        if not available:
+            return {}
+
+        return ItemDownloadInfo(out.first.value, out.second.value)
@@ -1,6 +1,7 @@
 import steamworks.structs as structs
 
-from ctypes import *
+from ctypes import CFUNCTYPE, POINTER, Structure, c_bool, c_char_p, c_float, c_int, c_int32, c_uint, c_uint8, c_uint32, \
+    c_uint64, c_void_p
 
 # May require some OS checks in future to pick the right calling convention
 # (ala CFUNCTYPE vs WINFUNCTYPE), but so far even on Win64, it's all cdecl
@@ -21,7 +22,9 @@ class InputDigitalActionData_t(Structure):
 
 
 STEAMWORKS_METHODS = {
+    "SteamInit": {"restype": c_int},
     "SteamShutdown": {"restype": None},
+    "RunCallbacks": {"restype": None},
     "RestartAppIfNecessary": {"restype": bool},
     "IsSteamRunning": {"restype": c_bool},
     "IsSubscribed": {"restype": bool},
@@ -93,8 +96,8 @@ STEAMWORKS_METHODS = {
         "restype": None,
         "argtypes": [c_void_p],
     },
-    "CreateLobby": {"restype": None, "argtypes": [c_uint64, c_uint64]},
-    "JoinLobby": {"restype": None, "argtypes": [c_uint64]},
+    "CreateLobby": {"restype": c_uint64, "argtypes": [c_uint64, c_uint64]},
+    "JoinLobby": {"restype": c_uint64, "argtypes": [c_uint64]},
     "LeaveLobby": {"restype": None, "argtypes": [c_uint64]},
     "InviteUserToLobby": {"restype": bool, "argtypes": [c_uint64, c_uint64]},
     "GetNumLobbyMembers": {"restype": c_uint64, "argtypes": [c_uint64]},
@@ -134,7 +137,7 @@ STEAMWORKS_METHODS = {
     "SetStatFloat": {"restype": bool},
     "StoreStats": {"restype": bool},
     "ClearAchievement": {"restype": bool},
-    "Leaderboard_FindLeaderboard": {"restype": bool, "argtypes": [c_char_p]},
+    "Leaderboard_FindLeaderboard": {"restype": c_uint64, "argtypes": [c_char_p]},
     "OverlayNeedsPresent": {"restype": bool},
     "GetAppID": {"restype": int},
     "GetCurrentBatteryPower": {"restype": int},
@@ -157,7 +160,7 @@ STEAMWORKS_METHODS = {
         "restype": None,
         "argtypes": [MAKE_CALLBACK(None, structs.CreateItemResult_t)],
     },
-    "Workshop_CreateItem": {"restype": None, "argtypes": [c_uint32, c_int32]},
+    "Workshop_CreateItem": {"restype": c_uint64, "argtypes": [c_uint32, c_int32]},
     "Workshop_SetItemUpdatedCallback": {
         "restype": None,
         "argtypes": [MAKE_CALLBACK(None, structs.SubmitItemUpdateResult_t)],
@@ -177,7 +180,7 @@ STEAMWORKS_METHODS = {
     },
     "Workshop_SetItemContent": {"restype": bool, "argtypes": [c_uint64, c_char_p]},
     "Workshop_SetItemPreview": {"restype": bool, "argtypes": [c_uint64, c_char_p]},
-    "Workshop_SubmitItemUpdate": {"argtypes": [c_uint64, c_char_p]},
+    "Workshop_SubmitItemUpdate": {"restype": c_uint64, "argtypes": [c_uint64, c_char_p]},
     "Workshop_GetItemUpdateProgress": {
         "restype": c_int32,
         "argtypes": [c_uint64, POINTER(c_uint64), POINTER(c_uint64)],
@@ -216,21 +219,71 @@ STEAMWORKS_METHODS = {
         "argtypes": [MAKE_CALLBACK(None, structs.SubscriptionResult)],
     },
     "Workshop_SuspendDownloads": {"restype": None, "argtypes": [c_bool]},
-    "Workshop_SubscribeItem": {"restype": None, "argtypes": [c_uint64]},
-    "Workshop_UnsubscribeItem": {"restype": None, "argtypes": [c_uint64]},
+    "Workshop_SubscribeItem": {"restype": c_uint64, "argtypes": [c_uint64]},
+    "Workshop_UnsubscribeItem": {"restype": c_uint64, "argtypes": [c_uint64]},
     "MicroTxn_SetAuthorizationResponseCallback": {
         "restype": None,
         "argtypes": [MAKE_CALLBACK(None, structs.MicroTxnAuthorizationResponse_t)],
     },
     "CreateP2PSessionWithUser": {"restype": c_bool, "argtypes": [c_uint64]},
     "CloseP2PSessionWithUser": {"restype": c_bool, "argtypes": [c_uint64]},
+    "AcceptP2PSessionWithUser": {"restype": c_bool, "argtypes": [c_uint64]},
+    "GetP2PSessionState": {
+        "restype": c_bool,
+        "argtypes": [c_uint64, POINTER(structs.P2PSessionState_t)],
+    },
+    "P2P_SetSessionRequestCallback": {
+        "restype": None,
+        "argtypes": [MAKE_CALLBACK(None, structs.P2PSessionRequest_t)],
+    },
+    "P2P_SetSessionConnectFailCallback": {
+        "restype": None,
+        "argtypes": [MAKE_CALLBACK(None, structs.P2PSessionConnectFail_t)],
+    },
     "SendP2PPacket": {
         "restype": c_bool,
-        "argtypes": [c_uint64, c_void_p, c_uint, c_int],
+        "argtypes": [c_uint64, c_void_p, c_uint, c_int, c_uint8],
     },
     "ReadP2PPacket": {
         "restype": c_bool,
-        "argtypes": [c_void_p, c_uint, POINTER(c_uint), POINTER(c_uint64)],
+        "argtypes": [c_void_p, c_uint, POINTER(c_uint), POINTER(c_uint64), c_uint8],
+    },
+    "SendP2PPackets": {
+        "restype": c_uint32,
+        "argtypes": [POINTER(structs.P2PSendItem_t), c_uint32, POINTER(c_uint8)],
+    },
+    "ReadP2PPackets": {
+        "restype": c_uint32,
+        "argtypes": [
+            c_void_p,
+            c_uint32,
+            POINTER(structs.P2PPacketRecord_t),
+            c_uint32,
+            POINTER(c_uint32),
+            c_uint8,
+        ],
+    },
+    "PendingCallResults": {"restype": c_uint32},
+    "Events_Enable": {"restype": c_bool, "argtypes": [c_uint32, c_uint32]},
+    "Events_Disable": {"restype": None},
+    "Events_Drain": {
+        "restype": c_uint32,
+        "argtypes": [POINTER(structs.SteamEventRecord_t), c_uint32],
     },
+    "Events_Pending": {"restype": c_uint32},
+    "Events_Dropped": {"restype": c_uint64},
     "Convert32BitTo64BitSteamID": {"restype": c_uint64, "argtypes": [c_uint]},
 }
+
+# Called every frame; bound while loading so the first frame does not pay for resolving them
+STEAMWORKS_HOT_METHODS = (
+    "Events_Drain",
+    "Events_Pending",
+    "PendingCallResults",
+    "RunCallbacks",
+    "RunFrame",
+    "SendP2PPacket",
+    "SendP2PPackets",
+    "ReadP2PPacket",
+    "ReadP2PPackets",
+)
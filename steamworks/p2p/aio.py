@@ -0,0 +1,425 @@
+"""
+asyncio integration for Steam P2P networking
+
+The transport owns a pump that is scheduled on the event loop: every tick it runs the Steam callbacks, flushes queued
+sends with one batched native call and drains the configured channels with ReadP2PPackets. No thread or busy loop is
+involved, so many sessions can share one process with other asyncio services.
+"""
+import asyncio
+
+from steamworks.enums import EP2PSend
+from steamworks.exceptions import P2PSendError
+
+_RELIABLE_SEND_TYPES = (EP2PSend.k_EP2PSendReliable.value, EP2PSend.k_EP2PSendReliableNoDelay.value)
+
+# Queued to wake every recv() and accept() waiting on a closed session or endpoint
+_CLOSED = object()
+
+
+class SteamP2PProtocol(asyncio.BaseProtocol):
+    """Base protocol for SteamP2PTransport, mirrors asyncio.DatagramProtocol with the channel added"""
+
+    def datagram_received(self, data: bytes, peer: int, channel: int) -> None:
+        """Called for every packet received on one of the pumped channels
+
+        :param data: bytes
+        :param peer: int
+        :param channel: int
+        :return: None
+        """
+
+    def error_received(self, exc: Exception) -> None:
+        """Called when a queued packet could not be sent
+
+        :param exc: Exception
+        :return: None
+        """
+
+
+class SteamP2PTransport(asyncio.BaseTransport):
+    """Event-loop driven transport over SteamP2PNetworking
+
+    Writes are queued and sent in one batch per tick. Packets Steam refuses are retried on the next tick if they were
+    sent reliably (Steam refuses them when its reliable send buffer is full) and dropped otherwise. The protocol is paused
+    while more than the high water mark is queued. close() keeps the pump retrying queued reliable packets until they
+    are sent or out of retries, and only then calls connection_lost.
+    """
+    DEFAULT_HIGH_WATER = 256 * 1024
+    DEFAULT_LOW_WATER = 64 * 1024
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, steam: object, protocol: SteamP2PProtocol,
+                 channels: tuple = (0,), interval: float = 1 / 60, max_packets: int = 64, run_callbacks: bool = True,
+                 send_retries: int = 30, networking: object = None):
+        super().__init__()
+        self._loop = loop
+        self._steam = steam
+        self._networking = networking or steam.P2PNetworking
+        self._protocol = protocol
+        self._channels = tuple(channels)
+        self._interval = interval
+        self._max_packets = max_packets
+        self._run_callbacks = run_callbacks
+        self._send_retries = send_retries
+
+        self._send_queue = []
+        self._buffer_size = 0
+        self._high_water = self.DEFAULT_HIGH_WATER
+        self._low_water = self.DEFAULT_LOW_WATER
+        self._protocol_paused = False
+        self._closing = False
+        self._lost = False
+        self._handle = None
+        self._next_tick = 0.0
+
+    def _start(self) -> None:
+        self._protocol.connection_made(self)
+        self._next_tick = self._loop.time()
+        self._handle = self._loop.call_soon(self._tick)
+
+    def get_protocol(self) -> SteamP2PProtocol:
+        return self._protocol
+
+    def set_protocol(self, protocol: SteamP2PProtocol) -> None:
+        self._protocol = protocol
+
+    def get_extra_info(self, name: str, default: object = None) -> object:
+        return {'channels': self._channels, 'interval': self._interval}.get(name, default)
+
+    def is_closing(self) -> bool:
+        return self._closing
+
+    def get_write_buffer_size(self) -> int:
+        return self._buffer_size
+
+    def get_write_buffer_limits(self) -> tuple:
+        return self._low_water, self._high_water
+
+    def set_write_buffer_limits(self, high: int = None, low: int = None) -> None:
+        if high is None:
+            high = self.DEFAULT_HIGH_WATER if low is None else 4 * low
+
+        if low is None:
+            low = high // 4
+
+        if not high >= low >= 0:
+            raise ValueError(f'high ({high}) must be >= low ({low}) must be >= 0')
+
+        self._high_water = high
+        self._low_water = low
+        self._maybe_pause_protocol()
+
+    def sendto(self, data: bytes, peer: int, send_type: int = EP2PSend.k_EP2PSendUnreliable.value,
+               channel: int = 0) -> None:
+        """Queue a packet; it is sent with the next pump tick
+
+        :param data: bytes or any other buffer-protocol object, must not be modified until the next tick
+        :param peer: int
+        :param send_type: int
+        :param channel: int
+        :return: None
+        """
+        if self._closing:
+            raise RuntimeError('Transport is closing')
+
+        size = memoryview(data).nbytes
+        self._send_queue.append([peer, data, send_type, channel, size, 0])
+        self._buffer_size += size
+        self._maybe_pause_protocol()
+
+    def close(self) -> None:
+        if self._closing:
+            return
+
+        self._closing = True
+        self._flush()
+        if not self._send_queue:
+            self._connection_lost()
+
+    def _connection_lost(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        if not self._lost:
+            self._lost = True
+            self._loop.call_soon(self._protocol.connection_lost, None)
+
+    def abort(self) -> None:
+        self._send_queue.clear()
+        self._buffer_size = 0
+        self.close()
+
+    def _maybe_pause_protocol(self) -> None:
+        if not self._protocol_paused and self._buffer_size > self._high_water:
+            self._protocol_paused = True
+            self._protocol.pause_writing()
+
+    def _maybe_resume_protocol(self) -> None:
+        if self._protocol_paused and self._buffer_size <= self._low_water:
+            self._protocol_paused = False
+            self._protocol.resume_writing()
+
+    def _flush(self) -> None:
+        queue = self._send_queue
+        if not queue:
+            return
+
+        # Packets queued by error_received below wait for the next flush
+        self._send_queue = []
+        sent = self._networking.SendP2PPacketsBatch([item[:4] for item in queue])
+
+        retained = []
+        for index, item in enumerate(queue):
+            if sent >> index & 1:
+                self._buffer_size -= item[4]
+                continue
+
+            item[5] += 1
+            if item[2] in _RELIABLE_SEND_TYPES and item[5] <= self._send_retries:
+                retained.append(item)
+                continue
+
+            self._buffer_size -= item[4]
+            self._protocol.error_received(P2PSendError(f'Failed to send {item[4]} bytes to {item[0]}'))
+
+        self._send_queue = retained + self._send_queue
+        self._maybe_resume_protocol()
+
+    def _receive(self) -> None:
+        for channel in self._channels:
+            while True:
+                count, records, arena = self._networking.ReadP2PPackets(channel, self._max_packets)
+                for index in range(count):
+                    record = records[index]
+                    offset = record.offset
+                    self._protocol.datagram_received(bytes(arena[offset:offset + record.size]), record.steamIDRemote,
+                                                     channel)
+
+                if count < self._max_packets:
+                    break
+
+    def _tick(self) -> None:
+        self._handle = None
+        if self._lost:
+            return
+
+        try:
+            if self._run_callbacks:
+                self._steam.run_callbacks()
+
+            self._flush()
+            if not self._closing:
+                self._receive()
+
+            stats = getattr(self._networking, 'stats', None)
+            if stats is not None:
+                stats.set_queue_depth('transport send queue', len(self._send_queue))
+
+        except Exception as exc:
+            self._loop.call_exception_handler({
+                'message': 'Exception in Steam P2P pump',
+                'exception': exc,
+                'transport': self,
+                'protocol': self._protocol,
+            })
+
+        if self._closing and not self._send_queue:
+            self._connection_lost()
+            return
+
+        # Schedule against absolute deadlines so slow ticks do not add up to drift
+        now = self._loop.time()
+        self._next_tick += self._interval
+        if self._next_tick < now:
+            self._next_tick = now
+
+        self._handle = self._loop.call_at(self._next_tick, self._tick)
+
+
+class SteamP2PSession(object):
+    """Conversation with a single peer on top of a SteamP2PEndpoint"""
+
+    def __init__(self, endpoint: object, peer: int, channel: int, max_queue: int):
+        self.endpoint = endpoint
+        self.peer = peer
+        self.channel = channel
+        self.dropped = 0
+        self._queue = asyncio.Queue(max_queue)
+        self._closed = False
+
+    def _feed(self, data: bytes) -> None:
+        try:
+            self._queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def _wake(self) -> None:
+        try:
+            self._queue.put_nowait(_CLOSED)
+        except asyncio.QueueFull:
+            pass  # Nobody waits on a full queue; recv() raises once it is drained
+
+    async def recv(self) -> bytes:
+        """Wait for the next packet of this peer
+
+        :return: bytes
+        :raises ConnectionError: once the session is closed or the connection lost and every packet has been read
+        """
+        if self._closed and self._queue.empty():
+            raise ConnectionError(f'P2P session with {self.peer} is closed')
+
+        data = await self._queue.get()
+        if data is _CLOSED:
+            # Left in place for the other waiting readers
+            self._queue.put_nowait(_CLOSED)
+            raise ConnectionError(f'P2P session with {self.peer} is closed')
+
+        return data
+
+    async def send(self, data: bytes, send_type: int = EP2PSend.k_EP2PSendReliable.value, channel: int = None) -> None:
+        """Queue a packet to this peer, waiting first while the transport applies backpressure
+
+        :param data: bytes
+        :param send_type: int
+        :param channel: int, defaults to the session channel
+        :return: None
+        """
+        if self._closed:
+            raise ConnectionError(f'P2P session with {self.peer} is closed')
+
+        await self.endpoint.drain()
+        self.endpoint.transport.sendto(data, self.peer, send_type, self.channel if channel is None else channel)
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._wake()
+            self.endpoint._close_session(self)
+
+
+class SteamP2PEndpoint(SteamP2PProtocol):
+    """Protocol routing incoming packets to one SteamP2PSession per peer
+
+    Packets from unknown peers open a new session that is handed out by accept(), unless accept_unknown is False.
+    """
+
+    def __init__(self, accept_unknown: bool = True, max_queue: int = 256, channel: int = 0):
+        self.transport = None
+        self.accept_unknown = accept_unknown
+        self.max_queue = max_queue
+        self.channel = channel
+        self.sessions = {}
+        self._incoming = asyncio.Queue()
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self._closed = None
+
+    def connection_made(self, transport: SteamP2PTransport) -> None:
+        self.transport = transport
+        self._closed = asyncio.get_running_loop().create_future()
+
+    def connection_lost(self, exc: Exception) -> None:
+        self._writable.set()
+        for session in self.sessions.values():
+            session._closed = True
+            session._wake()
+
+        self.sessions.clear()
+        self._incoming.put_nowait(_CLOSED)
+        if self._closed is not None and not self._closed.done():
+            self._closed.set_result(None)
+
+    def pause_writing(self) -> None:
+        self._writable.clear()
+
+    def resume_writing(self) -> None:
+        self._writable.set()
+
+    def datagram_received(self, data: bytes, peer: int, channel: int) -> None:
+        session = self.sessions.get(peer)
+        if session is None:
+            if not self.accept_unknown:
+                return
+
+            session = self._open_session(peer)
+            self._incoming.put_nowait(session)
+
+        session._feed(data)
+
+    async def drain(self) -> None:
+        """Wait until the transport accepts more writes
+
+        :return: None
+        """
+        await self._writable.wait()
+
+    async def accept(self) -> SteamP2PSession:
+        """Wait for a session opened by an unknown peer
+
+        :return: SteamP2PSession
+        :raises ConnectionError: once the connection is lost
+        """
+        session = await self._incoming.get()
+        if session is _CLOSED:
+            self._incoming.put_nowait(_CLOSED)
+            raise ConnectionError('P2P endpoint is closed')
+
+        return session
+
+    def session(self, peer: int) -> SteamP2PSession:
+        """Get or open the session with a peer
+
+        :param peer: int
+        :return: SteamP2PSession
+        """
+        session = self.sessions.get(peer)
+        if session is None:
+            session = self._open_session(peer)
+
+        return session
+
+    async def wait_closed(self) -> None:
+        await self._closed
+
+    def _open_session(self, peer: int) -> SteamP2PSession:
+        self.transport._networking.CreateP2PSessionWithUser(peer)
+        session = self.sessions[peer] = SteamP2PSession(self, peer, self.channel, self.max_queue)
+        return session
+
+    def _close_session(self, session: SteamP2PSession) -> None:
+        if self.sessions.get(session.peer) is session:
+            del self.sessions[session.peer]
+            self.transport._networking.CloseP2PSessionWithUser(session.peer)
+
+
+async def create_p2p_endpoint(steam: object, protocol_factory: object, channels: tuple = (0,),
+                              interval: float = 1 / 60, **kwargs) -> tuple:
+    """Create a SteamP2PTransport on the running loop, like loop.create_datagram_endpoint
+
+    :param steam: STEAMWORKS
+    :param protocol_factory: callable returning a SteamP2PProtocol
+    :param channels: tuple of channels to drain every tick
+    :param interval: float, seconds between pump ticks
+    :return: tuple (transport, protocol)
+    """
+    loop = asyncio.get_running_loop()
+    protocol = protocol_factory()
+    transport = SteamP2PTransport(loop, steam, protocol, channels, interval, **kwargs)
+    transport._start()
+    return transport, protocol
+
+
+async def open_p2p_endpoint(steam: object, channel: int = 0, interval: float = 1 / 60, accept_unknown: bool = True,
+                            max_queue: int = 256, **kwargs) -> SteamP2PEndpoint:
+    """Create a session based endpoint pumping a single channel
+
+    :param steam: STEAMWORKS
+    :param channel: int
+    :param interval: float, seconds between pump ticks
+    :param accept_unknown: bool
+    :param max_queue: int, packets buffered per session before new ones are dropped
+    :return: SteamP2PEndpoint
+    """
+    _, endpoint = await create_p2p_endpoint(
+        steam, lambda: SteamP2PEndpoint(accept_unknown, max_queue, channel), (channel,), interval, **kwargs)
+    return endpoint
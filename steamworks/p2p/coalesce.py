@@ -0,0 +1,104 @@
+"""
+Tick based coalescing of small P2P messages
+
+Messages queued during a frame are packed per (peer, channel, send type) into length prefixed bundles. A bundle is
+closed once the next message would push it over the MTU, and every bundle is sent with one batched native call when
+the tick ends. Receivers split bundles again with unbundle().
+"""
+import struct
+
+from steamworks.enums import EP2PSend
+from steamworks.p2p.fragment import UNRELIABLE_MTU
+
+# Length prefix of every message inside a bundle
+BUNDLE_LENGTH = struct.Struct('<H')
+
+
+class P2PCoalescer(object):
+    """Buffers small messages per (peer, channel, send type) and flushes them as bundles"""
+
+    def __init__(self, networking: object, mtu: int = UNRELIABLE_MTU):
+        if mtu <= BUNDLE_LENGTH.size:
+            raise ValueError(f'mtu must be larger than the {BUNDLE_LENGTH.size} byte length prefix')
+
+        if mtu > 0xFFFF + BUNDLE_LENGTH.size:
+            # Larger bundles would accept messages whose length does not fit into the prefix
+            raise ValueError(f'mtu must be at most {0xFFFF + BUNDLE_LENGTH.size}, the largest length prefixed message')
+
+        self.networking = networking
+        self.mtu = mtu
+        self.messages_queued = 0
+        self.packets_sent = 0
+        self.send_failures = 0
+        self._bundles = {}
+        self._closed = []
+
+    def __len__(self) -> int:
+        """Number of bundles waiting for flush()"""
+        return len(self._bundles) + len(self._closed)
+
+    def queue(self, peer: int, data: bytes, send_type: int = EP2PSend.k_EP2PSendUnreliable.value,
+              channel: int = 0) -> None:
+        """Add a message to the bundle of its peer, channel and send type
+
+        :param peer: int
+        :param data: bytes or any other buffer-protocol object
+        :param send_type: int
+        :param channel: int
+        :return: None
+        """
+        size = len(data) if isinstance(data, bytes) else memoryview(data).nbytes
+        if BUNDLE_LENGTH.size + size > self.mtu:
+            raise ValueError(f'message of {size} bytes does not fit into a {self.mtu} byte bundle, fragment it instead')
+
+        key = (peer, channel, send_type)
+        bundle = self._bundles.get(key)
+        if bundle is not None and len(bundle) + BUNDLE_LENGTH.size + size > self.mtu:
+            self._closed.append((peer, bundle, send_type, channel))
+            bundle = None
+
+        if bundle is None:
+            bundle = self._bundles[key] = bytearray()
+
+        bundle += BUNDLE_LENGTH.pack(size)
+        bundle += data
+        self.messages_queued += 1
+
+    def flush(self) -> int:
+        """Send every pending bundle with one native call, usually at the end of a tick
+
+        :return: int, number of packets handed to Steam
+        """
+        items = self._closed
+        items.extend((peer, bundle, send_type, channel) for (peer, channel, send_type), bundle in self._bundles.items())
+        self._closed = []
+        self._bundles = {}
+        if not items:
+            return 0
+
+        sent = bin(self.networking.SendP2PPacketsBatch(items)).count('1')
+        self.packets_sent += sent
+        self.send_failures += len(items) - sent
+        return sent
+
+
+def unbundle(packet: bytes):
+    """Iterate over the messages of a bundle produced by P2PCoalescer
+
+    :param packet: bytes or any other buffer-protocol object
+    :return: generator of memoryview, one per message
+    """
+    view = memoryview(packet).cast('B')
+    end = view.nbytes
+    position = 0
+    while position + BUNDLE_LENGTH.size <= end:
+        (size,) = BUNDLE_LENGTH.unpack_from(view, position)
+        position += BUNDLE_LENGTH.size
+        if position + size > end:
+            raise ValueError('truncated P2P bundle')
+
+        yield view[position:position + size]
+        position += size
+
+    if position != end:
+        raise ValueError('truncated P2P bundle')
@@ -0,0 +1,249 @@
+"""
+Precompiled binary codecs for P2P messages
+
+Message types are declared once on a P2PMessageRegistry. Each declaration compiles a cached struct.Struct whose first
+byte is the type tag, so encoding is a single pack_into() into a reusable send buffer and decoding is a single
+unpack_from() straight out of the ReadP2PPackets arena. Only fixed size fields are supported; fixed length byte
+strings use the 'Ns' format.
+
+    registry = P2PMessageRegistry()
+    PlayerState = registry.define('PlayerState', [('entity', 'I'), ('x', 'f'), ('y', 'f'), ('health', 'H')])
+
+    registry.send(steamworks.P2PNetworking, peer, PlayerState, 7, 1.0, 2.0, 100)
+
+    count, records, arena = steamworks.P2PNetworking.ReadP2PPackets()
+    for record in records[:count]:
+        for codec, message in registry.decode_all(arena[record.offset:record.offset + record.size]):
+            ...
+"""
+import struct
+from collections import namedtuple
+
+from steamworks.enums import EP2PSend
+from steamworks.p2p.fragment import UNRELIABLE_MTU
+
+# struct codes that map to exactly one value; 's' additionally accepts a length prefix
+_FIELD_CODES = frozenset('?bBhHiIlLqQnNefd')
+_BYTE_ORDERS = ('<', '>', '!', '=')
+
+# Reads the type tag from any buffer, including the '<c' formatted ReadP2PPackets arena which can not be indexed
+_TAG = struct.Struct('B')
+
+
+def _field_format(name: str, field_format: str) -> str:
+    if not name.isidentifier() or name.startswith('_'):
+        raise ValueError(f'invalid field name {name!r}')
+
+    if field_format.endswith('s') and (field_format[:-1] == '' or field_format[:-1].isdigit()):
+        return field_format
+
+    if field_format not in _FIELD_CODES:
+        raise ValueError(f'field {name!r} has unsupported format {field_format!r}')
+
+    return field_format
+
+
+class P2PMessageCodec(object):
+    """Compiled codec for one message type, created by P2PMessageRegistry.define()"""
+
+    def __init__(self, tag: int, name: str, fields: list, byte_order: str = '<'):
+        """
+        :param tag: int, 0 - 255
+        :param name: str
+        :param fields: list of (name, struct format) tuples
+        :param byte_order: str, struct byte order character
+        """
+        if not 0 <= tag <= 255:
+            raise ValueError('tag must fit into one byte')
+
+        if byte_order not in _BYTE_ORDERS:
+            raise ValueError(f'byte_order must be one of {_BYTE_ORDERS}')
+
+        self.tag = tag
+        self.name = name
+        self.fields = tuple(field for field, _ in fields)
+        self.struct = struct.Struct(byte_order + 'B' + ''.join(_field_format(*field) for field in fields))
+        self.size = self.struct.size
+        self.record = namedtuple(name, self.fields)
+
+        # Bound once, these are the only calls on the hot path
+        self._pack = self.struct.pack
+        self._pack_into = self.struct.pack_into
+        self._unpack_from = self.struct.unpack_from
+        self._make = self.record._make
+
+    def __repr__(self) -> str:
+        return f'<P2PMessageCodec {self.name} tag={self.tag} size={self.size}>'
+
+    def pack(self, *values) -> bytes:
+        """Encode a message into a new bytes object
+
+        :param values: field values in declaration order
+        :return: bytes
+        """
+        return self._pack(self.tag, *values)
+
+    def pack_into(self, buffer: object, offset: int, *values) -> int:
+        """Encode a message into a writable buffer
+
+        :param buffer: writable buffer-protocol object
+        :param offset: int
+        :param values: field values in declaration order
+        :return: int, offset just past the encoded message
+        """
+        self._pack_into(buffer, offset, self.tag, *values)
+        return offset + self.size
+
+    def unpack_from(self, buffer: object, offset: int = 0) -> tuple:
+        """Decode a message of this type
+
+        :param buffer: buffer-protocol object
+        :param offset: int
+        :return: namedtuple record
+        """
+        values = self._unpack_from(buffer, offset)
+        if values[0] != self.tag:
+            raise ValueError(f'expected {self.name} (tag {self.tag}), found tag {values[0]}')
+
+        return self._make(values[1:])
+
+
+class P2PMessageRegistry(object):
+    """Maps one byte type tags to compiled message codecs and owns a reusable send buffer"""
+
+    def __init__(self, byte_order: str = '<', buffer_size: int = UNRELIABLE_MTU):
+        self.byte_order = byte_order
+        self.codecs = {}
+        self._by_tag = [None] * 256
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.codecs
+
+    def __getitem__(self, name: str) -> P2PMessageCodec:
+        return self.codecs[name]
+
+    def define(self, name: str, fields: list, tag: int = None) -> P2PMessageCodec:
+        """Declare a message type and compile its codec
+
+        :param name: str
+        :param fields: list of (name, struct format) tuples
+        :param tag: int, defaults to the lowest free tag
+        :return: P2PMessageCodec
+        """
+        if name in self.codecs:
+            raise ValueError(f'message type {name!r} is already defined')
+
+        if tag is None:
+            try:
+                tag = self._by_tag.index(None)
+            except ValueError:
+                raise ValueError('all 256 message tags are in use') from None
+
+        elif 0 <= tag <= 255 and self._by_tag[tag] is not None:
+            raise ValueError(f'tag {tag} is already used by {self._by_tag[tag].name}')
+
+        codec = P2PMessageCodec(tag, name, fields, self.byte_order)
+        self.codecs[name] = self._by_tag[tag] = codec
+        return codec
+
+    def codec(self, tag: int) -> P2PMessageCodec:
+        """Look up the codec of a type tag
+
+        :param tag: int
+        :return: P2PMessageCodec or None
+        """
+        return self._by_tag[tag]
+
+    def encode(self, codec: P2PMessageCodec, *values) -> memoryview:
+        """Encode a message into the reusable send buffer
+
+        The returned view is only valid until the next encode() or encode_many() call.
+
+        :param codec: P2PMessageCodec
+        :param values: field values in declaration order
+        :return: memoryview
+        """
+        if codec.size > len(self._buffer):
+            self._grow(codec.size)
+
+        codec._pack_into(self._buffer, 0, codec.tag, *values)
+        return self._view[:codec.size]
+
+    def encode_many(self, messages: list) -> memoryview:
+        """Encode several messages back to back into the reusable send buffer
+
+        :param messages: iterable of (P2PMessageCodec, tuple of field values)
+        :return: memoryview, valid until the next encode() or encode_many() call
+        """
+        buffer = self._buffer
+        offset = 0
+        for codec, values in messages:
+            end = offset + codec.size
+            if end > len(buffer):
+                self._grow(end)
+                buffer = self._buffer
+
+            codec._pack_into(buffer, offset, codec.tag, *values)
+            offset = end
+
+        return self._view[:offset]
+
+    def decode(self, buffer: object, offset: int = 0) -> tuple:
+        """Decode the message at offset, dispatching on its type tag
+
+        :param buffer: buffer-protocol object, e.g. a slice of the ReadP2PPackets arena
+        :param offset: int
+        :return: tuple (P2PMessageCodec, namedtuple record)
+        """
+        tag = _TAG.unpack_from(buffer, offset)[0]
+        codec = self._by_tag[tag]
+        if codec is None:
+            raise ValueError(f'unknown message tag {tag}')
+
+        return codec, codec._make(codec._unpack_from(buffer, offset)[1:])
+
+    def decode_all(self, buffer: object) -> object:
+        """Decode every message in a buffer filled by encode_many()
+
+        :param buffer: buffer-protocol object
+        :return: generator of (P2PMessageCodec, namedtuple record)
+        """
+        by_tag = self._by_tag
+        view = memoryview(buffer).cast('B')
+        offset = 0
+        end = len(view)
+        while offset < end:
+            codec = by_tag[view[offset]]
+            if codec is None:
+                raise ValueError(f'unknown message tag {view[offset]} at offset {offset}')
+
+            yield codec, codec._make(codec._unpack_from(view, offset)[1:])
+            offset += codec.size
+
+    def send(self, networking: object, steam_id_remote: int, codec: P2PMessageCodec, *values,
+             send_type: int = EP2PSend.k_EP2PSendUnreliable.value, channel: int = 0) -> bool:
+        """Encode a message into the send buffer and send it without an intermediate bytes object
+
+        :param networking: SteamP2PNetworking
+        :param steam_id_remote: int
+        :param codec: P2PMessageCodec
+        :param values: field values in declaration order
+        :param send_type: int
+        :param channel: int
+        :return: bool
+        """
+        data = self.encode(codec, *values)
+        return bool(networking.SendP2PPacketsBatch([(steam_id_remote, data, send_type, channel)]) & 1)
+
+    def _grow(self, size: int) -> None:
+        capacity = len(self._buffer)
+        while capacity < size:
+            capacity *= 2
+
+        # A fresh buffer, as views returned by earlier encode() calls may still pin the old one
+        buffer = bytearray(capacity)
+        buffer[:len(self._buffer)] = self._buffer
+        self._buffer = buffer
+        self._view = memoryview(self._buffer)
@@ -0,0 +1,156 @@
+"""
+Per-channel demultiplexing of incoming P2P packets
+
+A single pump pass reads every configured channel into its own bounded queue, so a consumer that only cares about
+latency critical state never waits behind bulk transfers on another channel.
+"""
+from collections import deque
+from enum import Enum
+
+
+class P2PDropPolicy(Enum):
+    """What a bounded P2P channel queue does with packets once it is full"""
+
+    DROP_OLDEST = 0  # Evict the oldest queued packet, for unreliable state where only the latest value matters
+    DROP_NEWEST = 1  # Discard the incoming packet
+    BLOCK = 2  # Stop reading the channel and leave packets in Steam's queue until the consumer catches up
+
+
+class P2PChannelQueue(object):
+    """Bounded ring queue of (sender_steam_id, payload) tuples for one channel"""
+
+    def __init__(self, channel: int, capacity: int, policy: P2PDropPolicy):
+        if capacity <= 0:
+            raise ValueError('capacity must be positive')
+
+        self.channel = channel
+        self.capacity = capacity
+        self.policy = policy
+        self.dropped = 0
+        # With DROP_OLDEST the deque itself evicts the head once maxlen is reached
+        self._queue = deque(maxlen=capacity if policy == P2PDropPolicy.DROP_OLDEST else None)
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def free(self) -> int:
+        """Number of packets that can be queued before the drop policy applies
+
+        :return: int
+        """
+        return self.capacity - len(self._queue)
+
+    def put(self, sender: int, data: bytes) -> bool:
+        """Queue a packet, applying the drop policy when the queue is full
+
+        :param sender: int
+        :param data: bytes
+        :return: bool, False if the packet itself was dropped
+        """
+        if len(self._queue) >= self.capacity:
+            self.dropped += 1
+            if self.policy != P2PDropPolicy.DROP_OLDEST:
+                return False
+
+        self._queue.append((sender, data))
+        return True
+
+    def get(self) -> tuple:
+        """Pop the oldest packet
+
+        :return: tuple (sender_steam_id, bytes) or None when empty
+        """
+        if self._queue:
+            return self._queue.popleft()
+
+        return None
+
+    def drain(self, max_packets: int = 0) -> list:
+        """Pop up to max_packets packets, all of them if max_packets is 0
+
+        :param max_packets: int
+        :return: list of (sender_steam_id, bytes)
+        """
+        queue = self._queue
+        if max_packets <= 0 or max_packets >= len(queue):
+            packets = list(queue)
+            queue.clear()
+            return packets
+
+        return [queue.popleft() for _ in range(max_packets)]
+
+
+class P2PChannelDemux(object):
+    """Reads all configured channels in one pump pass into per-channel P2PChannelQueue objects
+
+    Channels using P2PDropPolicy.BLOCK are only read up to the free space of their queue. The remaining packets stay
+    queued inside Steam, which keeps reliable streams intact without stalling any other channel.
+    """
+
+    def __init__(self, networking: object, max_packets: int = 64):
+        self.networking = networking
+        self.max_packets = max_packets
+        self.queues = {}
+
+    def configure(self, channel: int, capacity: int = 256,
+                  policy: P2PDropPolicy = P2PDropPolicy.DROP_OLDEST) -> P2PChannelQueue:
+        """Start pumping a channel into a bounded queue
+
+        :param channel: int
+        :param capacity: int
+        :param policy: P2PDropPolicy
+        :return: P2PChannelQueue
+        """
+        queue = self.queues[channel] = P2PChannelQueue(channel, capacity, policy)
+        return queue
+
+    def remove(self, channel: int) -> None:
+        """Stop pumping a channel and discard its queue
+
+        :param channel: int
+        :return: None
+        """
+        self.queues.pop(channel, None)
+
+    def channel(self, channel: int) -> P2PChannelQueue:
+        return self.queues[channel]
+
+    def pump(self) -> int:
+        """Read pending packets of every configured channel into their queues
+
+        :return: int, number of packets read from Steam
+        """
+        total = 0
+        for channel, queue in self.queues.items():
+            while True:
+                limit = self.max_packets
+                if queue.policy == P2PDropPolicy.BLOCK:
+                    limit = min(limit, queue.free())
+                    if limit <= 0:
+                        break
+
+                count, records, arena = self.networking.ReadP2PPackets(channel, limit)
+                for index in range(count):
+                    record = records[index]
+                    offset = record.offset
+                    queue.put(record.steamIDRemote, bytes(arena[offset:offset + record.size]))
+
+                total += count
+                if count < limit:
+                    break
+
+        stats = getattr(self.networking, 'stats', None)
+        if stats is not None:
+            for channel, queue in self.queues.items():
+                stats.set_queue_depth(f'demux channel {channel}', len(queue))
+
+        return total
+
+    def drain(self, channel: int, max_packets: int = 0) -> list:
+        """Pop queued packets of one channel
+
+        :param channel: int
+        :param max_packets: int, 0 for all
+        :return: list of (sender_steam_id, bytes)
+        """
+        return self.queues[channel].drain(max_packets)
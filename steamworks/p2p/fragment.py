@@ -0,0 +1,209 @@
+"""
+Fragmentation and reassembly of P2P messages larger than the unreliable packet limit
+
+Every fragment starts with a fixed header (message id, fragment index, fragment count, chunk size, total size), so the
+receiver can place fragments straight into one buffer preallocated for the whole message, in any order. Delivery is
+not guaranteed: incomplete messages are discarded after a timeout, and callers that need a large message to arrive
+resend it (or only its missing fragments) with the same message id.
+"""
+import struct
+import time
+
+from steamworks.enums import EP2PSend
+
+# message id, fragment index, fragment count, chunk size, total message size
+FRAGMENT_HEADER = struct.Struct('<HHHHI')
+
+# Largest payload Steam accepts for unreliable sends
+UNRELIABLE_MTU = 1200
+
+
+class _PendingMessage(object):
+    __slots__ = ('buffer', 'received', 'remaining', 'deadline')
+
+    def __init__(self, total: int, count: int, deadline: float):
+        self.buffer = bytearray(total)
+        self.received = bytearray(count)
+        self.remaining = count
+        self.deadline = deadline
+
+
+class P2PFragmenter(object):
+    """Splits messages into MTU sized fragments and sends them with one batched native call"""
+
+    def __init__(self, networking: object, mtu: int = UNRELIABLE_MTU):
+        if mtu <= FRAGMENT_HEADER.size:
+            raise ValueError(f'mtu must be larger than the {FRAGMENT_HEADER.size} byte fragment header')
+
+        self.networking = networking
+        self.mtu = mtu
+        self.chunk_size = min(mtu - FRAGMENT_HEADER.size, 0xFFFF)
+        self._next_message_id = 0
+
+    def next_message_id(self) -> int:
+        message_id = self._next_message_id
+        self._next_message_id = (message_id + 1) & 0xFFFF
+        return message_id
+
+    def fragment(self, data: bytes, message_id: int) -> list:
+        """Split a message into fragments that share one contiguous buffer
+
+        :param data: bytes or any other buffer-protocol object
+        :param message_id: int
+        :return: list of memoryview, one per fragment
+        """
+        payload = memoryview(data).cast('B')
+        total = payload.nbytes
+        chunk = self.chunk_size
+        count = max(1, -(-total // chunk))
+        if count > 0xFFFF:
+            raise ValueError(f'message of {total} bytes needs more than {0xFFFF} fragments')
+
+        buffer = bytearray(count * FRAGMENT_HEADER.size + total)
+        view = memoryview(buffer)
+        fragments = []
+        position = 0
+        for index in range(count):
+            start = index * chunk
+            size = min(chunk, total - start)
+            FRAGMENT_HEADER.pack_into(buffer, position, message_id, index, count, chunk, total)
+            view[position + FRAGMENT_HEADER.size:position + FRAGMENT_HEADER.size + size] = payload[start:start + size]
+            fragments.append(view[position:position + FRAGMENT_HEADER.size + size])
+            position += FRAGMENT_HEADER.size + size
+
+        return fragments
+
+    def send(self, peer: int, data: bytes, send_type: int = EP2PSend.k_EP2PSendUnreliable.value, channel: int = 0,
+             message_id: int = None, indices: list = None) -> int:
+        """Fragment a message and send it to a peer
+
+        :param peer: int
+        :param data: bytes or any other buffer-protocol object
+        :param send_type: int
+        :param channel: int
+        :param message_id: int, pass the id of an earlier send to retransmit that message
+        :param indices: list of fragment indices to send, all fragments if None
+        :return: int, the message id
+        """
+        if message_id is None:
+            message_id = self.next_message_id()
+
+        fragments = self.fragment(data, message_id)
+        if indices is not None:
+            fragments = [fragments[index] for index in indices]
+
+        self.networking.SendP2PPacketsBatch([(peer, fragment, send_type, channel) for fragment in fragments])
+        return message_id
+
+
+class P2PReassembler(object):
+    """Collects fragments per (sender, message id) and returns each message once it is complete
+
+    Incomplete messages expire after timeout seconds; feed() discards them itself, checking at most every
+    expire_interval seconds, and expire() can be called from a tick to discard them while no fragments arrive. Once
+    more than max_pending_bytes are held by incomplete messages, the oldest ones are evicted first.
+    """
+
+    def __init__(self, timeout: float = 5.0, max_pending_bytes: int = 16 * 1024 * 1024,
+                 max_message_size: int = 0xFFFFFFFF, clock: object = time.monotonic, expire_interval: float = 1.0):
+        self.timeout = timeout
+        self.max_pending_bytes = max_pending_bytes
+        self.max_message_size = max_message_size
+        self.clock = clock
+        self.expire_interval = expire_interval
+
+        self.pending_bytes = 0
+        self.expired = 0
+        self.evicted = 0
+        self.rejected = 0
+        self._pending = {}
+        self._next_expire = 0.0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def feed(self, sender: int, packet: bytes) -> bytearray:
+        """Add one received fragment
+
+        :param sender: int
+        :param packet: bytes or any other buffer-protocol object
+        :return: bytearray with the complete message, or None while fragments are missing
+        """
+        view = memoryview(packet).cast('B')
+        if view.nbytes < FRAGMENT_HEADER.size:
+            self.rejected += 1
+            return None
+
+        message_id, index, count, chunk, total = FRAGMENT_HEADER.unpack_from(view)
+        if chunk == 0 or index >= count or count != max(1, -(-total // chunk)) or total > self.max_message_size:
+            self.rejected += 1
+            return None
+
+        size = view.nbytes - FRAGMENT_HEADER.size
+        start = index * chunk
+        if size != min(chunk, total - start):
+            self.rejected += 1
+            return None
+
+        if count == 1:
+            return bytearray(view[FRAGMENT_HEADER.size:])
+
+        if self._pending:
+            now = self.clock()
+            if now >= self._next_expire:
+                self.expire(now)
+
+        key = (sender, message_id)
+        message = self._pending.get(key)
+        if message is None:
+            if total > self.max_pending_bytes:
+                self.rejected += 1
+                return None
+
+            self._make_room(total)
+            message = self._pending[key] = _PendingMessage(total, count, self.clock() + self.timeout)
+            self.pending_bytes += total
+
+        elif len(message.buffer) != total or len(message.received) != count:
+            # A new message reusing a wrapped around id; start over
+            self._discard(key)
+            return self.feed(sender, packet)
+
+        if message.received[index]:
+            return None
+
+        message.buffer[start:start + size] = view[FRAGMENT_HEADER.size:]
+        message.received[index] = 1
+        message.remaining -= 1
+        if message.remaining:
+            return None
+
+        self._discard(key)
+        return message.buffer
+
+    def expire(self, now: float = None) -> int:
+        """Discard incomplete messages whose timeout passed
+
+        :param now: float, defaults to clock()
+        :return: int, number of discarded messages
+        """
+        if now is None:
+            now = self.clock()
+
+        self._next_expire = now + self.expire_interval
+        stale = [key for key, message in self._pending.items() if message.deadline <= now]
+        for key in stale:
+            self._discard(key)
+
+        self.expired += len(stale)
+        return len(stale)
+
+    def _make_room(self, size: int) -> None:
+        # Pending messages are kept in insertion order, so the first ones are the oldest
+        while self._pending and self.pending_bytes + size > self.max_pending_bytes:
+            self._discard(next(iter(self._pending)))
+            self.evicted += 1
+
+    def _discard(self, key: tuple) -> None:
+        message = self._pending.pop(key)
+        self.pending_bytes -= len(message.buffer)
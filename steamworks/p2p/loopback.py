@@ -0,0 +1,296 @@
+"""
+In-process loopback backend for Steam P2P networking
+
+LoopbackNetwork hosts any number of simulated peers in one process and delivers packets between them with configurable
+latency, jitter, loss and reordering. Each peer is a LoopbackSteam, which implements the native P2P symbols that
+SteamP2PNetworking calls and exposes a regular SteamP2PNetworking as its P2PNetworking attribute. Code written against
+STEAMWORKS.P2PNetworking (and the steamworks.p2p helpers) therefore runs unchanged without a Steam client.
+
+Reliable sends are never lost and stay in order per (sender, receiver, channel); loss and reordering only apply to
+unreliable sends. Packets from a peer without a session are held back and announced through the session request
+callback, or accepted right away when no such callback is registered.
+"""
+import heapq
+import random
+import time
+from ctypes import addressof, memmove, string_at
+
+from steamworks.enums import EP2PSend, EP2PSessionError
+from steamworks.events import SteamEventBus
+from steamworks.interfaces.p2p_networking import SteamP2PNetworking
+from steamworks.structs import P2PSessionConnectFail_t, P2PSessionRequest_t
+from steamworks.util import dereference
+
+_RELIABLE_SEND_TYPES = (EP2PSend.k_EP2PSendReliable.value, EP2PSend.k_EP2PSendReliableNoDelay.value)
+
+# Steam refuses unreliable packets above this size and reliable ones above 1 MB
+_MAX_UNRELIABLE_SIZE = 1200
+_MAX_RELIABLE_SIZE = 1024 * 1024
+
+# First individual account SteamID in the public universe; simulated peers are numbered from here
+_FIRST_STEAM_ID = 76561197960265728
+
+
+class LoopbackNetwork(object):
+    """Hub delivering packets between simulated peers"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, loss: float = 0.0, reorder: float = 0.0,
+                 seed: int = None, clock: object = time.monotonic):
+        """
+        :param latency: float, one way delay in seconds
+        :param jitter: float, additional uniformly distributed delay in seconds
+        :param loss: float, probability that an unreliable packet is dropped
+        :param reorder: float, probability that an unreliable packet is delayed by another latency + jitter
+        :param seed: int, seed for the loss / jitter / reorder decisions
+        :param clock: callable returning the current time in seconds
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.reorder = reorder
+        self.clock = clock
+        self.random = random.Random(seed)
+
+        self.peers = {}
+        self.packets_sent = 0
+        self.packets_lost = 0
+        self._sequence = 0
+        self._reliable_arrivals = {}
+
+    def add_peer(self, steam_id: int = None) -> 'LoopbackSteam':
+        """Create a simulated peer
+
+        :param steam_id: int, defaults to the next free individual SteamID
+        :return: LoopbackSteam
+        """
+        if steam_id is None:
+            steam_id = _FIRST_STEAM_ID + len(self.peers) + 1
+            while steam_id in self.peers:
+                steam_id += 1
+
+        if steam_id in self.peers:
+            raise ValueError(f'peer {steam_id} already exists')
+
+        peer = self.peers[steam_id] = LoopbackSteam(self, steam_id)
+        return peer
+
+    def remove_peer(self, steam_id: int) -> None:
+        self.peers.pop(steam_id, None)
+
+    def _transmit(self, sender: int, receiver: int, data: bytes, send_type: int, channel: int) -> bool:
+        target = self.peers.get(receiver)
+        if target is None or receiver == sender:
+            return False
+
+        reliable = send_type in _RELIABLE_SEND_TYPES
+        if len(data) > (_MAX_RELIABLE_SIZE if reliable else _MAX_UNRELIABLE_SIZE):
+            return False
+
+        self.packets_sent += 1
+        rng = self.random
+        delay = self.latency
+        if self.jitter:
+            delay += rng.random() * self.jitter
+
+        if not reliable:
+            if self.loss and rng.random() < self.loss:
+                self.packets_lost += 1
+                return True
+
+            if self.reorder and rng.random() < self.reorder:
+                delay += self.latency + self.jitter
+
+        arrival = self.clock() + delay
+        if reliable:
+            key = (sender, receiver, channel)
+            arrival = max(arrival, self._reliable_arrivals.get(key, arrival))
+            self._reliable_arrivals[key] = arrival
+
+        self._sequence += 1
+        target._enqueue(arrival, self._sequence, sender, channel, data)
+        return True
+
+
+class LoopbackSteam(object):
+    """Simulated peer implementing the native P2P symbols used by SteamP2PNetworking"""
+
+    def __init__(self, network: LoopbackNetwork, steam_id: int):
+        self.network = network
+        self.steam_id = steam_id
+        self.sessions = set()
+
+        self._incoming = {}
+        self._held = {}
+        self._requested = []
+        self._failed = []
+        self._session_request_callback = None
+        self._session_connect_fail_callback = None
+
+        self.bus = SteamEventBus(self)
+        self.P2PNetworking = SteamP2PNetworking(self)
+
+    def loaded(self) -> bool:
+        return True
+
+    def run_callbacks(self) -> bool:
+        """Fire pending session request and connect fail callbacks
+
+        :return: bool
+        """
+        requested, self._requested = self._requested, []
+        for peer in requested:
+            if peer not in self.sessions and peer in self._held and self._session_request_callback is not None:
+                self._session_request_callback(P2PSessionRequest_t(peer))
+
+        failed, self._failed = self._failed, []
+        for peer in failed:
+            self.sessions.discard(peer)
+            if self._session_connect_fail_callback is not None:
+                self._session_connect_fail_callback(P2PSessionConnectFail_t(
+                    peer, EP2PSessionError.k_EP2PSessionErrorDestinationNotLoggedIn.value))
+
+        return True
+
+    def GetSteamID(self) -> int:
+        return self.steam_id
+
+    def _enqueue(self, arrival: float, sequence: int, sender: int, channel: int, data: bytes) -> None:
+        if sender not in self.sessions:
+            if self._session_request_callback is None:
+                self.sessions.add(sender)
+            else:
+                held = self._held.setdefault(sender, [])
+                if not held:
+                    self._requested.append(sender)
+
+                held.append((arrival, sequence, sender, channel, data))
+                return
+
+        heapq.heappush(self._incoming.setdefault(channel, []), (arrival, sequence, sender, data))
+
+    def _send(self, steam_id_remote: int, data: bytes, send_type: int, channel: int) -> bool:
+        if steam_id_remote not in self.network.peers:
+            if steam_id_remote in self.sessions and steam_id_remote not in self._failed:
+                self._failed.append(steam_id_remote)
+
+            return False
+
+        self.sessions.add(steam_id_remote)
+        return self.network._transmit(self.steam_id, steam_id_remote, data, send_type, channel)
+
+    def _next_packet(self, channel: int) -> tuple:
+        queue = self._incoming.get(channel)
+        if queue and queue[0][0] <= self.network.clock():
+            return queue[0]
+
+        return None
+
+    def _accept(self, steam_id_remote: int) -> bool:
+        self.sessions.add(steam_id_remote)
+        for arrival, sequence, sender, channel, data in self._held.pop(steam_id_remote, ()):
+            heapq.heappush(self._incoming.setdefault(channel, []), (arrival, sequence, sender, data))
+
+        return True
+
+    # Native P2P symbols
+
+    def CreateP2PSessionWithUser(self, steam_id_remote: int) -> bool:
+        return self._accept(steam_id_remote)
+
+    def AcceptP2PSessionWithUser(self, steam_id_remote: int) -> bool:
+        return self._accept(steam_id_remote)
+
+    def CloseP2PSessionWithUser(self, steam_id_remote: int) -> bool:
+        self._held.pop(steam_id_remote, None)
+        if steam_id_remote not in self.sessions:
+            return False
+
+        self.sessions.discard(steam_id_remote)
+        return True
+
+    def GetP2PSessionState(self, steam_id_remote: int, state: object) -> bool:
+        if steam_id_remote not in self.sessions:
+            return False
+
+        state = dereference(state)
+        state.bConnectionActive = steam_id_remote in self.network.peers
+        state.bConnecting = 0
+        state.eP2PSessionError = 0
+        state.bUsingRelay = 0
+        state.nBytesQueuedForSend = 0
+        state.nPacketsQueuedForSend = 0
+        return True
+
+    def P2P_SetSessionRequestCallback(self, callback: object) -> None:
+        self._session_request_callback = callback
+
+    def P2P_SetSessionConnectFailCallback(self, callback: object) -> None:
+        self._session_connect_fail_callback = callback
+
+    def SendP2PPacket(self, steam_id_remote: int, data: bytes, data_size: int, send_type: int, channel: int) -> bool:
+        # data is a buffer, or its address when it arrives through a C function pointer
+        if data is None or isinstance(data, int):
+            data = string_at(data, data_size) if data_size else b''
+        else:
+            data = bytes(memoryview(data)[:data_size])
+
+        return self._send(steam_id_remote, data, send_type, channel)
+
+    def SendP2PPackets(self, items: object, count: int, result_bits: object) -> int:
+        sent = 0
+        for index in range(len(result_bits)):
+            result_bits[index] = 0
+
+        for index in range(count):
+            item = items[index]
+            data = string_at(item.pubData, item.cubData) if item.cubData else b''
+            if self._send(item.steamIDRemote, data, item.eP2PSendType, item.eP2PChannel):
+                result_bits[index >> 3] |= 1 << (index & 7)
+                sent += 1
+
+        return sent
+
+    def ReadP2PPacket(self, buffer: object, buffer_size: int, msg_size: object, sender_steam_id: object,
+                      channel: int) -> bool:
+        packet = self._next_packet(channel)
+        if packet is None:
+            return False
+
+        heapq.heappop(self._incoming[channel])
+        _, _, sender, data = packet
+        size = min(len(data), buffer_size)
+        if isinstance(buffer, (bytearray, memoryview)):
+            buffer[:size] = data[:size]
+        else:
+            memmove(buffer, data, size)
+
+        dereference(msg_size).value = size
+        dereference(sender_steam_id).value = sender
+        return True
+
+    def ReadP2PPackets(self, arena: object, arena_size: int, records: object, max_packets: int, next_msg_size: object,
+                       channel: int) -> int:
+        next_msg_size = dereference(next_msg_size)
+        next_msg_size.value = 0
+        queue = self._incoming.get(channel)
+        now = self.network.clock()
+        count = 0
+        offset = 0
+        while count < max_packets and queue and queue[0][0] <= now:
+            _, _, sender, data = queue[0]
+            if len(data) > arena_size - offset:
+                next_msg_size.value = len(data)
+                break
+
+            heapq.heappop(queue)
+            if data:
+                memmove(addressof(arena) + offset, data, len(data))
+
+            record = records[count]
+            record.steamIDRemote = sender
+            record.offset = offset
+            record.size = len(data)
+            offset += len(data)
+            count += 1
+
+        return count
@@ -0,0 +1,346 @@
+"""
+Delta compressed entity state replication over P2P
+
+Every tick P2PReplicator sends each peer one snapshot of the registered entities, encoded against the newest snapshot
+that peer has acknowledged. Entities that did not change are left out, changed ones only carry the fields that differ
+from that baseline (selected by a bitmask), and entities missing from the baseline are sent in full. Every snapshot
+also acknowledges the newest snapshot received from the same peer, so acks ride along with the regular traffic in both
+directions and a lost snapshot is simply superseded by the next one.
+
+Snapshot layout: header (sequence, baseline sequence or 0, acked sequence or 0, entity count), then per entity its
+id, type, flags and, unless removed, the field bitmask followed by the packed values of the selected fields. Snapshots
+larger than the MTU are split with P2PFragmenter.
+
+Both sides have to define the same entity types in the same order.
+"""
+import struct
+import time
+from collections import namedtuple
+
+from steamworks.enums import EP2PSend
+from steamworks.p2p.codec import _field_format
+from steamworks.p2p.fragment import UNRELIABLE_MTU, P2PFragmenter, P2PReassembler
+
+# sequence, baseline sequence, acked sequence, entity count
+SNAPSHOT_HEADER = struct.Struct('<IIIH')
+
+# entity id, entity type, flags
+ENTITY_HEADER = struct.Struct('<IBB')
+
+ENTITY_REMOVED = 1
+
+
+class P2PEntityType(object):
+    """Field layout of one replicated entity type, created by P2PReplicator.define()"""
+
+    # Compiled delta structs kept per type; the oldest one is dropped beyond that
+    MAX_DELTA_STRUCTS = 256
+
+    def __init__(self, tag: int, name: str, fields: list, byte_order: str = '<'):
+        if not fields or len(fields) > 64:
+            raise ValueError('entity types need between 1 and 64 fields')
+
+        self.tag = tag
+        self.name = name
+        self.byte_order = byte_order
+        self.fields = tuple(field for field, _ in fields)
+        self.formats = tuple(_field_format(*field) for field in fields)
+        self.record = namedtuple(name, self.fields)
+        self.full_mask = (1 << len(fields)) - 1
+        self.mask_size = (len(fields) + 7) // 8
+        # Compiled structs of the field combinations sent or received most recently, led by the bitmask
+        self._structs = {}
+
+    def __repr__(self) -> str:
+        return f'<P2PEntityType {self.name} tag={self.tag}>'
+
+    def delta_struct(self, mask: int) -> struct.Struct:
+        """Compiled struct for the bitmask followed by the fields selected by mask
+
+        :param mask: int
+        :return: struct.Struct
+        """
+        compiled = self._structs.get(mask)
+        if compiled is None:
+            if mask & ~self.full_mask:
+                raise ValueError(f'mask {mask:#x} selects fields {self.name} does not have')
+
+            if len(self._structs) >= self.MAX_DELTA_STRUCTS:
+                del self._structs[next(iter(self._structs))]
+
+            formats = ''.join(self.formats[index] for index in range(len(self.formats)) if mask >> index & 1)
+            compiled = self._structs[mask] = struct.Struct(f'{self.byte_order}{self.mask_size}s{formats}')
+
+        return compiled
+
+    def diff(self, baseline: tuple, values: tuple) -> int:
+        """Bitmask of the fields that differ between two value tuples
+
+        :param baseline: tuple or None for a full update
+        :param values: tuple
+        :return: int
+        """
+        if baseline is None:
+            return self.full_mask
+
+        mask = 0
+        for index, (old, new) in enumerate(zip(baseline, values)):
+            if old != new:
+                mask |= 1 << index
+
+        return mask
+
+
+class _PeerState(object):
+    __slots__ = ('sent', 'acked', 'received', 'latest')
+
+    def __init__(self):
+        # sequence -> entities as sent to the peer, kept until they are too old to serve as baseline
+        self.sent = {}
+        self.acked = 0
+        # sequence -> entities as decoded from the peer
+        self.received = {}
+        self.latest = 0
+
+
+class P2PReplicator(object):
+    """Replicates local entity state to peers as deltas against their last acknowledged snapshot"""
+
+    def __init__(self, networking: object, channel: int = 0, send_type: int = EP2PSend.k_EP2PSendUnreliable.value,
+                 history: int = 32, mtu: int = UNRELIABLE_MTU, byte_order: str = '<', clock: object = time.monotonic):
+        """
+        :param networking: SteamP2PNetworking
+        :param channel: int, channel used exclusively for snapshots
+        :param send_type: int
+        :param history: int, number of snapshots kept per peer to serve as baselines
+        :param mtu: int
+        :param byte_order: str, struct byte order character
+        :param clock: callable returning the current time in seconds
+        """
+        self.networking = networking
+        self.channel = channel
+        self.send_type = send_type
+        self.history = history
+        self.byte_order = byte_order
+
+        self.types = []
+        self.entities = {}
+        self.peers = {}
+        self.sequence = 0
+        self.bytes_sent = 0
+        self.snapshots_dropped = 0
+
+        self._fragmenter = P2PFragmenter(networking, mtu)
+        self._reassembler = P2PReassembler(timeout=1.0, clock=clock)
+
+    def define(self, name: str, fields: list) -> P2PEntityType:
+        """Declare a replicated entity type
+
+        :param name: str
+        :param fields: list of (name, struct format) tuples, at most 64
+        :return: P2PEntityType
+        """
+        if len(self.types) > 255:
+            raise ValueError('at most 256 entity types are supported')
+
+        entity_type = P2PEntityType(len(self.types), name, fields, self.byte_order)
+        self.types.append(entity_type)
+        return entity_type
+
+    def set(self, entity_id: int, entity_type: P2PEntityType, *values) -> None:
+        """Create or update a local entity
+
+        :param entity_id: int
+        :param entity_type: P2PEntityType
+        :param values: field values in declaration order
+        :return: None
+        """
+        if len(values) != len(entity_type.fields):
+            raise AttributeError(f'{entity_type.name} expects {len(entity_type.fields)} values, got {len(values)}')
+
+        self.entities[entity_id] = (entity_type, values)
+
+    def remove(self, entity_id: int) -> None:
+        self.entities.pop(entity_id, None)
+
+    def add_peer(self, peer: int) -> None:
+        if peer not in self.peers:
+            self.peers[peer] = _PeerState()
+
+    def remove_peer(self, peer: int) -> None:
+        self.peers.pop(peer, None)
+
+    def remote(self, peer: int) -> dict:
+        """Newest entity state received from a peer
+
+        :param peer: int
+        :return: dict of entity id -> namedtuple record
+        """
+        state = self.peers.get(peer)
+        if state is None or not state.latest:
+            return {}
+
+        return {entity_id: entity_type.record._make(values)
+                for entity_id, (entity_type, values) in state.received[state.latest].items()}
+
+    def tick(self) -> int:
+        """Send the current entity state to every peer
+
+        :return: int, number of bytes sent
+        """
+        self.sequence += 1
+        entities = dict(self.entities)
+        sent = 0
+        for peer, state in self.peers.items():
+            snapshot = self.encode(state, self.sequence, entities)
+            self._fragmenter.send(peer, snapshot, self.send_type, self.channel)
+            sent += len(snapshot)
+
+        self.bytes_sent += sent
+        return sent
+
+    def encode(self, state: _PeerState, sequence: int, entities: dict) -> bytearray:
+        """Encode a snapshot for one peer against its acknowledged baseline and remember it as sent
+
+        :param state: peer state
+        :param sequence: int
+        :param entities: dict of entity id -> (P2PEntityType, values)
+        :return: bytearray
+        """
+        baseline = state.sent.get(state.acked)
+        baseline_sequence = state.acked if baseline is not None else 0
+        if baseline is None:
+            baseline = {}
+
+        packet = bytearray(SNAPSHOT_HEADER.size)
+        count = 0
+        for entity_id, (entity_type, values) in entities.items():
+            previous = baseline.get(entity_id)
+            if previous is not None and previous[0] is not entity_type:
+                previous = None
+
+            mask = entity_type.diff(previous and previous[1], values)
+            if not mask:
+                continue
+
+            packet += ENTITY_HEADER.pack(entity_id, entity_type.tag, 0)
+            packet += entity_type.delta_struct(mask).pack(
+                mask.to_bytes(entity_type.mask_size, 'little'),
+                *(value for index, value in enumerate(values) if mask >> index & 1))
+            count += 1
+
+        for entity_id in baseline.keys() - entities.keys():
+            packet += ENTITY_HEADER.pack(entity_id, 0, ENTITY_REMOVED)
+            count += 1
+
+        if count > 0xFFFF:
+            raise ValueError('a snapshot can carry at most 65535 entities')
+
+        SNAPSHOT_HEADER.pack_into(packet, 0, sequence, baseline_sequence, state.latest, count)
+        state.sent[sequence] = entities
+        stale = sequence - self.history
+        for old in [old for old in state.sent if old <= stale]:
+            del state.sent[old]
+
+        return packet
+
+    def pump(self, max_packets: int = 64) -> int:
+        """Read and apply pending snapshots from the replication channel
+
+        :param max_packets: int, maximum packets per native read
+        :return: int, number of snapshots applied
+        """
+        applied = 0
+        while True:
+            count, records, arena = self.networking.ReadP2PPackets(self.channel, max_packets)
+            for index in range(count):
+                record = records[index]
+                sender, offset = record.steamIDRemote, record.offset
+                snapshot = self._reassembler.feed(sender, arena[offset:offset + record.size])
+                if snapshot is not None and self.receive(sender, snapshot):
+                    applied += 1
+
+            if count < max_packets:
+                break
+
+        self._reassembler.expire()
+        return applied
+
+    def receive(self, peer: int, snapshot: bytes) -> bool:
+        """Apply a reassembled snapshot received from a peer
+
+        Snapshots from unknown peers are ignored; call add_peer() first.
+
+        :param peer: int
+        :param snapshot: bytes or any other buffer-protocol object
+        :return: bool, False if the snapshot was dropped
+        """
+        state = self.peers.get(peer)
+        if state is None:
+            return False
+
+        sequence, baseline_sequence, ack, count = SNAPSHOT_HEADER.unpack_from(snapshot, 0)
+        if ack > state.acked and ack in state.sent:
+            state.acked = ack
+
+        if sequence in state.received:
+            return False
+
+        if baseline_sequence:
+            baseline = state.received.get(baseline_sequence)
+            if baseline is None:
+                # Baseline already evicted; the sender falls back to a full snapshot once acks catch up
+                self.snapshots_dropped += 1
+                return False
+        else:
+            baseline = {}
+
+        try:
+            entities = self._decode(snapshot, count, baseline)
+        except (struct.error, IndexError, ValueError):
+            self.snapshots_dropped += 1
+            return False
+
+        state.received[sequence] = entities
+        if sequence > state.latest:
+            state.latest = sequence
+
+        stale = state.latest - self.history
+        for old in [old for old in state.received if old <= stale]:
+            del state.received[old]
+
+        return True
+
+    def _decode(self, snapshot: bytes, count: int, baseline: dict) -> dict:
+        entities = dict(baseline)
+        offset = SNAPSHOT_HEADER.size
+        for _ in range(count):
+            entity_id, tag, flags = ENTITY_HEADER.unpack_from(snapshot, offset)
+            offset += ENTITY_HEADER.size
+            if flags & ENTITY_REMOVED:
+                entities.pop(entity_id, None)
+                continue
+
+            entity_type = self.types[tag]
+            mask = int.from_bytes(bytes(snapshot[offset:offset + entity_type.mask_size]), 'little')
+            compiled = entity_type.delta_struct(mask)
+            changed = compiled.unpack_from(snapshot, offset)
+            offset += compiled.size
+
+            previous = entities.get(entity_id)
+            if previous is not None and previous[0] is entity_type:
+                values = list(previous[1])
+            elif mask == entity_type.full_mask:
+                values = [None] * len(entity_type.fields)
+            else:
+                raise ValueError(f'partial update for unknown entity {entity_id}')
+
+            position = 1
+            for index in range(len(values)):
+                if mask >> index & 1:
+                    values[index] = changed[position]
+                    position += 1
+
+            entities[entity_id] = (entity_type, tuple(values))
+
+        return entities
@@ -0,0 +1,179 @@
+"""
+P2P session management
+
+P2PSessionManager answers session requests according to a policy, keeps track of every open session and closes the
+ones that have been idle for longer than a TTL, so long running hosts do not accumulate sessions inside the Steam client.
+"""
+import time
+
+from steamworks.enums import EP2PSessionError
+
+
+def accept_all(peer: int) -> bool:
+    """Session policy accepting every request"""
+    return True
+
+
+def lobby_members_only(matchmaking: object) -> object:
+    """Session policy accepting requests from members of the current lobby only
+
+    :param matchmaking: SteamMatchmaking
+    :return: callable
+    """
+    def policy(peer: int) -> bool:
+        return peer in matchmaking.GetLobbyMembers()
+
+    return policy
+
+
+class P2PSession(object):
+    __slots__ = ('peer', 'opened', 'last_activity', 'accepted')
+
+    def __init__(self, peer: int, now: float, accepted: bool):
+        self.peer = peer
+        self.opened = now
+        self.last_activity = now
+        self.accepted = accepted
+
+
+class P2PSessionManager(object):
+    """Tracks P2P sessions, answers session requests and evicts idle sessions
+
+    Packets sent or read through the networking interface count as activity on their session, see
+    SteamP2PNetworking.SetActivityCallback; call touch() for any other activity and tick() once per frame.
+    """
+
+    def __init__(self, networking: object, policy: object = accept_all, idle_timeout: float = 60.0,
+                 check_interval: float = 5.0, on_session_failed: object = None, clock: object = time.monotonic):
+        self.networking = networking
+        self.policy = policy
+        self.idle_timeout = idle_timeout
+        self.check_interval = check_interval
+        self.on_session_failed = on_session_failed
+        self.clock = clock
+
+        self.sessions = {}
+        self.rejected = 0
+        self.evicted = 0
+        self._next_check = clock() + check_interval
+
+        networking.SetSessionRequestCallback(self._on_session_request)
+        networking.SetSessionConnectFailCallback(self._on_session_connect_fail)
+        networking.SetActivityCallback(self.touch)
+
+    def __contains__(self, peer: int) -> bool:
+        return peer in self.sessions
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def open(self, peer: int) -> bool:
+        """Open (or keep alive) a session with a peer
+
+        :param peer: int
+        :return: bool
+        """
+        session = self.sessions.get(peer)
+        if session is not None:
+            session.last_activity = self.clock()
+            return True
+
+        if not self.networking.CreateP2PSessionWithUser(peer):
+            return False
+
+        self.sessions[peer] = P2PSession(peer, self.clock(), False)
+        return True
+
+    def close(self, peer: int) -> bool:
+        """Close the session with a peer
+
+        :param peer: int
+        :return: bool
+        """
+        self.sessions.pop(peer, None)
+        return self.networking.CloseP2PSessionWithUser(peer)
+
+    def close_all(self) -> None:
+        for peer in list(self.sessions):
+            self.close(peer)
+
+    def touch(self, peer: int, now: float = None) -> None:
+        """Record activity on the session with a peer
+
+        :param peer: int
+        :param now: float, defaults to clock()
+        :return: None
+        """
+        session = self.sessions.get(peer)
+        if session is not None:
+            session.last_activity = self.clock() if now is None else now
+
+    def state(self, peer: int) -> object:
+        """Get the Steam side state of a session
+
+        :param peer: int
+        :return: P2PSessionState_t or None
+        """
+        return self.networking.GetP2PSessionState(peer)
+
+    def tick(self, now: float = None) -> list:
+        """Evict idle sessions at most once per check_interval
+
+        :param now: float, defaults to clock()
+        :return: list of evicted peers
+        """
+        if now is None:
+            now = self.clock()
+
+        if now < self._next_check:
+            return []
+
+        self._next_check = now + self.check_interval
+        return self.evict_idle(now)
+
+    def evict_idle(self, now: float = None) -> list:
+        """Close every session without activity for idle_timeout seconds and no data queued for sending
+
+        :param now: float, defaults to clock()
+        :return: list of evicted peers
+        """
+        if now is None:
+            now = self.clock()
+
+        evicted = []
+        deadline = now - self.idle_timeout
+        for peer, session in list(self.sessions.items()):
+            if session.last_activity > deadline:
+                continue
+
+            state = self.networking.GetP2PSessionState(peer)
+            if state is not None and state.nBytesQueuedForSend > 0:
+                # Still flushing reliable data; treat that as activity
+                session.last_activity = now
+                continue
+
+            self.close(peer)
+            evicted.append(peer)
+
+        self.evicted += len(evicted)
+        return evicted
+
+    def _on_session_request(self, request: object) -> None:
+        peer = request.steamIDRemote
+        if not self.policy(peer):
+            self.rejected += 1
+            return
+
+        if self.networking.AcceptP2PSessionWithUser(peer):
+            now = self.clock()
+            session = self.sessions.get(peer)
+            if session is None:
+                self.sessions[peer] = P2PSession(peer, now, True)
+            else:
+                session.last_activity = now
+
+    def _on_session_connect_fail(self, failure: object) -> None:
+        peer = failure.steamIDRemote
+        self.sessions.pop(peer, None)
+        if self.on_session_failed is not None:
+            self.on_session_failed(peer, EP2PSessionError(failure.eP2PSessionError))
@@ -0,0 +1,153 @@
+"""
+P2P traffic instrumentation
+
+P2PStats is filled by SteamP2PNetworking once EnableStats() is called. While stats are disabled the instrumented code
+paths are not installed at all, so they cost nothing.
+"""
+import time
+
+
+class Histogram(object):
+    """Power of two bucketed histogram; bucket i counts values in [2 ** (i - 1), 2 ** i)"""
+    __slots__ = ('buckets', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.buckets = [0] * 33
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value: int) -> None:
+        self.buckets[min(value.bit_length(), 32)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self) -> dict:
+        return {
+            'count': self.count,
+            'total': self.total,
+            'max': self.max,
+            'mean': self.total / self.count if self.count else 0.0,
+            # Keyed by the exclusive upper bound of each non-empty bucket
+            'buckets': {1 << index: hits for index, hits in enumerate(self.buckets) if hits},
+        }
+
+
+class P2PTrafficCounters(object):
+    __slots__ = ('packets_sent', 'bytes_sent', 'packets_received', 'bytes_received', 'send_failures')
+
+    def __init__(self):
+        self.packets_sent = 0
+        self.bytes_sent = 0
+        self.packets_received = 0
+        self.bytes_received = 0
+        self.send_failures = 0
+
+    def snapshot(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class P2PStats(object):
+    """Per peer and channel traffic counters, queue depths and size / duration histograms"""
+
+    def __init__(self, report_callback: object = None, report_interval: float = 1.0, clock: object = time.monotonic):
+        self.report_callback = report_callback
+        self.report_interval = report_interval
+        self.clock = clock
+
+        self.traffic = {}
+        self.queue_depths = {}
+        self.sent_sizes = Histogram()
+        self.received_sizes = Histogram()
+        self.read_durations_us = Histogram()
+
+        self.started = clock()
+        # (time, bytes sent, bytes received) the rates are computed against; snapshot() and the periodic reports keep
+        # their own, so reading a snapshot neither resets nor delays the reports
+        self._snapshot_baseline = (self.started, 0, 0)
+        self._report_baseline = (self.started, 0, 0)
+
+    def counters(self, peer: int, channel: int) -> P2PTrafficCounters:
+        key = (peer, channel)
+        counters = self.traffic.get(key)
+        if counters is None:
+            counters = self.traffic[key] = P2PTrafficCounters()
+
+        return counters
+
+    def record_send(self, peer: int, channel: int, size: int, success: bool) -> None:
+        counters = self.counters(peer, channel)
+        if success:
+            counters.packets_sent += 1
+            counters.bytes_sent += size
+            self.sent_sizes.add(size)
+        else:
+            counters.send_failures += 1
+
+    def record_receive(self, peer: int, channel: int, size: int) -> None:
+        counters = self.counters(peer, channel)
+        counters.packets_received += 1
+        counters.bytes_received += size
+        self.received_sizes.add(size)
+
+    def record_read_duration(self, seconds: float) -> None:
+        self.read_durations_us.add(int(seconds * 1000000))
+
+    def set_queue_depth(self, name: str, depth: int) -> None:
+        self.queue_depths[name] = depth
+
+    def totals(self) -> dict:
+        totals = P2PTrafficCounters()
+        for counters in self.traffic.values():
+            for name in P2PTrafficCounters.__slots__:
+                setattr(totals, name, getattr(totals, name) + getattr(counters, name))
+
+        return totals.snapshot()
+
+    def snapshot(self) -> dict:
+        """Return every counter as plain dicts, including the rates since the previous snapshot
+
+        :return: dict
+        """
+        snapshot, self._snapshot_baseline = self._snapshot(self._snapshot_baseline, self.clock())
+        return snapshot
+
+    def maybe_report(self) -> None:
+        """Invoke the report callback with a snapshot if report_interval passed since the last report
+
+        Called by the instrumented send and read methods. The rates of a report cover the time since the previous one.
+
+        :return: None
+        """
+        if self.report_callback is None:
+            return
+
+        now = self.clock()
+        if now - self._report_baseline[0] >= self.report_interval:
+            snapshot, self._report_baseline = self._snapshot(self._report_baseline, now)
+            self.report_callback(snapshot)
+
+    def _snapshot(self, baseline: tuple, now: float) -> tuple:
+        totals = self.totals()
+        last_time, last_sent, last_received = baseline
+        elapsed = now - last_time
+
+        peers = {}
+        for (peer, channel), counters in self.traffic.items():
+            peers.setdefault(peer, {})[channel] = counters.snapshot()
+
+        return {
+            'uptime': now - self.started,
+            'totals': totals,
+            'rates': {
+                'bytes_sent_per_second': (totals['bytes_sent'] - last_sent) / elapsed if elapsed > 0 else 0.0,
+                'bytes_received_per_second': (totals['bytes_received'] - last_received) / elapsed if elapsed > 0 else 0.0,
+            },
+            'peers': peers,
+            'queue_depths': dict(self.queue_depths),
+            'sent_sizes': self.sent_sizes.snapshot(),
+            'received_sizes': self.received_sizes.snapshot(),
+            'read_durations_us': self.read_durations_us.snapshot(),
+        }, (now, totals['bytes_sent'], totals['bytes_received'])
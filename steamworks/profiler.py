@@ -0,0 +1,185 @@
+"""
+Opt-in profiling of native Steamworks calls
+
+STEAMWORKS.enable_profiler() replaces every bound native function with a wrapper that times the call and records
+which Python function made it, and makes functions bound later on come wrapped as well. disable_profiler() puts the
+plain ctypes functions back, so nothing of the profiler is left on the call path while it is off.
+
+Per native function the profiler keeps the call count, total and maximum wall time and a latency histogram with
+power of two microsecond buckets. Per calling stack it keeps the count and total time, which collapsed() renders in
+the folded format read by flamegraph.pl, speedscope and similar tools:
+
+    steam.enable_profiler(depth=2)
+    ...
+    with open('steam.folded', 'w') as f:
+        f.write(steam.profiler.collapsed())
+"""
+import sys
+import threading
+import time
+
+# Bucket i counts calls that took less than 2 ** i microseconds and at least half that, the last one everything slower
+HISTOGRAM_BUCKETS = 21
+
+
+def _bucket_label(index: int) -> str:
+    if index == 0:
+        return '<1us'
+
+    if index == HISTOGRAM_BUCKETS - 1:
+        return f'>={1 << (index - 1)}us'
+
+    return f'<{1 << index}us'
+
+
+class _NativeStats(object):
+    __slots__ = ('calls', 'total', 'max', 'histogram')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0
+        self.max = 0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+
+
+class NativeProfiler(object):
+    """Times native calls made through a STEAMWORKS instance"""
+
+    def __init__(self, depth: int = 1, clock: object = time.perf_counter_ns):
+        """
+        :param depth: int, number of Python frames above the native call recorded as its caller stack, 0 for none
+        :param clock: callable returning the current time in nanoseconds
+        """
+        if depth < 0:
+            raise AttributeError('Caller stack depth can not be negative')
+
+        self.depth = depth
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._functions = {}
+        self._stacks = {}
+        self._labels = {}
+
+    def wrap(self, name: str, function: object) -> object:
+        """Wrap a bound native function so every call through it is recorded
+
+        :param name: str, STEAMWORKS_METHODS name
+        :param function: ctypes function
+        :return: callable, with the ctypes function as __wrapped__
+        """
+        clock = self.clock
+        depth = self.depth
+        record = self._record
+
+        def profiled(*args):
+            started = clock()
+            try:
+                return function(*args)
+            finally:
+                elapsed = clock() - started
+                stack = ()
+                if depth:
+                    frame = sys._getframe(1)
+                    codes = []
+                    while frame is not None and len(codes) < depth:
+                        codes.append(frame.f_code)
+                        frame = frame.f_back
+
+                    stack = tuple(codes)
+
+                record(name, stack, elapsed)
+
+        profiled.__name__ = name
+        profiled.__wrapped__ = function
+        profiled.profiler = self
+        return profiled
+
+    def _record(self, name: str, stack: tuple, elapsed: int) -> None:
+        bucket = min((elapsed // 1000).bit_length(), HISTOGRAM_BUCKETS - 1)
+        with self._lock:
+            stats = self._functions.get(name)
+            if stats is None:
+                stats = self._functions[name] = _NativeStats()
+
+            stats.calls += 1
+            stats.total += elapsed
+            if elapsed > stats.max:
+                stats.max = elapsed
+
+            stats.histogram[bucket] += 1
+
+            key = (name, stack)
+            totals = self._stacks.get(key)
+            if totals is None:
+                self._stacks[key] = [1, elapsed]
+            else:
+                totals[0] += 1
+                totals[1] += elapsed
+
+    def reset(self) -> None:
+        """Drop everything recorded so far
+
+        :return: None
+        """
+        with self._lock:
+            self._functions.clear()
+            self._stacks.clear()
+
+    def report(self) -> dict:
+        """Recorded statistics per native function, slowest in total first
+
+        :return: dict of name -> dict with calls, total_us, mean_us, max_us, histogram (bucket label -> calls, empty
+                 buckets left out) and callers (caller label -> calls)
+        """
+        with self._lock:
+            functions = {name: (stats.calls, stats.total, stats.max, list(stats.histogram))
+                         for name, stats in self._functions.items()}
+            stacks = [(name, stack, totals[0]) for (name, stack), totals in self._stacks.items()]
+
+        callers = {}
+        for name, stack, calls in stacks:
+            caller = self._label(stack[0]) if stack else '<unknown>'
+            per_function = callers.setdefault(name, {})
+            per_function[caller] = per_function.get(caller, 0) + calls
+
+        report = {}
+        for name, (calls, total, longest, histogram) in sorted(functions.items(), key=lambda item: -item[1][1]):
+            report[name] = {
+                'calls': calls,
+                'total_us': total / 1000,
+                'mean_us': total / calls / 1000,
+                'max_us': longest / 1000,
+                'histogram': {_bucket_label(index): count for index, count in enumerate(histogram) if count},
+                'callers': callers.get(name, {}),
+            }
+
+        return report
+
+    def collapsed(self, weight: str = 'time') -> str:
+        """Recorded calls as collapsed stacks, outermost frame first and the native function last
+
+        :param weight: str, 'time' to weigh each stack by its total microseconds, 'calls' by its call count
+        :return: str, one 'frame;frame;native weight' line per distinct stack
+        """
+        if weight not in ('time', 'calls'):
+            raise AttributeError('Weight has to be "time" or "calls"')
+
+        with self._lock:
+            stacks = [(name, stack, list(totals)) for (name, stack), totals in self._stacks.items()]
+
+        lines = {}
+        for name, stack, (calls, total) in stacks:
+            line = ';'.join([self._label(code) for code in reversed(stack)] + [name])
+            lines[line] = lines.get(line, 0) + (calls if weight == 'calls' else total // 1000)
+
+        return ''.join(f'{line} {value}\n' for line, value in sorted(lines.items()))
+
+    def _label(self, code: object) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            # co_qualname (3.11+) includes the class, e.g. SteamWorkshop.GetItemInstallInfo
+            name = getattr(code, 'co_qualname', code.co_name)
+            module = code.co_filename.replace('\\', '/').rsplit('/', 1)[-1]
+            label = self._labels[code] = f'{module}:{name}'
+
+        return label
@@ -0,0 +1,147 @@
+"""
+Background thread running Steam callbacks
+
+CallbackPump calls RunCallbacks on its own thread and drains the native event queue right after, so Python callbacks
+never run on the pump thread. Drained events are handed over through a queue.SimpleQueue and dispatched on whichever
+thread calls deliver(), usually through STEAMWORKS.run_callbacks().
+
+With dispatch=True, as in the thread-safe mode of STEAMWORKS, it is the other way round: the pump thread dispatches
+the drained events itself, so callbacks are confined to it, and deliver() only re-raises an error that stopped it.
+
+With adaptive pumping the thread runs at busy_hz while call results are outstanding or events keep arriving, and
+decays back to hz once things are quiet again.
+"""
+import queue
+import threading
+import time
+
+
+class CallbackPump(object):
+    """Runs RunCallbacks on a background thread and hands drained events to the consumer thread"""
+
+    def __init__(self, steam: object, hz: float = 60.0, adaptive: bool = True, busy_hz: float = 500.0,
+                 clock: object = time.monotonic, dispatch: bool = False):
+        """
+        :param steam: STEAMWORKS with its event queue enabled
+        :param hz: float, pump frequency while idle
+        :param adaptive: bool, speed up to busy_hz while call results are outstanding or events arrive
+        :param busy_hz: float, pump frequency while busy
+        :param clock: callable returning the current time in seconds
+        :param dispatch: bool, dispatch events on the pump thread instead of handing them over
+        """
+        if hz <= 0 or busy_hz <= 0:
+            raise AttributeError('Pump frequencies must be positive')
+
+        if steam.events is None:
+            raise AttributeError('The callback pump needs the event queue, call enable_event_queue() first')
+
+        self.steam = steam
+        self.events = steam.events
+        self.idle_interval = 1.0 / hz
+        self.busy_interval = min(1.0 / busy_hz, self.idle_interval) if adaptive else self.idle_interval
+        self.adaptive = adaptive
+        self.clock = clock
+        self.dispatch = dispatch
+
+        self.interval = self.idle_interval
+        self.ticks = 0
+        self.error = None
+
+        self._handoff = queue.SimpleQueue()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the pump thread
+
+        :return: None
+        """
+        if self.running:
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name='steamworks-callback-pump', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None) -> bool:
+        """Stop the pump thread and wait for it to finish its current tick
+
+        :param timeout: float, seconds to wait, None to wait as long as it takes
+        :return: bool, True once the thread has exited
+        """
+        thread = self._thread
+        if thread is None:
+            return True
+
+        self._stopping.set()
+        if thread is not threading.current_thread():
+            thread.join(timeout)
+
+        if thread.is_alive():
+            return False
+
+        self._thread = None
+        return True
+
+    def deliver(self, timeout: float = None) -> int:
+        """Dispatch every handed over event on the calling thread
+
+        :param timeout: float, wait up to this many seconds for the first event, None to return right away
+        :return: int, number of dispatched events
+        """
+        handoff = self._handoff
+        try:
+            batch = handoff.get(timeout is not None, timeout)
+        except queue.Empty:
+            # Listeners still see the tick, e.g. to expire call result timeouts
+            return self.events.deliver([]) if not self.dispatch else 0
+
+        delivered = 0
+        while True:
+            if isinstance(batch, BaseException):
+                raise batch
+
+            delivered += self.events.deliver(batch)
+            try:
+                batch = handoff.get_nowait()
+            except queue.Empty:
+                return delivered
+
+    def _run(self) -> None:
+        steam = self.steam
+        stopping = self._stopping
+        deadline = self.clock()
+        while not stopping.is_set():
+            try:
+                steam.RunCallbacks()
+                events = self.events.drain()
+                busy = bool(events) or (self.adaptive and steam.PendingCallResults() > 0)
+                if self.dispatch:
+                    # Handler exceptions are reported by the bus; anything else stops the pump like a native error
+                    self.events.deliver(events)
+            except Exception as error:
+                # Re-raised on the consumer thread by the next deliver()
+                self.error = error
+                self._handoff.put(error)
+                return
+
+            if events and not self.dispatch:
+                self._handoff.put(events)
+
+            self.ticks += 1
+            if busy:
+                self.interval = self.busy_interval
+            elif self.interval < self.idle_interval:
+                # Back off gradually so a burst of follow-up callbacks is still picked up quickly
+                self.interval = min(self.interval * 2, self.idle_interval)
+
+            deadline += self.interval
+            now = self.clock()
+            if deadline < now:
+                deadline = now
+
+            stopping.wait(deadline - now)
@@ -1,4 +1,4 @@
-from ctypes import *
+from ctypes import Structure, c_bool, c_int, c_int32, c_uint8, c_uint16, c_uint32, c_uint64, c_void_p
 
 
 class FindLeaderboardResult_t(Structure):
@@ -35,6 +35,45 @@ class MicroTxnAuthorizationResponse_t(Structure):
     _fields_ = [("appId", c_uint32), ("orderId", c_uint64), ("authorized", c_bool)]
 
 
+class P2PPacketRecord_t(Structure):
+    """Describes one packet drained by ReadP2PPackets; offset is relative to the start of the arena"""
+
+    _fields_ = [("steamIDRemote", c_uint64), ("offset", c_uint32), ("size", c_uint32)]
+
+
+class P2PSendItem_t(Structure):
+    """Describes one packet sent by SendP2PPackets; pubData points straight into the caller's buffer"""
+
+    _fields_ = [
+        ("steamIDRemote", c_uint64),
+        ("pubData", c_void_p),
+        ("cubData", c_uint32),
+        ("eP2PSendType", c_int32),
+        ("eP2PChannel", c_int32),
+    ]
+
+
+class P2PSessionRequest_t(Structure):
+    _fields_ = [("steamIDRemote", c_uint64)]
+
+
+class P2PSessionConnectFail_t(Structure):
+    _fields_ = [("steamIDRemote", c_uint64), ("eP2PSessionError", c_uint8)]
+
+
+class P2PSessionState_t(Structure):
+    _fields_ = [
+        ("bConnectionActive", c_uint8),
+        ("bConnecting", c_uint8),
+        ("eP2PSessionError", c_uint8),
+        ("bUsingRelay", c_uint8),
+        ("nBytesQueuedForSend", c_int32),
+        ("nPacketsQueuedForSend", c_int32),
+        ("nRemoteIP", c_uint32),
+        ("nRemotePort", c_uint16),
+    ]
+
+
 class LobbyCreated_t(Structure):
     _fields_ = [
         ("m_eResult", c_int),  # EResult enum (int) - Result of the lobby creation
@@ -72,3 +111,10 @@ class GameLobbyJoinRequested_t(Structure):
             c_uint64,
         ),  # CSteamID (uint64) - SteamID of the friend who invited/requested join
     ]
+
+
+class SteamEventRecord_t(Structure):
+    """One record of the native event queue; data holds a copy of the callback struct selected by type and call the
+    SteamAPICall_t it answers, 0 for broadcast callbacks"""
+
+    _fields_ = [("type", c_uint32), ("size", c_uint32), ("call", c_uint64), ("data", c_uint8 * 64)]
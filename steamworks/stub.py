@@ -0,0 +1,763 @@
+"""
+Offline stand-in for the SteamworksPy library
+
+StubSteamworks implements every symbol in STEAMWORKS_METHODS in Python, so the whole interface layer runs without a
+Steam client, SteamworksPy.so or libsteam_api.so, e.g. in CI, tests and benchmarks:
+
+    steam = STEAMWORKS(backend=StubSteamworks())    # or STEAMWORKS(backend='stub')
+    steam.initialize()
+
+Behaviour is deterministic. The stub keeps a small amount of state (stats, achievements, workshop items, lobbies,
+controllers, ...) in plain attributes that tests can set up directly, and symbols without their own behaviour return
+the zero value of their restype. Any symbol can be replaced with script().
+
+Requests returning a SteamAPICall_t are answered on a later RunCallbacks, either through the registered native
+callback or, while the event queue is enabled, as records for Events_Drain, exactly like the native library does.
+fire() schedules any other callback the same way. P2P symbols are served by a LoopbackSteam peer, pass a shared
+LoopbackNetwork to connect several stubs.
+"""
+import threading
+from collections import deque
+from ctypes import ArgumentError, Structure, addressof, c_bool, c_char_p, c_float, c_int, c_uint64, c_void_p, cast, \
+    memmove, sizeof
+
+from steamworks.enums import EItemState, EItemUpdateStatus, SteamEventType
+from steamworks.events import EVENT_QUEUE_MAX_CAPACITY, NATIVE_CALLBACKS
+from steamworks.methods import STEAMWORKS_METHODS, InputAnalogActionData_t, InputDigitalActionData_t
+from steamworks.p2p.loopback import LoopbackNetwork
+from steamworks.structs import CreateItemResult_t, FindLeaderboardResult_t, LobbyCreated_t, LobbyEnter_t, \
+    SubmitItemUpdateResult_t, SubscriptionResult
+from steamworks.util import dereference
+
+# Native setter symbol -> event type it registers the callback of
+_CALLBACK_SETTERS = {symbol: event_type for event_type, symbol in NATIVE_CALLBACKS.items()}
+
+_RESULT_OK = 1
+_RESULT_FAIL = 2
+
+_CHAT_ROOM_ENTER_SUCCESS = 1
+_CHAT_ROOM_ENTER_DOESNT_EXIST = 2
+
+# Universe public, account type chat, lobby instance flag
+_FIRST_LOBBY_ID = (1 << 56) | (8 << 52) | (0x20000 << 32)
+_FIRST_PUBLISHED_FILE_ID = 1000000
+
+_MAX_CONTROLLERS = 16
+
+
+def _value(argument: object) -> object:
+    """Plain Python value of an argument that may still be wrapped in a ctypes object"""
+    if isinstance(argument, (bytes, str, int, float)) or argument is None:
+        return argument
+
+    return getattr(argument, 'value', argument)
+
+
+def _text(argument: object) -> str:
+    """Decode a char * argument; like the native library, the stub does not accept str"""
+    argument = _value(argument)
+    if argument is None:
+        return ''
+
+    if not isinstance(argument, bytes):
+        raise TypeError(f'expected bytes for a char * argument, got {type(argument).__name__}')
+
+    return argument.decode()
+
+
+def _default_result(restype: object) -> object:
+    """Zero value a ctypes function with this restype returns to Python"""
+    if restype is None:
+        return None
+
+    if restype is bool or restype is c_bool:
+        return False
+
+    if restype is c_char_p:
+        return b''
+
+    if restype is c_float:
+        return 0.0
+
+    if isinstance(restype, type) and issubclass(restype, Structure):
+        return restype()
+
+    return 0
+
+
+class StubItem(object):
+    """Workshop item known to the stub"""
+    __slots__ = ('state', 'size', 'folder', 'timestamp', 'downloaded', 'total')
+
+    def __init__(self, state: EItemState = EItemState.NONE, size: int = 0, folder: str = '', timestamp: int = 0,
+                 downloaded: int = 0, total: int = 0):
+        self.state = state
+        self.size = size
+        self.folder = folder
+        self.timestamp = timestamp
+        self.downloaded = downloaded
+        self.total = total
+
+
+def _convert_result(restype: object, result: object) -> object:
+    """Convert what an implementation returned the way ctypes converts a native result of this restype"""
+    if restype is None or result is None or isinstance(result, restype if isinstance(restype, type) else ()):
+        return result if restype is not None else None
+
+    if restype in (c_char_p, c_void_p) or isinstance(restype, type) and issubclass(restype, Structure):
+        return result
+
+    if hasattr(restype, 'contents'):
+        return cast(result, restype)
+
+    if not hasattr(restype, '_type_'):
+        # A Python callable as restype receives the C int result
+        return restype(c_int(result).value)
+
+    return restype(result).value
+
+
+class _StubSymbol(object):
+    """Native function stand-in; applies restype / argtypes like a ctypes function
+
+    Arguments are checked against argtypes with from_param, so passing what the native function would reject (a str
+    for a char *, a missing argument, ...) fails here as well, and results are converted to the restype.
+    """
+    __slots__ = ('__name__', 'implementation', 'restype', 'argtypes')
+
+    def __init__(self, name: str, implementation: object):
+        self.__name__ = name
+        self.implementation = implementation
+        # The ctypes default
+        self.restype = c_int
+        self.argtypes = None
+
+    def __call__(self, *args):
+        argtypes = self.argtypes
+        if argtypes is not None:
+            if len(args) != len(argtypes):
+                raise TypeError(f'{self.__name__} takes {len(argtypes)} arguments ({len(args)} given)')
+
+            for index, (argtype, argument) in enumerate(zip(argtypes, args), 1):
+                try:
+                    argtype.from_param(argument)
+                except Exception as error:
+                    raise ArgumentError(f'argument {index}: {type(error).__name__}: {error}') from error
+
+        return _convert_result(self.restype, self.implementation(*args))
+
+
+class StubSteamworks(object):
+    """Deterministic stand-in for the SteamworksPy library, used as STEAMWORKS(backend=...)"""
+
+    def __init__(self, app_id: int = 480, steam_id: int = None, persona_name: str = 'Stub Player',
+                 network: LoopbackNetwork = None, call_result_frames: int = 1):
+        """
+        :param app_id: int, reported instead of the one in steam_appid.txt
+        :param steam_id: int, defaults to the next free SteamID of the network
+        :param persona_name: str
+        :param network: LoopbackNetwork carrying P2P packets, a private one by default
+        :param call_result_frames: int, number of RunCallbacks calls until a request is answered
+        """
+        if call_result_frames < 1:
+            raise AttributeError('Call results can arrive on the next RunCallbacks at the earliest')
+
+        self.app_id = app_id
+        self.persona_name = persona_name
+        self.network = network if network is not None else LoopbackNetwork()
+        self.peer = self.network.add_peer(steam_id)
+        self.steam_id = self.peer.steam_id
+        self.call_result_frames = call_result_frames
+
+        self.initialized = False
+        self.frame = 0
+        self.language = 'english'
+        self.country = 'US'
+
+        # State read and written by the symbols below; set it up directly to script a scenario
+        self.dlcs = {}                  # app id -> installed
+        self.friends = {}               # steam id -> persona name, in friend list order
+        self.stats = {}                 # name -> int or float
+        self.achievements = {}          # name -> achieved, in display order
+        self.leaderboards = {}          # name -> leaderboard handle
+        self.items = {}                 # published file id -> StubItem
+        self.lobbies = {}               # lobby id -> list of member steam ids
+        self.controllers = []           # connected controller handles, in gamepad index order
+        self.action_handles = {}        # action set / action name -> handle
+        self.analog_actions = {}        # (controller, action) -> InputAnalogActionData_t
+        self.digital_actions = {}       # (controller, action) -> InputDigitalActionData_t
+        self.music_volume = 1.0
+        self.screenshots_hooked = False
+
+        # Guards the counters and queues below, so the stub can be called from several threads like the library
+        self._lock = threading.RLock()
+        self._callbacks = {}
+        self._scheduled = []
+        self._updates = {}
+        self._action_sets = {}
+        self._controller_array = (c_uint64 * _MAX_CONTROLLERS)()
+        self._next_call = 0
+        self._next_handle = 0
+        self._next_lobby = 0
+        self._next_published_file = 0
+
+        self._queue = None
+        self._queue_capacity = 0
+        self._queue_mask = 0
+        self._dropped = 0
+
+    def __getattr__(self, name: str) -> _StubSymbol:
+        # Symbols are created on first lookup, like CDLL resolves them
+        if name not in STEAMWORKS_METHODS:
+            raise AttributeError(f'StubSteamworks has no symbol {name!r}')
+
+        symbol = _StubSymbol(name, self._implementation(name))
+        setattr(self, name, symbol)
+        return symbol
+
+    def _implementation(self, name: str) -> object:
+        event_type = _CALLBACK_SETTERS.get(name)
+        if event_type is not None:
+            return lambda callback: self._set_callback(event_type, callback)
+
+        implementation = getattr(self, f'_native_{name}', None)
+        if implementation is not None:
+            return implementation
+
+        result = _default_result(STEAMWORKS_METHODS[name].get('restype'))
+        if isinstance(result, Structure):
+            return lambda *args: type(result)()
+
+        return lambda *args: result
+
+    def script(self, name: str, result: object) -> None:
+        """Replace the behaviour of a symbol
+
+        :param name: str, STEAMWORKS_METHODS name
+        :param result: callable receiving the native arguments, or the value to return on every call
+        :return: None
+        """
+        symbol = getattr(self, name)
+        symbol.implementation = result if callable(result) else (lambda *args: result)
+
+    def reset(self, name: str) -> None:
+        """Restore the default behaviour of a scripted symbol
+
+        :param name: str
+        :return: None
+        """
+        getattr(self, name).implementation = self._implementation(name)
+
+    def fire(self, event_type: SteamEventType, event: object, call: int = 0) -> None:
+        """Deliver a synthetic callback on the next RunCallbacks
+
+        :param event_type: SteamEventType
+        :param event: callback struct
+        :param call: int, SteamAPICall_t the event answers, 0 for broadcast callbacks
+        :return: None
+        """
+        with self._lock:
+            self._scheduled.append((self.frame + 1, event_type, event, call))
+
+    def _request(self, event_type: SteamEventType, event: object, track: bool = True) -> int:
+        with self._lock:
+            self._next_call += 1
+            self._scheduled.append((self.frame + self.call_result_frames, event_type, event,
+                                    self._next_call if track else 0))
+            return self._next_call
+
+    def _handle(self) -> int:
+        with self._lock:
+            self._next_handle += 1
+            return self._next_handle
+
+    def _set_callback(self, event_type: SteamEventType, callback: object) -> None:
+        self._callbacks[event_type] = callback
+        if event_type == SteamEventType.P2P_SESSION_REQUEST:
+            self.peer.P2P_SetSessionRequestCallback(lambda event: self._emit(event_type, event, 0))
+        elif event_type == SteamEventType.P2P_SESSION_CONNECT_FAIL:
+            self.peer.P2P_SetSessionConnectFailCallback(lambda event: self._emit(event_type, event, 0))
+
+    def _emit(self, event_type: SteamEventType, event: object, call: int) -> None:
+        with self._lock:
+            queued = self._queue is not None and self._queue_mask & (1 << event_type.value)
+            if queued:
+                if len(self._queue) >= self._queue_capacity:
+                    self._dropped += 1
+                else:
+                    self._queue.append((event_type, event, call))
+
+        if queued:
+            return
+
+        callback = self._callbacks.get(event_type)
+        if callback is not None:
+            callback(event)
+
+    # Steam API
+
+    def _native_SteamInit(self) -> int:
+        self.initialized = True
+        return 0
+
+    def _native_SteamShutdown(self) -> None:
+        self.initialized = False
+
+    def _native_IsSteamRunning(self) -> bool:
+        return True
+
+    def _native_RunCallbacks(self) -> None:
+        with self._lock:
+            self.frame += 1
+            due = [entry for entry in self._scheduled if entry[0] <= self.frame]
+            if due:
+                self._scheduled = [entry for entry in self._scheduled if entry[0] > self.frame]
+
+        self.peer.run_callbacks()
+        for _, event_type, event, call in due:
+            self._emit(event_type, event, call)
+
+    def _native_PendingCallResults(self) -> int:
+        with self._lock:
+            return sum(1 for entry in self._scheduled if entry[3])
+
+    # Event queue
+
+    def _native_Events_Enable(self, capacity: int, mask: int) -> bool:
+        capacity = _value(capacity)
+        if not 0 < capacity <= EVENT_QUEUE_MAX_CAPACITY:
+            return False
+
+        with self._lock:
+            self._queue = deque()
+            self._queue_capacity = 1 << (capacity - 1).bit_length()
+            self._queue_mask = _value(mask)
+
+        return True
+
+    def _native_Events_Disable(self) -> None:
+        with self._lock:
+            self._queue = None
+            self._queue_mask = 0
+
+    def _native_Events_Drain(self, records: object, max_records: int) -> int:
+        with self._lock:
+            if not self._queue:
+                return 0
+
+            count = min(_value(max_records), len(self._queue))
+            drained = [self._queue.popleft() for _ in range(count)]
+
+        for record, (event_type, event, call) in zip(records, drained):
+            record.type = event_type.value
+            record.size = sizeof(event)
+            record.call = call
+            memmove(addressof(record.data), addressof(event), sizeof(event))
+
+        return count
+
+    def _native_Events_Pending(self) -> int:
+        with self._lock:
+            return len(self._queue) if self._queue else 0
+
+    def _native_Events_Dropped(self) -> int:
+        with self._lock:
+            return self._dropped
+
+    # Apps
+
+    def _native_IsSubscribed(self) -> bool:
+        return True
+
+    def _native_IsSubscribedApp(self, app_id: int) -> bool:
+        app_id = _value(app_id)
+        return app_id == self.app_id or app_id in self.dlcs
+
+    def _native_IsAppInstalled(self, app_id: int) -> bool:
+        return _value(app_id) == self.app_id
+
+    def _native_IsDLCInstalled(self, dlc_id: int) -> bool:
+        return self.dlcs.get(_value(dlc_id), False)
+
+    def _native_GetDLCCount(self) -> int:
+        return len(self.dlcs)
+
+    def _native_InstallDLC(self, dlc_id: int) -> None:
+        self.dlcs[_value(dlc_id)] = True
+
+    def _native_UninstallDLC(self, dlc_id: int) -> None:
+        if _value(dlc_id) in self.dlcs:
+            self.dlcs[_value(dlc_id)] = False
+
+    def _native_GetAppOwner(self) -> int:
+        return self.steam_id
+
+    def _native_GetCurrentGameLanguage(self) -> bytes:
+        return self.language.encode()
+
+    def _native_GetAvailableGameLanguages(self) -> bytes:
+        return self.language.encode()
+
+    # Friends
+
+    def _native_GetFriendCount(self, flags: int) -> int:
+        return len(self.friends)
+
+    def _native_GetFriendByIndex(self, index: int, flags: int) -> int:
+        friends = list(self.friends)
+        index = _value(index)
+        return friends[index] if 0 <= index < len(friends) else 0
+
+    def _native_GetPersonaName(self) -> bytes:
+        return self.persona_name.encode()
+
+    def _native_GetPersonaState(self) -> int:
+        return 1  # Online
+
+    def _native_GetFriendPersonaName(self, steam_id: int) -> bytes:
+        steam_id = _value(steam_id)
+        if steam_id == self.steam_id:
+            return self.persona_name.encode()
+
+        return self.friends.get(steam_id, '').encode()
+
+    # Input
+
+    def _native_ControllerInit(self, explicitly_call_run_frame: bool) -> bool:
+        return True
+
+    def _native_ControllerShutdown(self) -> bool:
+        return True
+
+    def _native_SetInputActionManifestFilePath(self, path: bytes) -> bool:
+        return True
+
+    def _native_GetConnectedControllers(self) -> object:
+        array = self._controller_array
+        for index in range(_MAX_CONTROLLERS):
+            array[index] = self.controllers[index] if index < len(self.controllers) else 0
+
+        return array
+
+    def _native_GetControllerForGamepadIndex(self, index: int) -> int:
+        index = _value(index)
+        return self.controllers[index] if 0 <= index < len(self.controllers) else 0
+
+    def _native_GetGamepadIndexForController(self, controller: int) -> int:
+        controller = _value(controller)
+        return self.controllers.index(controller) if controller in self.controllers else -1
+
+    def _action_handle(self, name: bytes) -> int:
+        name = _text(name)
+        handle = self.action_handles.get(name)
+        if handle is None:
+            handle = self.action_handles[name] = len(self.action_handles) + 1
+
+        return handle
+
+    def _native_GetActionSetHandle(self, name: bytes) -> int:
+        return self._action_handle(name)
+
+    def _native_GetAnalogActionHandle(self, name: bytes) -> int:
+        return self._action_handle(name)
+
+    def _native_GetDigitalActionHandle(self, name: bytes) -> int:
+        return self._action_handle(name)
+
+    def _native_ActivateActionSet(self, controller: int, action_set: int) -> None:
+        self._action_sets[_value(controller)] = _value(action_set)
+
+    def _native_GetCurrentActionSet(self, controller: int) -> int:
+        return self._action_sets.get(_value(controller), 0)
+
+    def _native_GetAnalogActionData(self, controller: int, action: int) -> InputAnalogActionData_t:
+        data = self.analog_actions.get((_value(controller), _value(action)))
+        # Returned by value: every call hands out a fresh copy
+        return InputAnalogActionData_t.from_buffer_copy(data) if data is not None else InputAnalogActionData_t()
+
+    def _native_GetDigitalActionData(self, controller: int, action: int) -> InputDigitalActionData_t:
+        data = self.digital_actions.get((_value(controller), _value(action)))
+        return InputDigitalActionData_t.from_buffer_copy(data) if data is not None else InputDigitalActionData_t()
+
+    # Matchmaking
+
+    def _native_CreateLobby(self, lobby_type: int, max_members: int) -> int:
+        with self._lock:
+            self._next_lobby += 1
+            lobby_id = _FIRST_LOBBY_ID + self._next_lobby
+            self.lobbies[lobby_id] = [self.steam_id]
+            call = self._request(SteamEventType.LOBBY_CREATED, LobbyCreated_t(_RESULT_OK, lobby_id))
+            # Steam enters the new lobby right after creating it
+            self._request(SteamEventType.LOBBY_ENTER, LobbyEnter_t(lobby_id, _CHAT_ROOM_ENTER_SUCCESS), track=False)
+            return call
+
+    def _native_JoinLobby(self, lobby_id: int) -> int:
+        lobby_id = _value(lobby_id)
+        members = self.lobbies.get(lobby_id)
+        if members is None:
+            response = _CHAT_ROOM_ENTER_DOESNT_EXIST
+        else:
+            response = _CHAT_ROOM_ENTER_SUCCESS
+            if self.steam_id not in members:
+                members.append(self.steam_id)
+
+        # Only delivered as the LobbyEnter_t broadcast, see JoinLobby in SteamworksPy.cpp
+        return self._request(SteamEventType.LOBBY_ENTER, LobbyEnter_t(lobby_id, response), track=False)
+
+    def _native_LeaveLobby(self, lobby_id: int) -> None:
+        members = self.lobbies.get(_value(lobby_id))
+        if members is not None and self.steam_id in members:
+            members.remove(self.steam_id)
+
+    def _native_InviteUserToLobby(self, lobby_id: int, steam_id: int) -> bool:
+        return _value(lobby_id) in self.lobbies
+
+    def _native_GetNumLobbyMembers(self, lobby_id: int) -> int:
+        return len(self.lobbies.get(_value(lobby_id), ()))
+
+    def _native_GetLobbyMemberByIndex(self, lobby_id: int, index: int) -> int:
+        members = self.lobbies.get(_value(lobby_id), ())
+        index = _value(index)
+        return members[index] if 0 <= index < len(members) else 0
+
+    # Music
+
+    def _native_MusicGetVolume(self) -> float:
+        return self.music_volume
+
+    def _native_MusicSetVolume(self, volume: float) -> None:
+        self.music_volume = float(_value(volume))
+
+    # Screenshots
+
+    def _native_AddScreenshotToLibrary(self, *args) -> int:
+        return self._handle()
+
+    def _native_HookScreenshots(self, hook: bool) -> None:
+        self.screenshots_hooked = bool(_value(hook))
+
+    def _native_IsScreenshotsHooked(self) -> bool:
+        return self.screenshots_hooked
+
+    # Users
+
+    def _native_GetSteamID(self) -> int:
+        return self.steam_id
+
+    def _native_LoggedOn(self) -> bool:
+        return True
+
+    def _native_GetAuthSessionTicket(self, buffer: object) -> int:
+        ticket = b'STUB' + self.steam_id.to_bytes(8, 'little')
+        memmove(buffer, ticket, len(ticket))
+        return len(ticket)
+
+    # User stats
+
+    def _native_RequestCurrentStats(self) -> bool:
+        return True
+
+    def _native_StoreStats(self) -> bool:
+        return True
+
+    def _native_GetStatInt(self, name: bytes) -> int:
+        return int(self.stats.get(_text(name), 0))
+
+    def _native_GetStatFloat(self, name: bytes) -> float:
+        return float(self.stats.get(_text(name), 0.0))
+
+    def _native_SetStatInt(self, name: bytes, value: int) -> bool:
+        self.stats[_text(name)] = int(_value(value))
+        return True
+
+    def _native_SetStatFloat(self, name: bytes, value: float) -> bool:
+        self.stats[_text(name)] = float(_value(value))
+        return True
+
+    def _native_ResetAllStats(self, achievements: bool) -> bool:
+        self.stats.clear()
+        if _value(achievements):
+            self.achievements = dict.fromkeys(self.achievements, False)
+
+        return True
+
+    def _native_GetNumAchievements(self) -> int:
+        return len(self.achievements)
+
+    def _native_GetAchievementName(self, index: int) -> bytes:
+        names = list(self.achievements)
+        index = _value(index)
+        return names[index].encode() if 0 <= index < len(names) else b''
+
+    def _native_GetAchievement(self, name: bytes) -> bool:
+        return self.achievements.get(_text(name), False)
+
+    def _native_SetAchievement(self, name: bytes) -> bool:
+        name = _text(name)
+        if name not in self.achievements:
+            return False
+
+        self.achievements[name] = True
+        return True
+
+    def _native_ClearAchievement(self, name: bytes) -> bool:
+        name = _text(name)
+        if name not in self.achievements:
+            return False
+
+        self.achievements[name] = False
+        return True
+
+    def _native_Leaderboard_FindLeaderboard(self, name: bytes) -> int:
+        handle = self.leaderboards.get(_text(name), 0)
+        return self._request(SteamEventType.LEADERBOARD_FOUND, FindLeaderboardResult_t(handle, 1 if handle else 0))
+
+    # Utils
+
+    def _native_GetAppID(self) -> int:
+        return self.app_id
+
+    def _native_GetIPCountry(self) -> bytes:
+        return self.country.encode()
+
+    def _native_GetSteamUILanguage(self) -> bytes:
+        return self.language.encode()
+
+    def _native_GetCurrentBatteryPower(self) -> int:
+        return 255  # On AC power
+
+    # Workshop
+
+    def _native_Workshop_CreateItem(self, app_id: int, file_type: int) -> int:
+        with self._lock:
+            self._next_published_file += 1
+            published_file_id = _FIRST_PUBLISHED_FILE_ID + self._next_published_file
+            self.items[published_file_id] = StubItem()
+
+        return self._request(SteamEventType.ITEM_CREATED, CreateItemResult_t(_RESULT_OK, published_file_id, False))
+
+    def _native_Workshop_StartItemUpdate(self, app_id: int, published_file_id: int) -> int:
+        handle = self._handle()
+        self._updates[handle] = [_value(published_file_id), EItemUpdateStatus.PREPARING_CONFIG]
+        return handle
+
+    def _item_update_setter(self, update_handle: int, *args) -> bool:
+        return _value(update_handle) in self._updates
+
+    _native_Workshop_SetItemTitle = _item_update_setter
+    _native_Workshop_SetItemDescription = _item_update_setter
+    _native_Workshop_SetItemUpdateLanguage = _item_update_setter
+    _native_Workshop_SetItemMetadata = _item_update_setter
+    _native_Workshop_SetItemVisibility = _item_update_setter
+    _native_Workshop_SetItemTags = _item_update_setter
+    _native_Workshop_SetItemContent = _item_update_setter
+    _native_Workshop_SetItemPreview = _item_update_setter
+
+    def _native_Workshop_SubmitItemUpdate(self, update_handle: int, change_note: bytes) -> int:
+        update = self._updates.get(_value(update_handle))
+        if update is None:
+            return 0
+
+        update[1] = EItemUpdateStatus.COMMITTING_CHANGES
+        return self._request(SteamEventType.ITEM_UPDATED, SubmitItemUpdateResult_t(_RESULT_OK, False, update[0]))
+
+    def _native_Workshop_GetItemUpdateProgress(self, update_handle: int, processed: object, total: object) -> int:
+        update = self._updates.get(_value(update_handle))
+        dereference(processed).value = 0
+        dereference(total).value = 0
+        return update[1].value if update is not None else EItemUpdateStatus.INVALID.value
+
+    def _native_Workshop_GetNumSubscribedItems(self) -> int:
+        return sum(1 for item in self.items.values() if item.state & EItemState.SUBSCRIBED)
+
+    def _native_Workshop_GetSubscribedItems(self, published_files: object, max_items: int) -> int:
+        subscribed = [published_file_id for published_file_id, item in self.items.items()
+                      if item.state & EItemState.SUBSCRIBED]
+        for index, published_file_id in enumerate(subscribed[:_value(max_items)]):
+            published_files[index] = published_file_id
+
+        return len(subscribed)
+
+    def _native_Workshop_GetItemState(self, published_file_id: int) -> int:
+        item = self.items.get(_value(published_file_id))
+        return int(item.state) if item is not None else 0
+
+    def _native_Workshop_GetItemInstallInfo(self, published_file_id: int, size_on_disk: object, folder: object,
+                                            folder_size: int, timestamp: object) -> bool:
+        item = self.items.get(_value(published_file_id))
+        if item is None or not item.state & EItemState.INSTALLED:
+            return False
+
+        path = item.folder.encode()[:_value(folder_size) - 1] + b'\0'
+        memmove(folder, path, len(path))
+        dereference(size_on_disk).value = item.size
+        dereference(timestamp).value = item.timestamp
+        return True
+
+    def _native_Workshop_GetItemDownloadInfo(self, published_file_id: int, downloaded: object,
+                                             total: object) -> bool:
+        item = self.items.get(_value(published_file_id))
+        if item is None or not item.total:
+            return False
+
+        dereference(downloaded).value = item.downloaded
+        dereference(total).value = item.total
+        return True
+
+    def _native_Workshop_ClearItemInstalledCallback(self) -> None:
+        self._callbacks.pop(SteamEventType.ITEM_INSTALLED, None)
+
+    def _native_Workshop_SubscribeItem(self, published_file_id: int) -> int:
+        published_file_id = _value(published_file_id)
+        item = self.items.get(published_file_id)
+        if item is None:
+            item = self.items[published_file_id] = StubItem()
+
+        item.state |= EItemState.SUBSCRIBED
+        return self._request(SteamEventType.ITEM_SUBSCRIBED, SubscriptionResult(_RESULT_OK, published_file_id))
+
+    def _native_Workshop_UnsubscribeItem(self, published_file_id: int) -> int:
+        published_file_id = _value(published_file_id)
+        item = self.items.get(published_file_id)
+        if item is None or not item.state & EItemState.SUBSCRIBED:
+            result = _RESULT_FAIL
+        else:
+            result = _RESULT_OK
+            item.state &= ~EItemState.SUBSCRIBED
+
+        return self._request(SteamEventType.ITEM_UNSUBSCRIBED, SubscriptionResult(result, published_file_id))
+
+    # P2P networking, served by the loopback peer
+
+    def _native_CreateP2PSessionWithUser(self, steam_id_remote: int) -> bool:
+        return self.peer.CreateP2PSessionWithUser(_value(steam_id_remote))
+
+    def _native_AcceptP2PSessionWithUser(self, steam_id_remote: int) -> bool:
+        return self.peer.AcceptP2PSessionWithUser(_value(steam_id_remote))
+
+    def _native_CloseP2PSessionWithUser(self, steam_id_remote: int) -> bool:
+        return self.peer.CloseP2PSessionWithUser(_value(steam_id_remote))
+
+    def _native_GetP2PSessionState(self, steam_id_remote: int, state: object) -> bool:
+        return self.peer.GetP2PSessionState(_value(steam_id_remote), state)
+
+    def _native_SendP2PPacket(self, steam_id_remote: int, data: object, data_size: int, send_type: int,
+                              channel: int) -> bool:
+        return self.peer.SendP2PPacket(_value(steam_id_remote), data, _value(data_size), _value(send_type),
+                                       _value(channel))
+
+    def _native_SendP2PPackets(self, items: object, count: int, result_bits: object) -> int:
+        return self.peer.SendP2PPackets(items, _value(count), result_bits)
+
+    def _native_ReadP2PPacket(self, buffer: object, buffer_size: int, msg_size: object, sender_steam_id: object,
+                              channel: int) -> bool:
+        return self.peer.ReadP2PPacket(buffer, _value(buffer_size), msg_size, sender_steam_id, _value(channel))
+
+    def _native_ReadP2PPackets(self, arena: object, arena_size: int, records: object, max_packets: int,
+                               next_msg_size: object, channel: int) -> int:
+        return self.peer.ReadP2PPackets(arena, _value(arena_size), records, _value(max_packets), next_msg_size,
+                                        _value(channel))
+
+    def _native_Convert32BitTo64BitSteamID(self, account_id: int) -> int:
+        # Individual account in the public universe
+        return 76561197960265728 + _value(account_id)
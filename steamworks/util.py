@@ -8,4 +8,21 @@ def get_arch():
     if not (sys.maxsize > 2**32):
         return Arch.x86
 
-    return Arch.x64
\ No newline at end of file
+    return Arch.x64
+
+
+def dereference(parameter: object) -> object:
+    """Resolve a byref() or pointer() out-parameter to the ctypes object it points to
+
+    Used by the Python stand-ins of native functions, which receive out-parameters the way ctypes passes them.
+
+    :param parameter: byref() result, ctypes pointer or the ctypes object itself
+    :return: ctypes object
+    """
+    if hasattr(parameter, '_obj'):
+        return parameter._obj
+
+    if hasattr(parameter, 'contents'):
+        return parameter.contents
+
+    return parameter
\ No newline at end of file
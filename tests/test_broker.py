@@ -0,0 +1,116 @@
+import multiprocessing
+import os
+import sys
+import unittest
+
+current_path = os.path.dirname(os.path.realpath(__file__))
+project_root = os.path.abspath(os.path.join(current_path, '..'))
+sys.path.insert(0, project_root)
+
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+from steamworks import STEAMWORKS
+from steamworks.broker import SteamBroker, SteamBrokerClient
+from steamworks.enums import EItemState, EWorkshopFileType, SteamEventType
+from steamworks.exceptions import SteamBrokerException
+from steamworks.stub import StubItem, StubSteamworks
+
+ITEM = 1000001
+
+
+def worker_steam_id(address: str, authkey: bytes) -> int:
+    with SteamBrokerClient(address, authkey=authkey, timeout=10) as client:
+        return client.Users.GetSteamID()
+
+
+class TestSteamBroker(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubSteamworks(app_id=1234)
+        self.stub.items[ITEM] = StubItem(EItemState.INSTALLED, 4096, '/workshop/content/1000001', 1700000000)
+        self.steam = STEAMWORKS(backend=self.stub)
+        self.steam.initialize()
+        self.authkey = os.urandom(16)
+        self.broker = SteamBroker(self.steam, authkey=self.authkey, callback_interval=0.005)
+        self.broker.start()
+        self.client = SteamBrokerClient(self.broker.address, authkey=self.authkey, timeout=10)
+
+    def tearDown(self):
+        self.client.close()
+        self.assertTrue(self.broker.stop(10))
+
+    def test_proxy_calls(self):
+        self.assertEqual(self.client.Users.GetSteamID(), self.stub.steam_id)
+        self.assertEqual(self.client.Workshop.GetItemState(ITEM), EItemState.INSTALLED)
+        self.assertEqual(self.client.Workshop.GetItemInstallInfo(ITEM)['folder'], '/workshop/content/1000001')
+        self.assertTrue(self.client.UserStats.SetStat(b'NumWins', 3))
+        self.assertEqual(self.stub.stats['NumWins'], 3)
+
+        with self.assertRaises(AttributeError):
+            self.client.Workshop.NoSuchMethod()
+
+        with self.assertRaises(AttributeError):
+            self.client.Workshop.SetItemInstalledCallback(print)
+
+        with self.assertRaises(AttributeError):
+            self.client.NoSuchInterface.GetSteamID()
+
+    def test_batched_and_async_calls(self):
+        with self.client.batch():
+            futures = [self.client.submit('Workshop', 'GetItemState', ITEM + offset) for offset in range(100)]
+            created = self.client.submit('Workshop', 'CreateItemAsync', 1234, EWorkshopFileType.COMMUNITY)
+            self.assertEqual(self.broker.requests, 0)
+
+        self.assertEqual(futures[0].result(10), EItemState.INSTALLED)
+        self.assertEqual({future.result(10) for future in futures[1:]}, {EItemState.NONE})
+        self.assertIn(created.result(10).publishedFileId, self.stub.items)
+        self.assertEqual(self.broker.requests, 101)
+        self.assertEqual(self.client.pending, 0)
+
+    def test_callbacks_fan_out_to_subscribed_clients(self):
+        other = SteamBrokerClient(self.broker.address, authkey=self.authkey, timeout=10)
+        self.addCleanup(other.close)
+        received, other_received = [], []
+        self.client.bus.subscribe(SteamEventType.ITEM_SUBSCRIBED, received.append, publishedFileId=ITEM)
+        other.bus.subscribe(SteamEventType.ITEM_SUBSCRIBED, other_received.append)
+
+        # Proxy calls are answered in order, so both subscriptions are in place once this returns
+        other.Users.GetSteamID()
+        self.client.Workshop.SubscribeItemAsync(ITEM + 1)
+        self.client.Workshop.SubscribeItemAsync(ITEM)
+        # Events are sent ahead of the results they led to, both are already queued in this client
+        self.assertEqual(self.client.run_callbacks(), 2)
+        while len(other_received) < 2:
+            self.assertGreater(other.run_callbacks(timeout=10), 0)
+
+        self.assertEqual([event.publishedFileId for event in received], [ITEM])
+        self.assertEqual(sorted(event.publishedFileId for event in other_received), [ITEM, ITEM + 1])
+
+    def test_unauthenticated_clients_are_rejected(self):
+        with self.assertRaises(AuthenticationError):
+            SteamBrokerClient(self.broker.address, authkey=b'wrong key')
+
+        # A client skipping the handshake only gets the challenge and its rejection, never an answer
+        raw = Client(self.broker.address)
+        self.addCleanup(raw.close)
+        raw.send(('call', [(1, 'Users', 'GetSteamID', (), {})]))
+        with self.assertRaises((EOFError, OSError)):
+            while raw.poll(10):
+                self.assertTrue(raw.recv_bytes().startswith((b'#CHALLENGE#', b'#FAILURE#')))
+
+        self.assertEqual(self.broker.requests, 0)
+        self.assertRaises(AttributeError, SteamBroker, self.steam, authkey=b'')
+
+    def test_worker_processes(self):
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(2) as pool:
+            steam_ids = pool.starmap(worker_steam_id, [(self.broker.address, self.authkey)] * 4)
+
+        self.assertEqual(steam_ids, [self.stub.steam_id] * 4)
+        self.client.close()
+        with self.assertRaises(SteamBrokerException):
+            self.client.submit('Users', 'GetSteamID')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+import asyncio
+import unittest
+
+current_path = os.path.dirname(os.path.realpath(__file__))
+project_root = os.path.abspath(os.path.join(current_path, '..'))
+sys.path.insert(0, project_root)
+
+from steamworks.enums import SteamEventType
+from steamworks.events import SteamEventQueue
+from steamworks.exceptions import CallResultTimeoutException, GenericSteamException
+from steamworks.futures import LoopCallbackPump, SteamCallResults
+from steamworks.structs import CreateItemResult_t, SubscriptionResult
+from tests.test_callback_pump import FakeNativeEvents
+
+
+class TestCallResults(unittest.TestCase):
+    def setUp(self):
+        self.steam = FakeNativeEvents()
+        self.steam.events = SteamEventQueue(self.steam)
+        self.steam.events.enable()
+        self.steam.run_callbacks = self.steam.events.dispatch
+        self.call_results = SteamCallResults(self.steam)
+
+    def test_concurrent_futures(self):
+        first = self.call_results.expect(SteamEventType.ITEM_SUBSCRIBED, 10)
+        second = self.call_results.expect(SteamEventType.ITEM_SUBSCRIBED, 20)
+        cancelled = self.call_results.expect(SteamEventType.ITEM_CREATED)
+        created = self.call_results.expect(SteamEventType.ITEM_CREATED)
+        cancelled.cancel()
+
+        self.steam.push(SteamEventType.ITEM_SUBSCRIBED, SubscriptionResult(1, 20))
+        self.steam.push(SteamEventType.ITEM_SUBSCRIBED, SubscriptionResult(1, 10))
+        self.steam.push(SteamEventType.ITEM_CREATED, CreateItemResult_t(1, 30, False))
+        self.steam.run_callbacks()
+
+        self.assertEqual(first.result(0).publishedFileId, 10)
+        self.assertEqual(second.result(0).publishedFileId, 20)
+        self.assertEqual(created.result(0).publishedFileId, 30)
+        self.assertEqual(len(self.call_results), 0)
+
+    def test_tracked_by_call_handle(self):
+        first = self.call_results.track(SteamEventType.ITEM_SUBSCRIBED, 101)
+        second = self.call_results.track(SteamEventType.ITEM_SUBSCRIBED, 102)
+        failed = self.call_results.track(SteamEventType.ITEM_SUBSCRIBED, 0)
+
+        self.steam.push(SteamEventType.ITEM_SUBSCRIBED, SubscriptionResult(1, 7), 102)
+        self.steam.push(SteamEventType.ITEM_SUBSCRIBED, SubscriptionResult(2, 7), 101)
+        self.steam.push(SteamEventType.ITEM_CREATED, CreateItemResult_t(1, 30, False), 103)
+        self.steam.run_callbacks()
+
+        self.assertEqual(first.result(0).result, 2)
+        self.assertEqual(second.result(0).result, 1)
+        self.assertRaises(GenericSteamException, failed.result, 0)
+        # Delivered before anyone tracked it
+        late = self.call_results.track(SteamEventType.ITEM_CREATED, 103)
+        self.assertEqual(late.result(0).publishedFileId, 30)
+        self.assertEqual(len(self.call_results), 0)
+
+    def test_timeout(self):
+        future = self.call_results.expect(SteamEventType.LEADERBOARD_FOUND, timeout=0.01)
+        time.sleep(0.02)
+        self.steam.run_callbacks()
+        self.assertRaises(CallResultTimeoutException, future.result, 0)
+        self.assertEqual(len(self.call_results), 0)
+
+    def test_asyncio_futures(self):
+        async def create_items():
+            pump = LoopCallbackPump(self.steam, interval=0.001)
+            pump.start()
+            futures = [self.call_results.expect(SteamEventType.ITEM_CREATED) for _ in range(3)]
+            for published_file_id in range(3):
+                self.steam.push(SteamEventType.ITEM_CREATED, CreateItemResult_t(1, published_file_id, False))
+
+            results = await asyncio.wait_for(asyncio.gather(*futures), 1.0)
+            with self.assertRaises(TimeoutError):
+                await self.call_results.expect(SteamEventType.ITEM_UPDATED, timeout=0.01)
+
+            pump.stop()
+            return [result.publishedFileId for result in results]
+
+        self.assertEqual(asyncio.run(create_items()), [0, 1, 2])
+
+    def test_loop_callback_pump_requires_a_loop(self):
+        self.assertRaises(AttributeError, LoopCallbackPump, self.steam)
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        pump = LoopCallbackPump(self.steam, loop, interval=0.001)
+        pump.start()
+        future = self.call_results.expect(SteamEventType.ITEM_CREATED, loop=loop)
+        self.steam.push(SteamEventType.ITEM_CREATED, CreateItemResult_t(1, 7, False))
+        self.assertEqual(loop.run_until_complete(asyncio.wait_for(future, 1.0)).publishedFileId, 7)
+        pump.stop()
@@ -0,0 +1,123 @@
+import os
+import sys
+import threading
+import time
+import unittest
+from ctypes import addressof, memmove, sizeof
+
+current_path = os.path.dirname(os.path.realpath(__file__))
+project_root = os.path.abspath(os.path.join(current_path, '..'))
+sys.path.insert(0, project_root)
+
+from steamworks import STEAMWORKS
+from steamworks.enums import SteamEventType
+from steamworks.events import SteamEventBus, SteamEventQueue
+from steamworks.pump import CallbackPump
+from steamworks.structs import ItemInstalled_t, LobbyCreated_t
+from steamworks.stub import StubSteamworks
+
+
+class FakeNativeEvents(object):
+    """Implements the native symbols used by SteamEventQueue and CallbackPump"""
+
+    def __init__(self):
+        self._cdll = self
+        self.pending_call_results = 0
+        self.callback_threads = set()
+        self.queued = []
+        self.lock = threading.Lock()
+        self.bus = SteamEventBus(self)
+        self.events = None
+
+    def loaded(self) -> bool:
+        return True
+
+    def RunCallbacks(self) -> None:
+        self.callback_threads.add(threading.current_thread())
+
+    def PendingCallResults(self) -> int:
+        return self.pending_call_results
+
+    def Events_Enable(self, capacity: int, mask: int) -> bool:
+        return True
+
+    def Events_Drain(self, records: object, max_records: int) -> int:
+        with self.lock:
+            count = min(max_records, len(self.queued))
+            for index in range(count):
+                event_type, event, call = self.queued.pop(0)
+                records[index].type = event_type.value
+                records[index].size = sizeof(event)
+                records[index].call = call
+                memmove(addressof(records[index].data), addressof(event), sizeof(event))
+
+        return count
+
+    def push(self, event_type: SteamEventType, event: object, call: int = 0) -> None:
+        with self.lock:
+            self.queued.append((event_type, event, call))
+
+
+class TestCallbackPump(unittest.TestCase):
+    def setUp(self):
+        self.steam = FakeNativeEvents()
+        self.steam.events = SteamEventQueue(self.steam, batch_size=4)
+        self.steam.events.enable()
+        self.received = []
+        self.steam.events.set_handler(SteamEventType.ITEM_INSTALLED, lambda event: self.received.append(
+            (threading.current_thread(), event.publishedFileId)))
+
+    def test_events_are_delivered_on_the_consumer_thread(self):
+        pump = CallbackPump(self.steam, hz=100)
+        pump.start()
+        for published_file_id in range(10):
+            self.steam.push(SteamEventType.ITEM_INSTALLED, ItemInstalled_t(480, published_file_id))
+
+        delivered = 0
+        deadline = time.monotonic() + 2.0
+        while delivered < 10 and time.monotonic() < deadline:
+            delivered += pump.deliver(timeout=0.1)
+
+        self.assertTrue(pump.stop(timeout=1.0))
+        self.assertFalse(pump.running)
+        self.assertEqual(self.received, [(threading.current_thread(), index) for index in range(10)])
+        self.assertNotIn(threading.current_thread(), self.steam.callback_threads)
+
+    def test_adaptive_interval(self):
+        pump = CallbackPump(self.steam, hz=20, busy_hz=1000)
+        pump.start()
+        self.steam.pending_call_results = 1
+        time.sleep(0.1)
+        self.assertEqual(pump.interval, pump.busy_interval)
+
+        self.steam.pending_call_results = 0
+        time.sleep(0.3)
+        self.assertEqual(pump.interval, pump.idle_interval)
+        self.assertTrue(pump.stop(timeout=1.0))
+
+
+class TestStartCallbackPump(unittest.TestCase):
+    def test_partial_event_queue_is_widened(self):
+        stub = StubSteamworks()
+        steam = STEAMWORKS(backend=stub)
+        steam.initialize()
+        events = steam.enable_event_queue(event_types=[SteamEventType.ITEM_INSTALLED])
+        received = []
+        events.set_handler(SteamEventType.ITEM_INSTALLED, lambda event: received.append(threading.current_thread()))
+        steam.bus.subscribe(SteamEventType.LOBBY_CREATED, lambda event: received.append(threading.current_thread()))
+
+        steam.start_callback_pump(hz=1000)
+        self.addCleanup(steam.stop_callback_pump)
+        # The same queue, handlers included, now queues every event type
+        self.assertIs(steam.events, events)
+        self.assertEqual(set(events.event_types), set(SteamEventType))
+
+        stub.fire(SteamEventType.ITEM_INSTALLED, ItemInstalled_t(480, 1))
+        stub.fire(SteamEventType.LOBBY_CREATED, LobbyCreated_t(1, 2))
+        deadline = time.monotonic() + 2.0
+        while len(received) < 2 and time.monotonic() < deadline:
+            steam.run_callbacks()
+            time.sleep(0.001)
+
+        # Both callbacks ran here, none through a trampoline on the pump thread
+        self.assertEqual(received, [threading.current_thread()] * 2)
@@ -0,0 +1,184 @@
+import os
+import sys
+import threading
+import unittest
+
+current_path = os.path.dirname(os.path.realpath(__file__))
+project_root = os.path.abspath(os.path.join(current_path, '..'))
+sys.path.insert(0, project_root)
+
+from steamworks import STEAMWORKS
+from steamworks.enums import EItemState, ELobbyType, EP2PSend, SteamEventType
+from steamworks.exceptions import GenericSteamException
+from steamworks.stub import StubItem, StubSteamworks
+
+ITEM = 1000001
+THREADS = 8
+ITERATIONS = 200
+RELIABLE = EP2PSend.k_EP2PSendReliable.value
+
+
+class TestThreadSafeMode(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubSteamworks(app_id=1234)
+        self.stub.items[ITEM] = StubItem(EItemState.INSTALLED, 4096, '/workshop/content/1000001', 1700000000)
+        self.steam = STEAMWORKS(backend=self.stub, thread_safe=True)
+        self.steam.initialize()
+        # Switch threads far more often than the default 5 ms, so races actually interleave
+        self.addCleanup(sys.setswitchinterval, sys.getswitchinterval())
+        sys.setswitchinterval(1e-6)
+
+    def run_threads(self, target: object) -> None:
+        errors = []
+        barrier = threading.Barrier(THREADS)
+
+        def run(index):
+            try:
+                barrier.wait()
+                target(index)
+            except BaseException as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=run, args=(index,)) for index in range(THREADS)]
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join(60)
+
+        if errors:
+            raise errors[0]
+
+    def test_interfaces_and_bindings_are_created_once(self):
+        interfaces = []
+        self.run_threads(lambda index: interfaces.append((self.steam.Matchmaking, self.steam.GetNumLobbyMembers,
+                                                          self.steam.call_results())))
+
+        self.assertEqual(len(interfaces), THREADS)
+        self.assertEqual(len({tuple(map(id, entry)) for entry in interfaces}), 1)
+        # One subscription per state tracking callback, not one per thread that raced to build the interface
+        self.assertEqual(len(self.steam.bus.subscribers(SteamEventType.LOBBY_ENTER)), 1)
+        self.assertEqual(type(self.steam.Matchmaking).__name__, 'SteamMatchmaking')
+
+    def test_stress(self):
+        pump = self.steam.start_callback_pump(hz=1000, busy_hz=1000)
+        self.addCleanup(self.steam.stop_callback_pump)
+        callback_threads, futures = set(), []
+        self.steam.bus.subscribe(SteamEventType.LOBBY_CREATED,
+                                 lambda event: callback_threads.add(threading.current_thread()))
+
+        def hammer(index):
+            stat = f'Thread{index}'.encode()
+            installed = []
+            for iteration in range(ITERATIONS):
+                self.assertEqual(self.steam.Workshop.GetItemState(ITEM), EItemState.INSTALLED)
+                self.assertEqual(self.steam.Workshop.GetItemInstallInfo(ITEM)['folder'], '/workshop/content/1000001')
+                self.assertTrue(self.steam.UserStats.SetStat(stat, iteration))
+                self.assertEqual(self.steam.UserStats.GetStatInt(stat), iteration)
+
+                lobby_id, members = self.steam.Matchmaking.GetLobbySnapshot()
+                self.assertEqual(members, (self.stub.steam_id,) if lobby_id else ())
+                self.steam.run_callbacks()
+
+                subscription = self.steam.bus.subscribe(SteamEventType.ITEM_INSTALLED, installed.append)
+                if iteration % 20 == 0:
+                    futures.append((self.steam.Matchmaking.CreateLobbyAsync(ELobbyType.k_ELobbyTypePublic, 4, 10),
+                                    self.steam.Workshop.SubscribeItemAsync(ITEM + 1 + index, 10)))
+
+                subscription.unsubscribe()
+
+        self.run_threads(hammer)
+
+        lobbies = {lobby.result(10).m_ulSteamIDLobby for lobby, _ in futures}
+        self.assertEqual(len(lobbies), THREADS * ITERATIONS // 20)
+        self.assertEqual({item.result(10).publishedFileId for _, item in futures},
+                         {ITEM + 1 + index for index in range(THREADS)})
+        self.assertEqual(self.steam.bus.subscribers(SteamEventType.ITEM_INSTALLED), ())
+        self.assertEqual(self.stub.stats, {f'Thread{index}': ITERATIONS - 1 for index in range(THREADS)})
+        self.assertTrue(self.steam.stop_callback_pump(10))
+        self.assertIsNone(pump.error)
+        self.assertEqual({thread.name for thread in callback_threads}, {'steamworks-callback-pump'})
+        self.assertIn(self.steam.Matchmaking.current_lobby_id, self.stub.lobbies)
+
+    def test_p2p_stats(self):
+        networking = self.steam.P2PNetworking
+        stats = networking.EnableStats()
+        other = self.stub.network.add_peer()
+        for index in range(THREADS // 2 * ITERATIONS):
+            other.P2PNetworking.SendP2PPacket(self.stub.steam_id, b'%d' % index, len(b'%d' % index), RELIABLE)
+
+        received = []
+
+        def send_or_read(index):
+            if index % 2:
+                for _ in range(ITERATIONS):
+                    self.assertTrue(networking.SendP2PPacket(other.steam_id, b'x', 1, RELIABLE))
+            else:
+                while True:
+                    count, records, arena = networking.ReadP2PPackets(max_packets=4)
+                    if not count:
+                        break
+
+                    received.extend(bytes(arena[record.offset:record.offset + record.size])
+                                    for record in records[:count])
+
+        self.run_threads(send_or_read)
+
+        self.assertEqual(sorted(received), sorted(b'%d' % index for index in range(THREADS // 2 * ITERATIONS)))
+        totals = networking.GetStatsSnapshot()['totals']
+        self.assertEqual(totals['packets_sent'], THREADS // 2 * ITERATIONS)
+        self.assertEqual(totals['packets_received'], THREADS // 2 * ITERATIONS)
+        self.assertEqual(stats.sent_sizes.count, THREADS // 2 * ITERATIONS)
+
+        # The instrumented methods installed by EnableStats wait for the interface lock like the ones they replace
+        thread = threading.Thread(target=networking.SendP2PPacket, args=(other.steam_id, b'x', 1, RELIABLE))
+        with networking._lock:
+            thread.start()
+            thread.join(0.1)
+            self.assertTrue(thread.is_alive())
+
+        thread.join(10)
+        self.assertEqual(networking.GetStatsSnapshot()['totals']['packets_sent'], THREADS // 2 * ITERATIONS + 1)
+
+    def run_callbacks_on_another_thread(self) -> list:
+        results = []
+
+        def other():
+            try:
+                results.append(self.steam.run_callbacks())
+            except GenericSteamException as error:
+                results.append(error)
+
+        thread = threading.Thread(target=other)
+        thread.start()
+        thread.join()
+        return results
+
+    def test_run_callbacks_with_and_without_the_pump(self):
+        self.steam.start_callback_pump(hz=1000)
+        self.addCleanup(self.steam.stop_callback_pump)
+        # The pump thread runs the callbacks; run_callbacks() on any other thread only delivers and returns
+        self.assertTrue(self.steam.run_callbacks())
+        self.assertEqual(self.run_callbacks_on_another_thread(), [True])
+        self.assertTrue(self.steam.stop_callback_pump(10))
+
+        # Without the pump the first caller owns the callbacks and every other thread is refused
+        self.assertTrue(self.steam.run_callbacks())
+        results = self.run_callbacks_on_another_thread()
+        self.assertEqual(len(results), 1)
+        self.assertIsInstance(results[0], GenericSteamException)
+
+    def test_callbacks_are_confined_to_one_thread(self):
+        self.assertTrue(self.steam.run_callbacks())
+        errors = self.run_callbacks_on_another_thread()
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], GenericSteamException)
+
+        plain = STEAMWORKS(backend=StubSteamworks())
+        self.assertFalse(plain.thread_safe)
+        self.assertEqual(type(plain.Matchmaking).__module__, type(self.steam.Matchmaking).__module__)
+        self.assertIsNot(type(plain.Matchmaking), type(self.steam.Matchmaking))
+
+
+if __name__ == '__main__':
+    unittest.main()
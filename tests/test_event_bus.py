@@ -0,0 +1,81 @@
+import os
+import sys
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+
+current_path = os.path.dirname(os.path.realpath(__file__))
+project_root = os.path.abspath(os.path.join(current_path, '..'))
+sys.path.insert(0, project_root)
+
+from steamworks.enums import SteamEventType
+from steamworks.events import SteamEventBus
+from steamworks.interfaces.matchmaking import SteamMatchmaking
+from steamworks.structs import LobbyCreated_t, LobbyEnter_t
+
+
+class FakeNativeLobby(object):
+    """Records native callback registrations and fires them like RunCallbacks would"""
+
+    def __init__(self):
+        self.registered = {}
+        self.bus = SteamEventBus(self)
+
+    def loaded(self) -> bool:
+        return True
+
+    def Lobby_SetLobbyCreatedCallback(self, callback: object) -> None:
+        self.registered.setdefault(SteamEventType.LOBBY_CREATED, []).append(callback)
+
+    def Lobby_SetLobbyEnterCallback(self, callback: object) -> None:
+        self.registered.setdefault(SteamEventType.LOBBY_ENTER, []).append(callback)
+
+    def GetNumLobbyMembers(self, lobby_id: int) -> int:
+        return 2
+
+    def GetLobbyMemberByIndex(self, lobby_id: int, index: int) -> int:
+        return lobby_id * 10 + index
+
+    def fire(self, event_type: SteamEventType, event: object) -> None:
+        self.registered[event_type][-1](event)
+
+
+class TestEventBus(unittest.TestCase):
+    def setUp(self):
+        self.steam = FakeNativeLobby()
+        self.matchmaking = SteamMatchmaking(self.steam)
+
+    def test_fan_out_from_one_native_registration(self):
+        engine, ui, lobby_7 = [], [], []
+        self.steam.bus.subscribe(SteamEventType.LOBBY_ENTER, lambda event: engine.append(event.m_ulSteamIDLobby))
+        subscription = self.steam.bus.subscribe(
+            SteamEventType.LOBBY_ENTER, lambda event: ui.append(event.m_ulSteamIDLobby))
+        self.steam.bus.subscribe(SteamEventType.LOBBY_ENTER, lambda event: lobby_7.append(event.m_ulSteamIDLobby),
+                                 m_ulSteamIDLobby=7)
+
+        self.steam.fire(SteamEventType.LOBBY_ENTER, LobbyEnter_t(m_ulSteamIDLobby=7, m_EChatRoomEnterResponse=1))
+        subscription.unsubscribe()
+        self.steam.fire(SteamEventType.LOBBY_ENTER, LobbyEnter_t(m_ulSteamIDLobby=8, m_EChatRoomEnterResponse=1))
+
+        self.assertEqual(len(self.steam.registered[SteamEventType.LOBBY_ENTER]), 1)
+        self.assertEqual(engine, [7, 8])
+        self.assertEqual(ui, [7])
+        self.assertEqual(lobby_7, [7])
+        self.assertEqual(self.matchmaking.current_lobby_id, 8)
+        self.assertEqual(self.matchmaking.lobby_members, (80, 81))
+        self.assertRaises(AttributeError, self.steam.bus.subscribe, SteamEventType.LOBBY_ENTER, print, lobby=7)
+
+    def test_set_callback_replaces_only_its_own_slot(self):
+        first, second, failures = [], [], StringIO()
+        self.matchmaking.SetLobbyCreatedCallback(first.append)
+        self.matchmaking.SetLobbyCreatedCallback(second.append)
+        self.steam.bus.subscribe(SteamEventType.LOBBY_CREATED, lambda event: 1 / 0,
+                                 predicate=lambda event: event.m_eResult == 1)
+
+        with redirect_stderr(failures):
+            self.steam.fire(SteamEventType.LOBBY_CREATED, LobbyCreated_t(1, 5))
+
+        self.assertEqual(first, [])
+        self.assertEqual([event.m_ulSteamIDLobby for event in second], [5])
+        self.assertEqual(self.matchmaking.current_lobby_id, 5)
+        self.assertIn('ZeroDivisionError', failures.getvalue())
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+import unittest
+
+current_path = os.path.dirname(os.path.realpath(__file__))
+project_root = os.path.abspath(os.path.join(current_path, '..'))
+sys.path.insert(0, project_root)
+
+HEAVY_MODULES = ('ctypes', 'asyncio', 'steamworks.core', 'steamworks.methods', 'steamworks.interfaces')
+
+
+def loaded_after(statement: str) -> set:
+    """Modules imported by a statement in a fresh interpreter"""
+    script = f'import sys\nbefore = set(sys.modules)\n{statement}\nprint("\\n".join(set(sys.modules) - before))'
+    output = subprocess.run([sys.executable, '-c', script], cwd=project_root, capture_output=True, text=True,
+                            check=True).stdout
+    return set(output.split())
+
+
+class TestImports(unittest.TestCase):
+    def assertLight(self, statement: str):
+        loaded = loaded_after(statement)
+        heavy = sorted(module for module in loaded if module.startswith(HEAVY_MODULES))
+        self.assertEqual(heavy, [], f'{statement!r} imported {heavy}')
+
+    def test_package_is_light(self):
+        self.assertLight('import steamworks')
+
+    def test_enums_are_light(self):
+        self.assertLight('import steamworks.enums')
+        self.assertLight('from steamworks import EP2PSend, ELobbyType')
+
+    def test_core_defers_interfaces_and_asyncio(self):
+        loaded = loaded_after('from steamworks import STEAMWORKS')
+        self.assertIn('steamworks.core', loaded)
+        self.assertNotIn('asyncio', loaded)
+        self.assertFalse([module for module in loaded if module.startswith('steamworks.interfaces.')])
+
+    def test_lazy_names_resolve(self):
+        import steamworks
+        from steamworks.enums import EP2PSend
+        from steamworks.exceptions import SteamNotLoadedException
+        from steamworks.structs import LobbyEnter_t
+
+        self.assertIs(steamworks.EP2PSend, EP2PSend)
+        self.assertIs(steamworks.SteamNotLoadedException, SteamNotLoadedException)
+        self.assertIs(steamworks.LobbyEnter_t, LobbyEnter_t)
+        with self.assertRaises(AttributeError):
+            steamworks.NoSuchName
+
+    def test_star_import(self):
+        import importlib
+        import steamworks
+
+        namespace = {}
+        exec('from steamworks import *', namespace)
+        self.assertIn('STEAMWORKS', namespace)
+        self.assertIs(namespace['EP2PSend'], steamworks.EP2PSend)
+        # Every public class of the modules the package used to star-import is exported
+        for module_name in ('steamworks.exceptions', 'steamworks.enums', 'steamworks.structs'):
+            module = importlib.import_module(module_name)
+            for name, value in vars(module).items():
+                if not name.startswith('_') and getattr(value, '__module__', None) == module_name:
+                    self.assertIs(namespace.get(name), value, name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import sys
+import unittest
+
+current_path = os.path.dirname(os.path.realpath(__file__))
+project_root = os.path.abspath(os.path.join(current_path, '..'))
+sys.path.insert(0, project_root)
+
+from steamworks import STEAMWORKS
+from steamworks.enums import SteamEventType
+from steamworks.events import SteamEventBus
+from steamworks.interfaces.workshop import SteamWorkshop
+from steamworks.methods import STEAMWORKS_HOT_METHODS
+from steamworks.structs import LobbyEnter_t
+
+
+class RecordingLibrary(object):
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name: str) -> object:
+        def symbol(*args):
+            self.calls.append(name)
+            return 0
+
+        setattr(self, name, symbol)
+        return symbol
+
+
+class TestLazyInterfaces(unittest.TestCase):
+    def setUp(self):
+        self.library = RecordingLibrary()
+        self.steam = STEAMWORKS.__new__(STEAMWORKS)
+        self.steam._prebind = None
+        self.steam._timings = {'load_library': 0.0, 'prebind': 0.0, 'prebound': 0, 'lazy_bind': 0.0, 'lazy_bound': 0}
+        self.steam.bus = SteamEventBus(self.steam)
+        self.steam._cdll = self.library
+        self.steam._loaded = True
+        self.steam._load_steamworks_api()
+
+    def test_interfaces_are_built_on_first_access(self):
+        self.assertEqual(self.steam.interfaces(), [])
+        self.assertEqual(self.library.calls, [])
+
+        workshop = self.steam.Workshop
+        self.assertIsInstance(workshop, SteamWorkshop)
+        self.assertIs(self.steam.Workshop, workshop)
+        self.assertEqual(self.steam.interfaces(), ['Workshop'])
+        self.assertEqual(self.library.calls, ['Workshop_GetNumSubscribedItems'])
+
+        self.steam.Matchmaking
+        self.assertEqual(self.library.calls[1:], ['Lobby_SetLobbyCreatedCallback', 'Lobby_SetLobbyEnterCallback'])
+
+        self.steam._reload_steamworks_interfaces()
+        self.assertEqual(self.steam.interfaces(), [])
+        self.assertIsNot(self.steam.Workshop, workshop)
+
+    def test_reload_unsubscribes_dropped_interfaces(self):
+        matchmaking, entered = self.steam.Matchmaking, []
+        matchmaking.SetLobbyEnterCallback(entered.append)
+        self.steam.Workshop.SetItemInstalledCallback(entered.append)
+        self.assertEqual(len(self.steam.bus.subscribers(SteamEventType.LOBBY_ENTER)), 2)
+
+        self.steam._reload_steamworks_interfaces()
+        self.assertEqual(self.steam.bus.subscribers(SteamEventType.LOBBY_ENTER), ())
+        self.assertEqual(self.steam.bus.subscribers(SteamEventType.ITEM_INSTALLED), ())
+
+        self.assertIsNot(self.steam.Matchmaking, matchmaking)
+        self.assertEqual(len(self.steam.bus.subscribers(SteamEventType.LOBBY_ENTER)), 1)
+        self.steam.bus.publish(SteamEventType.LOBBY_ENTER, LobbyEnter_t(42, 1))
+        self.assertEqual(entered, [])
+        self.assertEqual(matchmaking.current_lobby_id, 0)
+
+    def test_native_functions_are_bound_on_first_use(self):
+        self.assertIn('ReadP2PPackets', vars(self.steam))
+        self.assertNotIn('GetPersonaName', vars(self.steam))
+
+        self.steam.GetPersonaName()
+        self.assertIn('GetPersonaName', vars(self.steam))
+        self.assertRaises(AttributeError, getattr, self.steam, 'NotASteamFunction')
+
+        report = self.steam.startup_report()
+        self.assertEqual(report['prebound'], len(STEAMWORKS_HOT_METHODS))
+        self.assertEqual(report['lazy_bound'], 1)
@@ -0,0 +1,94 @@
+import os
+import sys
+import unittest
+from ctypes import create_string_buffer
+
+current_path = os.path.dirname(os.path.realpath(__file__))
+project_root = os.path.abspath(os.path.join(current_path, '..'))
+sys.path.insert(0, project_root)
+
+from steamworks.p2p.coalesce import BUNDLE_LENGTH, P2PCoalescer, unbundle
+
+PEER = 76561197960265729
+
+
+class RecordingNetworking(object):
+    """Accepts every batch and keeps the bundles it was given"""
+
+    def __init__(self):
+        self.batches = []
+
+    def SendP2PPacketsBatch(self, items: list) -> int:
+        self.batches.append([(peer, bytes(bundle), send_type, channel) for peer, bundle, send_type, channel in items])
+        return (1 << len(items)) - 1
+
+
+def bundle(*messages: bytes) -> bytes:
+    return b''.join(BUNDLE_LENGTH.pack(len(message)) + message for message in messages)
+
+
+class TestUnbundle(unittest.TestCase):
+    def test_round_trip(self):
+        messages = [b'first', b'', b'x' * 300]
+        self.assertEqual([bytes(message) for message in unbundle(bundle(*messages))], messages)
+        self.assertEqual(list(unbundle(b'')), [])
+
+        # The '<c' formatted ReadP2PPackets arena is accepted as well
+        arena = create_string_buffer(bundle(b'a', b'bc'), 16)
+        self.assertEqual([bytes(message) for message in unbundle(memoryview(arena)[:7])], [b'a', b'bc'])
+
+    def test_truncated_length_prefix(self):
+        messages = unbundle(bundle(b'complete') + b'\x05')
+        self.assertEqual(bytes(next(messages)), b'complete')
+        with self.assertRaises(ValueError):
+            next(messages)
+
+    def test_truncated_message(self):
+        with self.assertRaises(ValueError):
+            list(unbundle(bundle(b'complete', b'cut short')[:-1]))
+
+        # A length prefix larger than the whole packet
+        with self.assertRaises(ValueError):
+            list(unbundle(BUNDLE_LENGTH.pack(0xFFFF) + b'garbage'))
+
+
+class TestP2PCoalescer(unittest.TestCase):
+    def test_bundles_close_at_the_mtu(self):
+        networking = RecordingNetworking()
+        coalescer = P2PCoalescer(networking, mtu=16)
+        for message in (b'12345', b'67890', b'abcde', b'fghij'):
+            coalescer.queue(PEER, message)
+
+        coalescer.queue(PEER, b'other channel', channel=1)
+        self.assertEqual(len(coalescer), 3)
+        self.assertEqual(coalescer.flush(), 3)
+        self.assertEqual(coalescer.flush(), 0)
+
+        received = [bytes(message) for peer, packet, _, channel in networking.batches[0]
+                    for message in unbundle(packet)]
+        self.assertEqual(received, [b'12345', b'67890', b'abcde', b'fghij', b'other channel'])
+        self.assertTrue(all(len(packet) <= 16 for _, packet, _, _ in networking.batches[0]))
+        self.assertEqual((coalescer.messages_queued, coalescer.packets_sent, coalescer.send_failures), (5, 3, 0))
+
+    def test_oversized_messages_are_rejected(self):
+        coalescer = P2PCoalescer(RecordingNetworking(), mtu=16)
+        with self.assertRaises(ValueError):
+            coalescer.queue(PEER, b'x' * 15)
+
+        with self.assertRaises(ValueError):
+            P2PCoalescer(RecordingNetworking(), mtu=BUNDLE_LENGTH.size)
+
+    def test_mtu_is_bounded_by_the_length_prefix(self):
+        with self.assertRaises(ValueError):
+            P2PCoalescer(RecordingNetworking(), mtu=0xFFFF + BUNDLE_LENGTH.size + 1)
+
+        # The largest message the prefix can describe still fits
+        networking = RecordingNetworking()
+        coalescer = P2PCoalescer(networking, mtu=0xFFFF + BUNDLE_LENGTH.size)
+        coalescer.queue(PEER, b'x' * 0xFFFF)
+        self.assertEqual(coalescer.flush(), 1)
+        self.assertEqual([len(message) for message in unbundle(networking.batches[0][0][1])], [0xFFFF])
+
+
+if __name__ == '__main__':
+    unittest.main()
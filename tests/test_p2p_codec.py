@@ -0,0 +1,49 @@
+import os
+import sys
+import unittest
+
+current_path = os.path.dirname(os.path.realpath(__file__))
+project_root = os.path.abspath(os.path.join(current_path, '..'))
+sys.path.insert(0, project_root)
+
+from steamworks.p2p.codec import P2PMessageRegistry
+from steamworks.p2p.loopback import LoopbackNetwork
+
+
+class TestP2PCodec(unittest.TestCase):
+    def setUp(self):
+        self.registry = P2PMessageRegistry(buffer_size=16)
+        self.PlayerState = self.registry.define('PlayerState', [('entity', 'I'), ('x', 'f'), ('health', 'H')])
+        self.Chat = self.registry.define('Chat', [('sender', 'Q'), ('text', '16s')], tag=200)
+
+    def test_define(self):
+        self.assertEqual(self.PlayerState.tag, 0)
+        self.assertEqual(self.PlayerState.size, 11)
+        self.assertIs(self.registry.codec(200), self.Chat)
+        self.assertIs(self.registry['Chat'], self.Chat)
+        self.assertRaises(ValueError, self.registry.define, 'Chat', [('sender', 'Q')])
+        self.assertRaises(ValueError, self.registry.define, 'Other', [('sender', 'Q')], tag=200)
+        self.assertRaises(ValueError, self.registry.define, 'Pair', [('position', '2f')])
+
+    def test_round_trip(self):
+        packed = self.PlayerState.pack(7, 1.5, 100)
+        self.assertEqual(self.PlayerState.unpack_from(packed), (7, 1.5, 100))
+        self.assertEqual(self.registry.decode(packed)[1].health, 100)
+        self.assertRaises(ValueError, self.Chat.unpack_from, packed + bytes(32))
+
+        # Grows the 16 byte send buffer without losing the messages encoded before
+        encoded = self.registry.encode_many([(self.PlayerState, (index, 0.0, index)) for index in range(4)] +
+                                            [(self.Chat, (1, b'hello'))])
+        decoded = list(self.registry.decode_all(encoded))
+        self.assertEqual([message.entity for _, message in decoded[:4]], [0, 1, 2, 3])
+        self.assertEqual(decoded[4], (self.Chat, (1, b'hello' + bytes(11))))
+
+    def test_send_over_loopback(self):
+        network = LoopbackNetwork()
+        alice, bob = network.add_peer(), network.add_peer()
+        self.assertTrue(self.registry.send(alice.P2PNetworking, bob.steam_id, self.PlayerState, 3, -2.0, 50))
+
+        count, records, arena = bob.P2PNetworking.ReadP2PPackets()
+        self.assertEqual(count, 1)
+        offset, size = records[0].offset, records[0].size
+        self.assertEqual(self.registry.decode(arena[offset:offset + size]), (self.PlayerState, (3, -2.0, 50)))
@@ -0,0 +1,97 @@
+import os
+import sys
+import unittest
+
+current_path = os.path.dirname(os.path.realpath(__file__))
+project_root = os.path.abspath(os.path.join(current_path, '..'))
+sys.path.insert(0, project_root)
+
+from steamworks.p2p.fragment import FRAGMENT_HEADER, P2PFragmenter, P2PReassembler
+
+PEER = 76561197960265729
+# 100 byte chunks, so a 1000 byte message has 10 fragments
+MTU = FRAGMENT_HEADER.size + 100
+
+
+class ManualClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestP2PReassembler(unittest.TestCase):
+    def setUp(self):
+        self.clock = ManualClock()
+        self.fragmenter = P2PFragmenter(None, mtu=MTU)
+
+    def fragments(self, size: int, message_id: int) -> list:
+        return self.fragmenter.fragment(bytes(index & 0xFF for index in range(size)), message_id)
+
+    def test_reassembly_in_any_order(self):
+        reassembler = P2PReassembler(clock=self.clock)
+        fragments = self.fragments(1000, 1)
+        results = [reassembler.feed(PEER, fragment) for fragment in reversed(fragments[1:])]
+        self.assertEqual(results, [None] * 9)
+        # Duplicates are ignored
+        self.assertIsNone(reassembler.feed(PEER, fragments[5]))
+        self.assertEqual(reassembler.feed(PEER, fragments[0]), bytes(index & 0xFF for index in range(1000)))
+        self.assertEqual((len(reassembler), reassembler.pending_bytes), (0, 0))
+
+    def test_expire(self):
+        reassembler = P2PReassembler(timeout=5.0, clock=self.clock)
+        reassembler.feed(PEER, self.fragments(1000, 1)[0])
+        self.clock.now = 4.9
+        self.assertEqual(reassembler.expire(), 0)
+        self.assertEqual(reassembler.expire(5.0), 1)
+        self.assertEqual((len(reassembler), reassembler.pending_bytes, reassembler.expired), (0, 0, 1))
+
+    def test_feed_expires_stale_messages(self):
+        reassembler = P2PReassembler(timeout=0.2, expire_interval=1.0, clock=self.clock)
+        reassembler.feed(PEER, self.fragments(1000, 1)[0])
+        self.clock.now = 0.1
+        reassembler.feed(PEER, self.fragments(1000, 2)[0])
+        self.assertEqual(len(reassembler), 2)
+
+        # Stale, but the last check was less than expire_interval ago
+        self.clock.now = 0.5
+        reassembler.feed(PEER, self.fragments(1000, 3)[0])
+        self.assertEqual((len(reassembler), reassembler.expired), (3, 0))
+
+        self.clock.now = 1.1
+        reassembler.feed(PEER, self.fragments(1000, 4)[0])
+        self.assertEqual((len(reassembler), reassembler.expired), (1, 3))
+        self.assertEqual(reassembler.pending_bytes, 1000)
+
+    def test_memory_cap_evicts_the_oldest_messages(self):
+        reassembler = P2PReassembler(max_pending_bytes=2500, clock=self.clock)
+        first, second, third = (self.fragments(1000, message_id) for message_id in range(3))
+        reassembler.feed(PEER, first[0])
+        reassembler.feed(PEER, second[0])
+        reassembler.feed(PEER, third[0])
+        self.assertEqual((len(reassembler), reassembler.pending_bytes, reassembler.evicted), (2, 2000, 1))
+
+        # The evicted message starts over, the others still complete
+        for fragment in second[1:]:
+            result = reassembler.feed(PEER, fragment)
+
+        self.assertEqual(len(result), 1000)
+        self.assertIsNone(reassembler.feed(PEER, first[1]))
+        self.assertEqual((len(reassembler), reassembler.pending_bytes), (2, 2000))
+
+        # Messages larger than the cap are rejected without evicting anything
+        self.assertIsNone(reassembler.feed(PEER, self.fragments(3000, 9)[0]))
+        self.assertEqual((len(reassembler), reassembler.rejected, reassembler.evicted), (2, 1, 1))
+
+    def test_malformed_fragments_are_rejected(self):
+        reassembler = P2PReassembler(clock=self.clock)
+        fragment = bytes(self.fragments(1000, 1)[0])
+        self.assertIsNone(reassembler.feed(PEER, fragment[:FRAGMENT_HEADER.size - 1]))
+        self.assertIsNone(reassembler.feed(PEER, fragment[:-1]))
+        self.assertIsNone(reassembler.feed(PEER, FRAGMENT_HEADER.pack(1, 10, 10, 100, 1000) + bytes(100)))
+        self.assertEqual((reassembler.rejected, len(reassembler)), (3, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,321 @@
+import os
+import sys
+import asyncio
+import unittest
+from ctypes import create_string_buffer, c_uint32, byref, c_uint64
+
+current_path = os.path.dirname(os.path.realpath(__file__))
+project_root = os.path.abspath(os.path.join(current_path, '..'))
+sys.path.insert(0, project_root)
+
+from steamworks.enums import EP2PSend
+from steamworks.p2p.aio import SteamP2PProtocol, create_p2p_endpoint, open_p2p_endpoint
+from steamworks.p2p.coalesce import P2PCoalescer, unbundle
+from steamworks.p2p.demux import P2PChannelDemux, P2PDropPolicy
+from steamworks.p2p.fragment import P2PFragmenter, P2PReassembler
+from steamworks.p2p.loopback import LoopbackNetwork
+from steamworks.p2p.sessions import P2PSessionManager
+
+RELIABLE = EP2PSend.k_EP2PSendReliable.value
+UNRELIABLE = EP2PSend.k_EP2PSendUnreliable.value
+
+
+def read_packets(peer: object, **kwargs) -> list:
+    """(sender, payload) pairs of one ReadP2PPackets call"""
+    count, records, arena = peer.P2PNetworking.ReadP2PPackets(**kwargs)
+    return [(record.steamIDRemote, bytes(arena[record.offset:record.offset + record.size]))
+            for record in records[:count]]
+
+
+class RefusingNetworking(object):
+    """Refuses the first `refuse` send batches, accepts everything after that and never receives anything"""
+
+    def __init__(self, refuse: int):
+        self.refuse = refuse
+        self.batches = 0
+        self.sent = []
+
+    def SendP2PPacketsBatch(self, items: list) -> int:
+        self.batches += 1
+        if self.batches <= self.refuse:
+            return 0
+
+        self.sent.extend(bytes(data) for _, data, _, _ in items)
+        return (1 << len(items)) - 1
+
+    def ReadP2PPackets(self, channel: int, max_packets: int) -> tuple:
+        return 0, None, None
+
+
+class RecordingProtocol(SteamP2PProtocol):
+    def __init__(self, resend: bool = False):
+        self.resend = resend
+        self.transport = None
+        self.errors = 0
+        self.lost = None
+
+    def connection_made(self, transport: object) -> None:
+        self.transport = transport
+        self.lost = asyncio.get_running_loop().create_future()
+
+    def connection_lost(self, exc: Exception) -> None:
+        self.lost.set_result(self.transport.get_write_buffer_size())
+
+    def error_received(self, exc: Exception) -> None:
+        self.errors += 1
+        if self.resend and not self.transport.is_closing():
+            self.transport.sendto(b'again', 2)
+
+
+async def open_transport(networking: object, protocol: object, **kwargs) -> object:
+    transport, _ = await create_p2p_endpoint(None, lambda: protocol, interval=0.001, run_callbacks=False,
+                                             networking=networking, **kwargs)
+    return transport
+
+
+class ManualClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestP2PLoopback(unittest.TestCase):
+    def setUp(self):
+        self.clock = ManualClock()
+        self.network = LoopbackNetwork(clock=self.clock, seed=1)
+        self.alice = self.network.add_peer()
+        self.bob = self.network.add_peer()
+
+    def test_send_and_read_packet(self):
+        message = b'Hello, P2P!'
+        self.assertTrue(self.alice.P2PNetworking.SendP2PPacket(self.bob.steam_id, message, len(message), RELIABLE))
+
+        buffer = create_string_buffer(1024)
+        msg_size = c_uint32()
+        sender_steam_id = c_uint64()
+        self.assertTrue(self.bob.P2PNetworking.ReadP2PPacket(buffer, 1024, byref(msg_size), byref(sender_steam_id)))
+        self.assertEqual(sender_steam_id.value, self.alice.steam_id)
+        self.assertEqual(buffer.raw[:msg_size.value], message)
+        self.assertFalse(self.bob.P2PNetworking.ReadP2PPacket(buffer, 1024, byref(msg_size), byref(sender_steam_id)))
+
+    def test_batched_send_and_read(self):
+        carol = self.network.add_peer()
+        peers = [self.bob.steam_id, carol.steam_id, 1]
+        self.assertEqual(self.alice.P2PNetworking.SendP2PPacketsBatch(payload=b'snapshot', peers=peers), 0b011)
+
+        for index in range(100):
+            self.alice.P2PNetworking.SendP2PPacket(self.bob.steam_id, b'%d' % index, len(b'%d' % index), RELIABLE, 3)
+
+        self.assertEqual([data for _, data in read_packets(self.bob, channel=3, max_packets=128)],
+                         [b'%d' % index for index in range(100)])
+        self.assertEqual(read_packets(carol), [(self.alice.steam_id, b'snapshot')])
+
+    def test_batched_read_fills_and_grows_the_arena(self):
+        networking = self.bob.P2PNetworking
+        packets = [bytes([index]) * 1200 for index in range(64)]
+        for packet in packets:
+            self.alice.P2PNetworking.SendP2PPacket(self.bob.steam_id, packet, len(packet), UNRELIABLE)
+
+        # 64 packets at MTU do not fit the minimum arena, one call still reads all of them
+        count, records, arena = networking.ReadP2PPackets(max_packets=64)
+        self.assertEqual(count, 64)
+        self.assertEqual([bytes(arena[record.offset:record.offset + record.size]) for record in records[:count]],
+                         packets)
+
+        self.alice.P2PNetworking.SendP2PPacket(self.bob.steam_id, b'first', 5, UNRELIABLE)
+        self.assertIs(networking.ReadP2PPackets(max_packets=64)[1], records)
+        self.assertIs(networking.ReadP2PPackets(max_packets=64)[2], arena)
+
+        # A batch stopping at a packet larger than the arena grows it and keeps what was already read
+        large = bytes(range(256)) * 1024
+        for packet in (b'before', large, b'after'):
+            self.alice.P2PNetworking.SendP2PPacket(self.bob.steam_id, packet, len(packet), RELIABLE)
+
+        self.assertEqual([data for _, data in read_packets(self.bob)], [b'before', large, b'after'])
+        self.assertEqual(networking.ReadP2PPackets()[0], 0)
+
+    def test_latency_and_loss(self):
+        network = LoopbackNetwork(latency=0.05, loss=0.5, seed=7, clock=self.clock)
+        sender, receiver = network.add_peer(), network.add_peer()
+        for _ in range(200):
+            sender.P2PNetworking.SendP2PPacket(receiver.steam_id, b'x', 1, UNRELIABLE)
+
+        self.assertEqual(receiver.P2PNetworking.ReadP2PPackets(max_packets=256)[0], 0)
+        self.clock.now = 0.05
+        received = receiver.P2PNetworking.ReadP2PPackets(max_packets=256)[0]
+        self.assertEqual(received, 200 - network.packets_lost)
+        self.assertTrue(50 < network.packets_lost < 150)
+
+    def test_session_requests(self):
+        manager = P2PSessionManager(self.bob.P2PNetworking, policy=lambda peer: peer != self.alice.steam_id,
+                                    idle_timeout=10.0, clock=self.clock)
+        carol = self.network.add_peer()
+        self.alice.P2PNetworking.SendP2PPacket(self.bob.steam_id, b'a', 1, RELIABLE)
+        carol.P2PNetworking.SendP2PPacket(self.bob.steam_id, b'c', 1, RELIABLE)
+        self.bob.run_callbacks()
+
+        self.assertIn(carol.steam_id, manager)
+        self.assertNotIn(self.alice.steam_id, manager)
+        self.assertEqual(manager.rejected, 1)
+        self.assertEqual([sender for sender, _ in read_packets(self.bob)], [carol.steam_id])
+
+        self.clock.now = 11.0
+        self.assertEqual(manager.evict_idle(), [carol.steam_id])
+        self.assertEqual(len(manager), 0)
+
+    def test_traffic_keeps_sessions_alive(self):
+        manager = P2PSessionManager(self.bob.P2PNetworking, idle_timeout=10.0, clock=self.clock)
+        carol = self.network.add_peer()
+        self.assertTrue(manager.open(self.alice.steam_id))
+        self.assertTrue(manager.open(carol.steam_id))
+
+        # Packets read from alice and sent to carol through the networking interface count as activity
+        self.clock.now = 8.0
+        self.alice.P2PNetworking.SendP2PPacket(self.bob.steam_id, b'a', 1, RELIABLE)
+        self.assertEqual(len(read_packets(self.bob)), 1)
+        self.bob.P2PNetworking.SendP2PPacketsBatch(payload=b'c', peers=[carol.steam_id], send_type=RELIABLE)
+
+        self.clock.now = 15.0
+        self.assertEqual(manager.evict_idle(), [])
+        self.bob.P2PNetworking.SendP2PPacket(carol.steam_id, b'c', 1, RELIABLE)
+        self.clock.now = 20.0
+        self.assertEqual(manager.evict_idle(), [self.alice.steam_id])
+        self.assertEqual(list(manager.sessions), [carol.steam_id])
+
+    def test_demux_drop_policies(self):
+        for index in range(10):
+            self.alice.P2PNetworking.SendP2PPacket(self.bob.steam_id, b'%d' % index, 1, UNRELIABLE, 0)
+            self.alice.P2PNetworking.SendP2PPacket(self.bob.steam_id, b'%d' % index, 1, RELIABLE, 1)
+
+        demux = P2PChannelDemux(self.bob.P2PNetworking)
+        demux.configure(0, capacity=4, policy=P2PDropPolicy.DROP_OLDEST)
+        demux.configure(1, capacity=4, policy=P2PDropPolicy.BLOCK)
+        demux.pump()
+
+        self.assertEqual([data for _, data in demux.drain(0)], [b'6', b'7', b'8', b'9'])
+        self.assertEqual([data for _, data in demux.drain(1)], [b'0', b'1', b'2', b'3'])
+        demux.pump()
+        self.assertEqual([data for _, data in demux.drain(1)], [b'4', b'5', b'6', b'7'])
+
+    def test_fragmentation_with_reordering(self):
+        network = LoopbackNetwork(latency=0.01, jitter=0.01, reorder=0.5, seed=3, clock=self.clock)
+        sender, receiver = network.add_peer(), network.add_peer()
+        message = bytes(range(256)) * 100
+
+        P2PFragmenter(sender.P2PNetworking).send(receiver.steam_id, message)
+        self.clock.now = 1.0
+        reassembler = P2PReassembler(clock=self.clock)
+        completed = [reassembler.feed(peer, data) for peer, data in read_packets(receiver, max_packets=64)]
+        self.assertEqual([bytes(result) for result in completed if result is not None], [message])
+        self.assertEqual(reassembler.pending_bytes, 0)
+
+    def test_coalescing(self):
+        coalescer = P2PCoalescer(self.alice.P2PNetworking)
+        messages = [b'message %03d' % index for index in range(300)]
+        for message in messages:
+            coalescer.queue(self.bob.steam_id, message)
+
+        self.assertEqual(coalescer.flush(), 4)
+        received = [bytes(message) for _, data in read_packets(self.bob) for message in unbundle(data)]
+        self.assertEqual(received, messages)
+
+    def test_stats(self):
+        stats = self.alice.P2PNetworking.EnableStats()
+        self.alice.P2PNetworking.SendP2PPacketsBatch(payload=b'12345', peers=[self.bob.steam_id, 1])
+        snapshot = self.alice.P2PNetworking.GetStatsSnapshot()
+        self.assertEqual(snapshot['totals']['bytes_sent'], 5)
+        self.assertEqual(snapshot['totals']['send_failures'], 1)
+        self.assertIs(self.alice.P2PNetworking.stats, stats)
+
+        self.alice.P2PNetworking.DisableStats()
+        self.assertNotIn('SendP2PPacketsBatch', vars(self.alice.P2PNetworking))
+        self.assertEqual(self.alice.P2PNetworking.GetStatsSnapshot(), {})
+
+    def test_asyncio_sessions(self):
+        network = LoopbackNetwork(latency=0.002)
+        server, client = network.add_peer(), network.add_peer()
+
+        async def exchange():
+            server_endpoint = await open_p2p_endpoint(server, interval=0.001)
+            client_endpoint = await open_p2p_endpoint(client, interval=0.001)
+
+            session = client_endpoint.session(server.steam_id)
+            await session.send(b'ping')
+            accepted = await asyncio.wait_for(server_endpoint.accept(), 1.0)
+            self.assertEqual(accepted.peer, client.steam_id)
+            self.assertEqual(await asyncio.wait_for(accepted.recv(), 1.0), b'ping')
+
+            await accepted.send(b'pong')
+            self.assertEqual(await asyncio.wait_for(session.recv(), 1.0), b'pong')
+
+            server_endpoint.transport.close()
+            client_endpoint.transport.close()
+            await server_endpoint.wait_closed()
+
+        asyncio.run(exchange())
+
+    def test_asyncio_close_wakes_waiting_readers(self):
+        network = LoopbackNetwork()
+        server, client = network.add_peer(), network.add_peer()
+
+        async def shutdown():
+            endpoint = await open_p2p_endpoint(server, interval=0.001)
+            first, second = endpoint.session(client.steam_id), endpoint.session(network.add_peer().steam_id)
+            readers = [asyncio.ensure_future(first.recv()) for _ in range(2)]
+            readers.append(asyncio.ensure_future(second.recv()))
+            acceptor = asyncio.ensure_future(endpoint.accept())
+            await asyncio.sleep(0.01)
+
+            first.close()
+            for reader in readers[:2]:
+                with self.assertRaises(ConnectionError):
+                    await asyncio.wait_for(reader, 1.0)
+
+            self.assertFalse(readers[2].done())
+            endpoint.transport.close()
+            for waiter in (readers[2], acceptor, endpoint.accept()):
+                with self.assertRaises(ConnectionError):
+                    await asyncio.wait_for(waiter, 1.0)
+
+            with self.assertRaises(ConnectionError):
+                await second.send(b'late')
+
+        asyncio.run(shutdown())
+
+
+class TestSteamP2PTransport(unittest.TestCase):
+    def test_packets_queued_by_error_received_wait_for_the_next_flush(self):
+        networking, protocol = RefusingNetworking(refuse=3), RecordingProtocol(resend=True)
+
+        async def run():
+            transport = await open_transport(networking, protocol)
+            transport.sendto(b'first', 2)
+            await asyncio.sleep(0.05)
+            transport.close()
+            return await asyncio.wait_for(protocol.lost, 1.0)
+
+        self.assertEqual(asyncio.run(run()), 0)
+        # One failure per refused batch; each resent packet is only part of the next batch
+        self.assertEqual(protocol.errors, 3)
+        self.assertEqual(networking.sent, [b'again'])
+
+    def test_close_retries_reliable_packets(self):
+        networking, protocol = RefusingNetworking(refuse=5), RecordingProtocol()
+
+        async def run(**kwargs):
+            transport = await open_transport(networking, protocol, **kwargs)
+            transport.sendto(b'reliable', 2, RELIABLE)
+            transport.close()
+            self.assertFalse(protocol.lost.done())
+            self.assertRaises(RuntimeError, transport.sendto, b'late', 2)
+            return await asyncio.wait_for(protocol.lost, 1.0)
+
+        self.assertEqual(asyncio.run(run()), 0)
+        self.assertEqual((networking.sent, protocol.errors), ([b'reliable'], 0))
+
+        # Out of retries: reported through error_received before the connection is lost
+        networking, protocol = RefusingNetworking(refuse=100), RecordingProtocol()
+        self.assertEqual(asyncio.run(run(send_retries=3)), 0)
+        self.assertEqual((networking.sent, protocol.errors), ([], 1))
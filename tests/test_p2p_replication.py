@@ -0,0 +1,91 @@
+import os
+import sys
+import unittest
+
+current_path = os.path.dirname(os.path.realpath(__file__))
+project_root = os.path.abspath(os.path.join(current_path, '..'))
+sys.path.insert(0, project_root)
+
+from steamworks.p2p.loopback import LoopbackNetwork
+from steamworks.p2p.replication import ENTITY_HEADER, P2PEntityType, P2PReplicator, SNAPSHOT_HEADER
+
+
+class TestP2PReplication(unittest.TestCase):
+    def setUp(self):
+        self.network = LoopbackNetwork(seed=5)
+        self.server, self.client = self.network.add_peer(), self.network.add_peer()
+        self.server_replicator = P2PReplicator(self.server.P2PNetworking, channel=2, history=8)
+        self.client_replicator = P2PReplicator(self.client.P2PNetworking, channel=2, history=8)
+        self.Player = self.server_replicator.define('Player', [('x', 'f'), ('y', 'f'), ('health', 'H')])
+        self.client_replicator.define('Player', [('x', 'f'), ('y', 'f'), ('health', 'H')])
+
+        self.server_replicator.add_peer(self.client.steam_id)
+        self.client_replicator.add_peer(self.server.steam_id)
+
+    def exchange(self) -> int:
+        sent = self.server_replicator.tick()
+        self.client_replicator.pump()
+        self.client_replicator.tick()
+        self.server_replicator.pump()
+        return sent
+
+    def expected(self) -> dict:
+        return {entity_id: values for entity_id, (_, values) in self.server_replicator.entities.items()}
+
+    def remote(self) -> dict:
+        remote = self.client_replicator.remote(self.server.steam_id)
+        return {entity_id: tuple(record) for entity_id, record in remote.items()}
+
+    def test_deltas_against_acked_baseline(self):
+        for entity_id in range(200):
+            self.server_replicator.set(entity_id, self.Player, 0.0, 0.0, 100)
+
+        full = self.exchange()
+        self.assertEqual(self.remote(), self.expected())
+
+        self.server_replicator.set(7, self.Player, 1.0, 0.0, 100)
+        self.server_replicator.remove(8)
+        delta = self.exchange()
+        self.assertLess(delta, full / 50)
+        self.assertEqual(self.remote(), self.expected())
+
+        # Nothing changed since the acknowledged snapshot: only the header is sent
+        self.assertEqual(self.exchange(), SNAPSHOT_HEADER.size)
+
+    def test_converges_under_loss(self):
+        self.network.loss = 0.5
+        for tick in range(200):
+            self.server_replicator.set(tick % 30, self.Player, float(tick), -float(tick), tick % 100)
+            if tick % 17 == 0:
+                self.server_replicator.remove((tick * 7) % 30)
+
+            self.exchange()
+
+        self.network.loss = 0.0
+        self.exchange()
+        self.exchange()
+        self.assertEqual(self.remote(), self.expected())
+
+    def test_masks_outside_the_fields_are_rejected(self):
+        self.server_replicator.set(1, self.Player, 0.0, 0.0, 100)
+        self.exchange()
+        self.assertEqual(self.client_replicator.snapshots_dropped, 0)
+
+        # Three fields fit into one mask byte, which leaves five bits that select nothing
+        for mask in range(8, 256):
+            snapshot = SNAPSHOT_HEADER.pack(100 + mask, 0, 0, 1) + ENTITY_HEADER.pack(1, 0, 0) + bytes([mask])
+            snapshot += bytes(16)
+            self.assertFalse(self.client_replicator.receive(self.server.steam_id, snapshot))
+
+        self.assertEqual(self.client_replicator.snapshots_dropped, 248)
+        self.assertEqual(len(self.client_replicator.types[0]._structs), 1)
+        self.assertEqual(self.remote(), self.expected())
+
+    def test_delta_struct_cache_is_bounded(self):
+        entity_type = P2PEntityType(0, 'Wide', [(f'field{index}', 'B') for index in range(16)])
+        for mask in range(1, 1000):
+            self.assertEqual(entity_type.delta_struct(mask).size, 2 + bin(mask).count('1'))
+
+        self.assertEqual(len(entity_type._structs), P2PEntityType.MAX_DELTA_STRUCTS)
+        self.assertIn(999, entity_type._structs)
+        self.assertNotIn(1, entity_type._structs)
@@ -0,0 +1,80 @@
+import os
+import sys
+import unittest
+
+current_path = os.path.dirname(os.path.realpath(__file__))
+project_root = os.path.abspath(os.path.join(current_path, '..'))
+sys.path.insert(0, project_root)
+
+from steamworks.enums import EP2PSend
+from steamworks.p2p.loopback import LoopbackNetwork
+from steamworks.p2p.stats import P2PStats
+
+RELIABLE = EP2PSend.k_EP2PSendReliable.value
+PEER = 76561197960265729
+
+
+class ManualClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestP2PStats(unittest.TestCase):
+    def setUp(self):
+        self.clock = ManualClock()
+        self.reports = []
+        self.stats = P2PStats(self.reports.append, report_interval=1.0, clock=self.clock)
+
+    def test_report_callback(self):
+        self.stats.record_send(PEER, 0, 100, True)
+        self.clock.now = 0.5
+        self.stats.maybe_report()
+        self.assertEqual(self.reports, [])
+
+        self.clock.now = 1.0
+        self.stats.maybe_report()
+        self.stats.maybe_report()
+        self.assertEqual(len(self.reports), 1)
+        self.assertEqual(self.reports[0]['totals']['bytes_sent'], 100)
+        self.assertEqual(self.reports[0]['rates']['bytes_sent_per_second'], 100.0)
+        self.assertEqual(self.reports[0]['peers'], {PEER: {0: self.reports[0]['totals']}})
+
+        self.stats.record_send(PEER, 0, 300, True)
+        self.clock.now = 3.0
+        self.stats.maybe_report()
+        self.assertEqual(self.reports[1]['rates']['bytes_sent_per_second'], 150.0)
+
+    def test_snapshots_do_not_reset_the_report_window(self):
+        self.stats.record_send(PEER, 0, 100, True)
+        self.clock.now = 0.9
+        self.assertAlmostEqual(self.stats.snapshot()['rates']['bytes_sent_per_second'], 100 / 0.9)
+
+        self.clock.now = 1.0
+        self.stats.maybe_report()
+        self.assertEqual(len(self.reports), 1)
+        self.assertEqual(self.reports[0]['rates']['bytes_sent_per_second'], 100.0)
+        # The snapshot rate covers the time since the previous snapshot only
+        self.assertEqual(self.stats.snapshot()['rates']['bytes_sent_per_second'], 0.0)
+
+    def test_sends_report(self):
+        network = LoopbackNetwork()
+        alice, bob = network.add_peer(), network.add_peer()
+        reports = []
+        # Report on every instrumented call
+        alice.P2PNetworking.EnableStats(reports.append, report_interval=0.0)
+
+        self.assertTrue(alice.P2PNetworking.SendP2PPacket(bob.steam_id, b'x', 1, RELIABLE, 0))
+        self.assertEqual([report['totals']['bytes_sent'] for report in reports], [1])
+        alice.P2PNetworking.SendP2PPacketsBatch(payload=b'xy', peers=[bob.steam_id])
+        self.assertEqual([report['totals']['bytes_sent'] for report in reports], [1, 3])
+
+        bob.P2PNetworking.EnableStats(reports.append, report_interval=0.0)
+        self.assertEqual(bob.P2PNetworking.ReadP2PPackets()[0], 2)
+        self.assertEqual(reports[-1]['totals']['bytes_received'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
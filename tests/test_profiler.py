@@ -0,0 +1,103 @@
+import os
+import sys
+import unittest
+
+current_path = os.path.dirname(os.path.realpath(__file__))
+project_root = os.path.abspath(os.path.join(current_path, '..'))
+sys.path.insert(0, project_root)
+
+from steamworks import STEAMWORKS
+from steamworks.events import SteamEventBus
+from steamworks.profiler import NativeProfiler
+
+
+def label(module: str, qualname: str) -> str:
+    # Python < 3.11 has no co_qualname, labels only carry the function name there
+    return f'{module}:{qualname if sys.version_info >= (3, 11) else qualname.rsplit(".", 1)[-1]}'
+
+
+class RecordingLibrary(object):
+    def __getattr__(self, name: str) -> object:
+        def symbol(*args):
+            return 0
+
+        setattr(self, name, symbol)
+        return symbol
+
+
+class SteppingClock(object):
+    """Nanosecond clock advancing by the next queued step on every reading"""
+
+    def __init__(self, *steps):
+        self.now = 0
+        self.steps = list(steps)
+
+    def __call__(self) -> int:
+        if self.steps:
+            self.now += self.steps.pop(0)
+
+        return self.now
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.steam = STEAMWORKS.__new__(STEAMWORKS)
+        self.steam._prebind = None
+        self.steam._timings = {'load_library': 0.0, 'prebind': 0.0, 'prebound': 0, 'lazy_bind': 0.0, 'lazy_bound': 0}
+        self.steam.bus = SteamEventBus(self.steam)
+        self.steam._cdll = RecordingLibrary()
+        self.steam._loaded = True
+        self.steam._load_steamworks_api()
+
+    def test_wrappers_only_exist_while_enabled(self):
+        read = self.steam.ReadP2PPackets
+        profiler = self.steam.enable_profiler()
+
+        self.assertIs(self.steam.ReadP2PPackets.__wrapped__, read)
+        # Bound after enabling: wrapped on bind
+        self.steam.Workshop.GetNumSubscribedItems()
+        self.assertIs(self.steam.Workshop_GetNumSubscribedItems.profiler, profiler)
+
+        self.assertIs(self.steam.disable_profiler(), profiler)
+        self.assertIs(self.steam.ReadP2PPackets, read)
+        self.assertFalse(hasattr(self.steam.Workshop_GetNumSubscribedItems, '__wrapped__'))
+        self.steam.GetPersonaName()
+        self.assertFalse(hasattr(self.steam.GetPersonaName, '__wrapped__'))
+        self.assertIsNone(self.steam.disable_profiler())
+
+    def test_records_calling_interface_method(self):
+        profiler = self.steam.enable_profiler(depth=2)
+        self.steam.Workshop.GetNumSubscribedItems()
+        self.steam.Workshop.GetNumSubscribedItems()
+        self.steam.disable_profiler()
+
+        report = profiler.report()
+        stats = report['Workshop_GetNumSubscribedItems']
+        # One more call made while the interface was built
+        self.assertEqual(stats['calls'], 3)
+        self.assertEqual(stats['callers'], {label('workshop.py', 'SteamWorkshop.GetNumSubscribedItems'): 3})
+        self.assertEqual(sum(stats['histogram'].values()), 3)
+
+        collapsed = profiler.collapsed('calls').splitlines()
+        stack = [label('test_profiler.py', 'TestProfiler.test_records_calling_interface_method'),
+                 label('workshop.py', 'SteamWorkshop.GetNumSubscribedItems'), 'Workshop_GetNumSubscribedItems 2']
+        self.assertIn(';'.join(stack), collapsed)
+
+    def test_statistics(self):
+        # Calls taking 0.5us, 3us and 1.5ms
+        profiler = NativeProfiler(depth=0, clock=SteppingClock(0, 500, 0, 3000, 0, 1500000))
+        native = profiler.wrap('GetPersonaName', lambda: b'name')
+        for _ in range(3):
+            self.assertEqual(native(), b'name')
+
+        stats = profiler.report()['GetPersonaName']
+        self.assertEqual((stats['calls'], stats['total_us'], stats['max_us']), (3, 1503.5, 1500.0))
+        self.assertEqual(stats['histogram'], {'<1us': 1, '<4us': 1, '<2048us': 1})
+        self.assertEqual(profiler.collapsed(), 'GetPersonaName 1503\n')
+
+        profiler.reset()
+        self.assertEqual(profiler.report(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import os
+import sys
+import threading
+import unittest
+from ctypes import ArgumentError
+
+current_path = os.path.dirname(os.path.realpath(__file__))
+project_root = os.path.abspath(os.path.join(current_path, '..'))
+sys.path.insert(0, project_root)
+
+from steamworks import STEAMWORKS
+from steamworks.enums import EItemState, ELobbyType, EP2PSend, EWorkshopFileType, SteamEventType
+from steamworks.events import EVENT_QUEUE_MAX_CAPACITY
+from steamworks.methods import STEAMWORKS_METHODS, InputAnalogActionData_t
+from steamworks.p2p.loopback import LoopbackNetwork
+from steamworks.structs import ItemInstalled_t, SteamEventRecord_t
+from steamworks.stub import StubItem, StubSteamworks
+
+
+class TestStubBackend(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubSteamworks(app_id=1234)
+        self.steam = STEAMWORKS(backend=self.stub, prebind=True)
+        self.assertTrue(self.steam.initialize())
+
+    def test_every_symbol_is_bound(self):
+        for name in STEAMWORKS_METHODS:
+            self.assertIs(getattr(self.steam, name), getattr(self.stub, name))
+
+        self.assertEqual(self.steam.app_id, 1234)
+        self.assertEqual(self.steam.Utils.GetAppID(), 1234)
+        self.assertEqual(self.steam.Users.GetSteamID(), self.stub.steam_id)
+        self.assertEqual(self.steam.Friends.GetPlayerName(), b'Stub Player')
+        self.assertFalse(self.steam.Apps.IsVACBanned())
+        self.assertIsInstance(STEAMWORKS(backend='stub')._cdll, StubSteamworks)
+
+    def test_arguments_and_results_follow_the_method_map(self):
+        # Checked like ctypes checks them against argtypes, instead of being passed to the implementation as they are
+        with self.assertRaises(TypeError):
+            self.steam.SendP2PPacket(self.stub.steam_id, b'x', 1, 0)
+
+        with self.assertRaises(ArgumentError):
+            self.steam.GetActionSetHandle('Move')
+
+        with self.assertRaises(TypeError):
+            self.steam.GetStatInt('NumWins')
+
+        # Results are converted to the restype, e.g. masked to its width
+        self.stub.script('GetNumLobbyMembers', -1)
+        self.assertEqual(self.steam.GetNumLobbyMembers(0), 2 ** 64 - 1)
+        self.stub.script('IsSubscribed', 2)
+        self.assertIs(self.steam.IsSubscribed(), True)
+
+    def test_scripted_state(self):
+        self.stub.achievements = {'FIRST_WIN': False, 'TENTH_WIN': False}
+        self.assertTrue(self.steam.UserStats.SetAchievement(b'FIRST_WIN'))
+        self.assertFalse(self.steam.UserStats.SetAchievement(b'UNKNOWN'))
+        self.assertEqual(self.stub.achievements, {'FIRST_WIN': True, 'TENTH_WIN': False})
+        self.assertTrue(self.steam.UserStats.SetStat(b'NumWins', 3))
+        self.assertEqual(self.steam.UserStats.GetStatInt(b'NumWins'), 3)
+
+        self.stub.items[77] = StubItem(EItemState.SUBSCRIBED | EItemState.INSTALLED, 2048, '/workshop/77', 1700000000)
+        self.assertEqual(list(self.steam.Workshop.GetSubscribedItems()), [77])
+        info = self.steam.Workshop.GetItemInstallInfo(77)
+        self.assertEqual((info['folder'], info['timestamp']), ('/workshop/77', 1700000000))
+
+        self.stub.controllers = [5, 6]
+        self.stub.analog_actions[(6, 1)] = InputAnalogActionData_t(0, 0.5, -0.5, True)
+        self.assertEqual(self.steam.Input.GetConnectedControllers(), [5, 6])
+        self.assertEqual(self.steam.Input.GetAnalogActionData(6, 1).x, 0.5)
+
+        self.stub.script('GetPlayerSteamLevel', 42)
+        self.assertEqual(self.steam.Users.GetPlayerSteamLevel(), 42)
+        self.stub.reset('GetPlayerSteamLevel')
+        self.assertEqual(self.steam.Users.GetPlayerSteamLevel(), 0)
+
+    def test_call_results_and_callbacks(self):
+        created = []
+        self.steam.Workshop.SetItemCreatedCallback(created.append)
+        call = self.steam.Workshop.CreateItem(self.steam.app_id, EWorkshopFileType.COMMUNITY)
+        self.assertEqual(self.steam.PendingCallResults(), 1)
+        self.steam.run_callbacks()
+        self.assertEqual([result.result for result in created], [1])
+
+        # Through the event queue, resolved by call handle
+        self.steam.enable_event_queue()
+        first = self.steam.Workshop.SubscribeItemAsync(created[0].publishedFileId)
+        second = self.steam.Workshop.SubscribeItemAsync(123)
+        lobby = self.steam.Matchmaking.CreateLobbyAsync(ELobbyType.k_ELobbyTypePublic, 4)
+        self.steam.run_callbacks()
+        self.assertEqual(first.result(0).publishedFileId, created[0].publishedFileId)
+        self.assertEqual(second.result(0).publishedFileId, 123)
+        self.assertEqual(self.steam.Matchmaking.current_lobby_id, lobby.result(0).m_ulSteamIDLobby)
+        self.assertEqual(self.steam.Matchmaking.lobby_members, (self.stub.steam_id,))
+        self.assertNotEqual(call, 0)
+
+        installed = []
+        self.steam.bus.subscribe(SteamEventType.ITEM_INSTALLED, installed.append, publishedFileId=5)
+        self.stub.fire(SteamEventType.ITEM_INSTALLED, ItemInstalled_t(1234, 4))
+        self.stub.fire(SteamEventType.ITEM_INSTALLED, ItemInstalled_t(1234, 5))
+        self.steam.run_callbacks()
+        self.assertEqual([event.publishedFileId for event in installed], [5])
+
+    def test_event_queue_capacity_is_bounded(self):
+        # Like the native queue: uint32 capacities above the maximum are refused instead of rounded up
+        self.assertFalse(self.stub.Events_Enable(0, 0))
+        self.assertFalse(self.stub.Events_Enable(EVENT_QUEUE_MAX_CAPACITY + 1, 0))
+        self.assertFalse(self.stub.Events_Enable(2 ** 31 + 1, 0))
+        self.assertTrue(self.stub.Events_Enable(EVENT_QUEUE_MAX_CAPACITY, 0))
+        self.stub.Events_Disable()
+
+        self.assertRaises(AttributeError, self.steam.enable_event_queue, 2 ** 31 + 1)
+        self.assertIsNone(self.steam.events)
+        self.assertEqual(self.steam.enable_event_queue(EVENT_QUEUE_MAX_CAPACITY).capacity, EVENT_QUEUE_MAX_CAPACITY)
+
+    def test_event_queue_is_drained_while_callbacks_run(self):
+        events = 20000
+        mask = 1 << SteamEventType.ITEM_INSTALLED.value
+        self.assertTrue(self.stub.Events_Enable(events, mask))
+        records = (SteamEventRecord_t * 64)()
+        drained, done = [], threading.Event()
+
+        def drain():
+            while not done.is_set() or self.stub.Events_Pending():
+                count = self.stub.Events_Drain(records, 64)
+                drained.extend(ItemInstalled_t.from_buffer_copy(records[index].data).publishedFileId
+                               for index in range(count))
+
+        thread = threading.Thread(target=drain)
+        thread.start()
+        for published_file_id in range(events):
+            self.stub.fire(SteamEventType.ITEM_INSTALLED, ItemInstalled_t(1234, published_file_id))
+            self.stub.RunCallbacks()
+
+        done.set()
+        thread.join(10)
+        self.assertEqual(drained, list(range(events)))
+        self.assertEqual(self.stub.Events_Dropped(), 0)
+
+        # Disabling while callbacks are emitted falls back to the Python callbacks instead of failing
+        thread = threading.Thread(target=self.stub.Events_Disable)
+        self.stub.fire(SteamEventType.ITEM_INSTALLED, ItemInstalled_t(1234, 1))
+        thread.start()
+        self.stub.RunCallbacks()
+        thread.join(10)
+        self.assertEqual(self.stub.Events_Pending(), 0)
+
+    def test_p2p_between_stubs(self):
+        network = LoopbackNetwork()
+        host = STEAMWORKS(backend=StubSteamworks(network=network))
+        client = STEAMWORKS(backend=StubSteamworks(network=network))
+
+        self.assertTrue(client.P2PNetworking.SendP2PPacket(
+            host.Users.GetSteamID(), b'hello', 5, EP2PSend.k_EP2PSendReliable.value, 1))
+        count, records, arena = host.P2PNetworking.ReadP2PPackets(1)
+        self.assertEqual([(record.steamIDRemote, bytes(arena[record.offset:record.offset + record.size]))
+                          for record in records[:count]],
+                         [(client.Users.GetSteamID(), b'hello')])
+
+
+if __name__ == '__main__':
+    unittest.main()
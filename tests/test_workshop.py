@@ -0,0 +1,87 @@
+import os
+import pickle
+import sys
+import threading
+import unittest
+
+current_path = os.path.dirname(os.path.realpath(__file__))
+project_root = os.path.abspath(os.path.join(current_path, '..'))
+sys.path.insert(0, project_root)
+
+from steamworks import STEAMWORKS
+from steamworks.enums import EItemState, EItemUpdateStatus
+from steamworks.interfaces.workshop import ItemDownloadInfo, ItemInstallInfo, ItemUpdateProgress
+from steamworks.stub import StubItem, StubSteamworks
+
+
+class TestWorkshopResults(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubSteamworks()
+        self.steam = STEAMWORKS(backend=self.stub)
+        self.stub.items[1] = StubItem(EItemState.INSTALLED, 4096, '/workshop/1', 1700000000, 1024, 4096)
+        self.stub.items[2] = StubItem(EItemState.INSTALLED, 8192, '/workshop/2', 1700000001)
+        self.workshop = self.steam.Workshop
+
+    def test_records(self):
+        first = self.workshop.GetItemInstallInfo(1)
+        second = self.workshop.GetItemInstallInfo(2)
+        self.assertEqual(first, ItemInstallInfo(4096, '/workshop/1', 1700000000))
+        self.assertEqual(second, ItemInstallInfo(8192, '/workshop/2', 1700000001))
+        self.assertIsInstance(first.disk_size, int)
+        self.assertEqual((first['disk_size'], first['folder']), (4096, '/workshop/1'))
+        self.assertRaises(KeyError, first.__getitem__, 'progress')
+        self.assertFalse(hasattr(first, '__dict__'))
+        self.assertEqual(self.workshop.GetItemInstallInfo(3), {})
+
+        # Dict-style access keeps working
+        self.assertEqual(first.get('folder'), '/workshop/1')
+        self.assertIsNone(first.get('progress'))
+        self.assertIn('timestamp', first)
+        self.assertNotIn('progress', first)
+        self.assertEqual(list(first.keys()), ['disk_size', 'folder', 'timestamp'])
+        self.assertEqual(dict(first), {'disk_size': 4096, 'folder': '/workshop/1', 'timestamp': 1700000000})
+        self.assertEqual(first, {'disk_size': 4096, 'folder': '/workshop/1', 'timestamp': 1700000000})
+
+        download = self.workshop.GetItemDownloadInfo(1)
+        self.assertEqual(download, ItemDownloadInfo(1024, 4096))
+        self.assertEqual(download['progress'], 0.25)
+        self.assertEqual(self.workshop.GetItemDownloadInfo(2), {})
+
+        update = self.stub.Workshop_StartItemUpdate(self.steam.app_id, 1)
+        progress = self.workshop.GetItemUpdateProgress(update)
+        self.assertEqual(progress.status, EItemUpdateStatus.PREPARING_CONFIG)
+        self.assertEqual(progress._asdict(), {'status': EItemUpdateStatus.PREPARING_CONFIG, 'processed': 0,
+                                              'total': 0, 'progress': 0.0})
+        self.assertEqual(pickle.loads(pickle.dumps(progress)), progress)
+        self.assertIsInstance(progress, ItemUpdateProgress)
+
+    def test_out_parameters_are_reused(self):
+        out = self.workshop._out
+        buffers = (out.first, out.timestamp, out.folder)
+        self.workshop.GetItemInstallInfo(1)
+        self.workshop.GetItemDownloadInfo(1)
+        self.assertIs(out.first, buffers[0])
+        self.assertIs(out.timestamp, buffers[1])
+        self.assertIs(out.folder, buffers[2])
+
+        # Longer paths get a bigger buffer, kept for later calls
+        self.stub.items[1].folder = '/' + 'x' * 2000
+        self.assertEqual(self.workshop.GetItemInstallInfo(1, 4096).folder, self.stub.items[1].folder)
+        self.assertEqual(len(out.folder), 4096)
+        self.assertEqual(self.workshop.GetItemInstallInfo(2).folder, '/workshop/2')
+
+    def test_out_parameters_are_per_thread(self):
+        main = self.workshop._out.first
+        other = []
+        thread = threading.Thread(target=lambda: other.append((self.workshop.GetItemInstallInfo(2),
+                                                               self.workshop._out.first)))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(other[0][0].disk_size, 8192)
+        self.assertIsNot(other[0][1], main)
+        self.assertIs(self.workshop._out.first, main)
+
+
+if __name__ == '__main__':
+    unittest.main()